@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""Benchmark the page classifier against the labeled fixtures.
+
+Runs the compiled classifier (on raw bytes and on text) and the substring
+scan it replaced over every page in ``fixtures/classifier``, and prints
+accuracy, misclassified pages and throughput as JSON. Pages are padded with
+ordinary product markup to ``--page-kb`` so throughput reflects real page
+sizes rather than the short fixtures.
+
+    python bench/bench_classifier.py --page-kb 300 --rounds 20
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scraper_classify import classify_page
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "classifier")
+
+# The indicator list and scans used before the compiled classifier
+LEGACY_INDICATORS = [
+    "captcha", "unusual traffic", "verify you are human", "robot", "bot detection",
+    "access denied", "blocked", "suspicious activity", "security check",
+    "please wait", "verification required", "challenge", "nocaptcha", "recaptcha",
+    "hcaptcha", "cloudflare", "ddos protection", "rate limit", "too many requests",
+    "captcha-loading", "nc_token", "x5secdata", "nc-verify-form", "bx-feedback-btn",
+    "alibaba.com", "punish", "verification", "security", "challenge", "slide to verify",
+    "nc_1_nocaptcha", "nc-container", "slidetounlock"
+]
+
+PADDING_ROW = ('<li class="item"><a href="/product-detail/item_{0}.html">Wholesale item {0}</a>'
+               '<span class="price">$1.{0:02d}</span><span class="moq">Min. order: 100 pieces</span></li>\n')
+
+
+def legacy_blocked(html_content):
+    html_lower = html_content.lower()
+    return any(indicator in html_lower for indicator in LEGACY_INDICATORS)
+
+
+def legacy_captcha_type(html_content):
+    html_lower = html_content.lower()
+    if "nc_1_nocaptcha" in html_content or "slidetounlock" in html_lower or "slide to verify" in html_lower:
+        return "alibaba_nocaptcha"
+    if "g-recaptcha" in html_content or "recaptcha" in html_lower:
+        return "recaptcha_v2"
+    if "hcaptcha" in html_lower:
+        return "hcaptcha"
+    if "captcha" in html_lower and ("img" in html_lower or "image" in html_lower):
+        return "image_captcha"
+    if "cloudflare" in html_lower or "cf-challenge" in html_lower:
+        return "cloudflare"
+    return "unknown"
+
+
+def legacy_verdict(html_content):
+    blocked = legacy_blocked(html_content)
+    return blocked, legacy_captcha_type(html_content) if blocked else "unknown"
+
+
+def load_fixtures(page_kb):
+    with open(os.path.join(FIXTURES_DIR, "labels.json"), "r", encoding="utf-8") as f:
+        labels = json.load(f)
+    pages = []
+    for name, label in sorted(labels.items()):
+        with open(os.path.join(FIXTURES_DIR, name), "rb") as f:
+            body = f.read()
+        padding = b""
+        row = 0
+        while len(body) + len(padding) < page_kb * 1024:
+            padding += PADDING_ROW.format(row % 100).encode("utf-8")
+            row += 1
+        # Padding goes before </body> so titles and scripts keep their place
+        body = body.replace(b"</body>", b"<ul>" + padding + b"</ul></body>", 1) if padding else body
+        pages.append((name, body, (label["blocked"], label["captcha_type"])))
+    return pages
+
+
+def run(name, classify, pages, rounds):
+    """Accuracy over the fixtures and pages per second over ``rounds`` passes"""
+    wrong = sorted(page for page, content, expected in pages if classify(content) != expected)
+    total_bytes = sum(len(content) for _, content, _ in pages)
+    started = time.perf_counter()
+    for _ in range(rounds):
+        for _, content, _ in pages:
+            classify(content)
+    elapsed = time.perf_counter() - started
+    return {
+        "classifier": name,
+        "accuracy": round(1 - len(wrong) / len(pages), 4),
+        "misclassified": wrong,
+        "pages_per_sec": round(rounds * len(pages) / elapsed, 1),
+        "mb_per_sec": round(rounds * total_bytes / elapsed / 1e6, 1),
+        "us_per_page": round(elapsed / (rounds * len(pages)) * 1e6, 1),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--page-kb", type=int, default=300, help="pad every page to this size (KiB)")
+    parser.add_argument("--rounds", type=int, default=20, help="passes over the fixtures for timing")
+    parser.add_argument("--output", help="also write the JSON report to this file")
+    args = parser.parse_args(argv)
+
+    raw_pages = load_fixtures(args.page_kb)
+    text_pages = [(name, body.decode("utf-8"), expected) for name, body, expected in raw_pages]
+
+    def compiled(content):
+        verdict = classify_page(content)
+        return verdict.blocked, verdict.captcha_type
+
+    report = {
+        "benchmark": "classifier",
+        "pages": len(raw_pages),
+        "page_kb": args.page_kb,
+        "rounds": args.rounds,
+        "results": [
+            run("compiled (bytes)", compiled, raw_pages, args.rounds),
+            run("compiled (text)", compiled, text_pages, args.rounds),
+            run("legacy substring scan", legacy_verdict, text_pages, args.rounds),
+        ],
+    }
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    return report
+
+
+if __name__ == "__main__":
+    main()
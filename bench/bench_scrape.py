@@ -0,0 +1,256 @@
+#!/usr/bin/env python3
+"""Offline benchmark for static fetching, parsing and extraction.
+
+Serves the saved pages in ``bench/corpus`` from a local HTTP stand-in
+(bench/server.py) and measures each phase in its own subprocess, so every
+phase reports its own peak RSS:
+
+- fetch: a static batch through ScraperEngine.run_batch (fetch + parse +
+  extraction), in pages/sec
+- parse: parse_document over the corpus, in ms/page
+- extract: each selector type over pre-parsed pages, in ms/page per selector
+- classify: the block page classifier over the raw pages, in ms/page
+
+The report is printed as JSON (and written to ``--output``) so runs can be
+compared.
+
+    python bench/bench_scrape.py --pages 500 --workers 16 --latency-ms 50 --page-kb 300
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.dirname(BENCH_DIR))
+sys.path.append(BENCH_DIR)
+
+from server import CorpusServer, load_corpus, pad_page
+
+PHASES = ("fetch", "parse", "extract", "classify")
+
+# Selectors that match the listing and detail pages of the corpus
+BENCH_SELECTORS = {
+    "tag_name": "h2",
+    "class_name": "search-card-e-price-main",
+    "id_name": "description",
+    "css_selector": ".search-card-item .search-card-e-title",
+    "xpath_selector": "//li[@class='item']/span[@class='attr-value']/text()",
+}
+
+
+def peak_rss_mb():
+    """Peak resident memory of this process so far, or None where it cannot be read"""
+    try:
+        import resource
+    except ImportError:
+        try:
+            import psutil
+            return round(psutil.Process().memory_info().peak_wset / 2 ** 20, 1)
+        except (ImportError, AttributeError):
+            return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Kilobytes on Linux, bytes on macOS
+    return round(peak / (2 ** 20 if sys.platform == "darwin" else 1024), 1)
+
+
+def _selectors():
+    from scraper_engine import SelectorSpec
+    spec = dict(BENCH_SELECTORS)
+    return SelectorSpec(tag=spec.pop("tag_name"), **spec)
+
+
+def _pages(args):
+    return [(name, pad_page(body, args.page_kb)) for name, body in load_corpus()]
+
+
+def _timings(samples):
+    """Mean and p95 of a list of seconds, in ms"""
+    ordered = sorted(samples)
+    return {
+        "mean": round(statistics.fmean(ordered) * 1000, 3),
+        "p95": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))] * 1000, 3),
+    }
+
+
+def run_fetch(args):
+    from scraper_engine import ScraperEngine, ScrapeJob
+    from scraper_parallel import ExtractionPool
+    from scraper_politeness import HostScheduler
+
+    pool = ExtractionPool(args.extraction_processes) if args.extraction_processes else None
+    engine = ScraperEngine(
+        scheduler=HostScheduler(rate=1e6, burst=10 ** 6, concurrency=args.workers, use_robots=False),
+        extraction_pool=pool,
+    )
+    job = ScrapeJob(url=args.base_url, selectors=_selectors(), use_cache=False, limit=None)
+    urls = [f"{args.base_url}/page/{i}" for i in range(args.pages)]
+    errors = 0
+    items = 0
+    try:
+        started = time.perf_counter()
+        for result in engine.run_batch((job.with_url(url) for url in urls), max_workers=args.workers):
+            if result.error:
+                errors += 1
+            items += sum(len(values) for values in result.results.values())
+        elapsed = time.perf_counter() - started
+    finally:
+        engine.close()
+        if pool is not None:
+            pool.close()
+    return {
+        "pages": args.pages,
+        "workers": args.workers,
+        "extraction_processes": args.extraction_processes,
+        "errors": errors,
+        "items": items,
+        "seconds": round(elapsed, 3),
+        "pages_per_sec": round(args.pages / elapsed, 1),
+    }
+
+
+def run_parse(args):
+    from scraper_extract import parse_document
+
+    pages = _pages(args)
+    samples = []
+    for _ in range(args.rounds):
+        for _, body in pages:
+            text = body.decode("utf-8")
+            started = time.perf_counter()
+            parse_document(text)
+            samples.append(time.perf_counter() - started)
+    return {
+        "pages": len(samples),
+        "mb": round(args.rounds * sum(len(body) for _, body in pages) / 1e6, 2),
+        "parse_ms_per_page": _timings(samples),
+        "pages_per_sec": round(len(samples) / sum(samples), 1),
+    }
+
+
+def run_extract(args):
+    from scraper_extract import compile_plan, iter_selector_items, parse_document
+
+    selectors = _selectors()
+    plan = compile_plan(selectors)
+    docs = [(f"http://bench.local/{name}", parse_document(body.decode("utf-8"))) for name, body in _pages(args)]
+    report = {}
+    for selector_type in plan.selector_types():
+        samples = []
+        items = 0
+        for _ in range(args.rounds):
+            for base_url, doc in docs:
+                started = time.perf_counter()
+                items += sum(1 for _ in iter_selector_items(doc, plan, selector_type, base_url, None, 0))
+                samples.append(time.perf_counter() - started)
+        report[selector_type] = {
+            "ms_per_page": _timings(samples),
+            "items_per_page": round(items / len(samples), 1),
+        }
+    return {"pages": len(docs), "extraction_ms_per_selector": report}
+
+
+def run_classify(args):
+    from scraper_classify import classify_page
+
+    pages = _pages(args)
+    samples = []
+    for _ in range(args.rounds):
+        for _, body in pages:
+            started = time.perf_counter()
+            classify_page(body)
+            samples.append(time.perf_counter() - started)
+    return {
+        "pages": len(samples),
+        "classify_ms_per_page": _timings(samples),
+        "blocked": sum(classify_page(body).blocked for _, body in pages),
+    }
+
+
+RUNNERS = {"fetch": run_fetch, "parse": run_parse, "extract": run_extract, "classify": run_classify}
+
+
+def run_phase(phase, args):
+    """Run one phase in a fresh interpreter so its peak RSS is its own"""
+    command = [sys.executable, os.path.abspath(__file__), "--phase", phase,
+               "--base-url", args.base_url or "", "--pages", str(args.pages), "--workers", str(args.workers),
+               "--rounds", str(args.rounds), "--extraction-processes", str(args.extraction_processes)]
+    if args.page_kb:
+        command += ["--page-kb", str(args.page_kb)]
+    completed = subprocess.run(command, capture_output=True, text=True)
+    if completed.returncode != 0:
+        raise Exception(f"Phase {phase} failed:\n{completed.stderr}")
+    return json.loads(completed.stdout)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Offline fetch/parse/extraction benchmark")
+    parser.add_argument("--phases", default=",".join(PHASES), help=f"comma-separated subset of {', '.join(PHASES)}")
+    parser.add_argument("--pages", type=int, default=200, help="URLs fetched by the fetch phase")
+    parser.add_argument("--workers", type=int, default=8, help="fetch threads")
+    parser.add_argument("--extraction-processes", type=int, default=0,
+                        help="extract in this many worker processes during the fetch phase (0 = in-thread)")
+    parser.add_argument("--rounds", type=int, default=10, help="passes over the corpus for parse/extract/classify")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="server delay before every response")
+    parser.add_argument("--jitter-ms", type=float, default=0.0, help="extra random server delay, up to this much")
+    parser.add_argument("--page-kb", type=int, help="pad every page to this size (KiB)")
+    parser.add_argument("--output", help="also write the JSON report to this file")
+    parser.add_argument("--phase", help=argparse.SUPPRESS)
+    parser.add_argument("--base-url", help=argparse.SUPPRESS)
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.phase:
+        # Child process: run one phase and report it on stdout
+        result = RUNNERS[args.phase](args)
+        result["peak_rss_mb"] = peak_rss_mb()
+        print(json.dumps(result))
+        return result
+
+    phases = [phase.strip() for phase in args.phases.split(",") if phase.strip()]
+    unknown = set(phases) - set(PHASES)
+    if unknown:
+        raise SystemExit(f"Unknown phases: {', '.join(sorted(unknown))}")
+
+    report = {
+        "benchmark": "scrape",
+        "started_at": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "settings": {
+            "pages": args.pages,
+            "workers": args.workers,
+            "extraction_processes": args.extraction_processes,
+            "rounds": args.rounds,
+            "latency_ms": args.latency_ms,
+            "jitter_ms": args.jitter_ms,
+            "page_kb": args.page_kb,
+            "selectors": BENCH_SELECTORS,
+        },
+        "phases": {},
+    }
+    with CorpusServer(latency_ms=args.latency_ms, jitter_ms=args.jitter_ms, page_kb=args.page_kb) as server:
+        args.base_url = server.base_url
+        report["corpus"] = {"pages": len(server.corpus), "kb": round(sum(len(b) for _, b in server.corpus) / 1024, 1)}
+        for phase in phases:
+            report["phases"][phase] = run_phase(phase, args)
+        report["server"] = {"requests": server.requests, "mb_sent": round(server.bytes_sent / 1e6, 2)}
+
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    return report
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""Local HTTP stand-in for the benchmark corpus.
+
+Serves the saved pages in ``bench/corpus`` with a configurable delay before
+each response and, optionally, padded to a target size. ``/page/<n>`` cycles
+through the corpus so a benchmark can request any number of distinct URLs;
+``/<file name>`` serves one page. ``/robots.txt`` is a 404, as on a site
+without one.
+
+    python bench/server.py --port 8000 --latency-ms 80 --page-kb 200
+"""
+
+import argparse
+import os
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import List, Optional
+
+CORPUS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "corpus")
+
+# Filler inserted before </body> when pages are padded to a size
+PADDING_ROW = ('<div class="search-card-item filler"><a class="search-card-e-title" href="/page/{0}"><h2>Filler item {0}'
+               '</h2></a><div class="search-card-e-price-main">$1.{1:02d}</div></div>\n')
+
+
+def load_corpus(corpus_dir=CORPUS_DIR) -> List[tuple]:
+    """(file name, page bytes) of every saved page, listings and details alike"""
+    pages = []
+    for name in sorted(os.listdir(corpus_dir)):
+        if name.endswith(".html"):
+            with open(os.path.join(corpus_dir, name), "rb") as f:
+                pages.append((name, f.read()))
+    return pages
+
+
+def pad_page(body: bytes, page_kb: Optional[int]) -> bytes:
+    """Grow a page to about ``page_kb`` KiB with listing-like markup"""
+    if not page_kb or len(body) >= page_kb * 1024:
+        return body
+    rows = []
+    size = len(body)
+    row = 0
+    while size < page_kb * 1024:
+        rows.append(PADDING_ROW.format(row, row % 100).encode("utf-8"))
+        size += len(rows[-1])
+        row += 1
+    return body.replace(b"</body>", b"".join(rows) + b"</body>", 1)
+
+
+class CorpusServer:
+    """ThreadingHTTPServer over the corpus; use as a context manager or call start()/stop()"""
+
+    def __init__(self, host="127.0.0.1", port=0, latency_ms=0.0, jitter_ms=0.0, page_kb=None,
+                 corpus_dir=CORPUS_DIR):
+        self.latency = latency_ms / 1000
+        self.jitter = jitter_ms / 1000
+        self.corpus = [(name, pad_page(body, page_kb)) for name, body in load_corpus(corpus_dir)]
+        self.by_name = dict(self.corpus)
+        self.requests = 0
+        self.bytes_sent = 0
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), self._handler())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def urls(self, count) -> List[str]:
+        return [f"{self.base_url}/page/{i}" for i in range(count)]
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                body = server.page_for(self.path)
+                if body is None:
+                    self.send_error(404)
+                    return
+                delay = server.latency + random.uniform(0, server.jitter)
+                if delay > 0:
+                    time.sleep(delay)
+                self.send_response(200)
+                self.send_header("Content-Type", "text/html; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+                with server._lock:
+                    server.requests += 1
+                    server.bytes_sent += len(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def page_for(self, path) -> Optional[bytes]:
+        path = path.split("?", 1)[0]
+        if path.startswith("/page/"):
+            try:
+                index = int(path[len("/page/"):])
+            except ValueError:
+                return None
+            return self.corpus[index % len(self.corpus)][1]
+        return self.by_name.get(path.lstrip("/"))
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve the benchmark corpus locally")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="delay before every response")
+    parser.add_argument("--jitter-ms", type=float, default=0.0, help="extra random delay, up to this much")
+    parser.add_argument("--page-kb", type=int, help="pad every page to this size (KiB)")
+    args = parser.parse_args(argv)
+
+    server = CorpusServer(args.host, args.port, args.latency_ms, args.jitter_ms, args.page_kb)
+    print(f"Serving {len(server.corpus)} pages at {server.base_url}/page/<n> (Ctrl+C to stop)")
+    try:
+        server._server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server._server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,409 @@
+"""asyncio dynamic engine: many pages on one Chromium and one event loop.
+
+AsyncScraperEngine keeps a background event loop with a single Playwright
+driver (``playwright.async_api``) and one Chromium per proxy. A dynamic batch
+is rendered by up to ``concurrency`` pages at once, bounded by a semaphore,
+while results are handed back to the calling thread as they finish. Single
+dynamic jobs (``run``) render on the same loop and browser, so the engine
+never starts the sync browser pool as well.
+"""
+
+import asyncio
+import queue
+import random
+import threading
+import time
+from itertools import chain
+from typing import Iterable, Iterator
+
+from scraper_blocking import install_blocking_async
+from scraper_classify import CAPTCHA_ALIBABA, CAPTCHA_IMAGE, classify_page
+from scraper_browser import CHROMIUM_ARGS, VIEWPORT
+from scraper_engine import PAUSE_POLL_INTERVAL, ScraperEngine, ScrapeJob, ScrapeResult, SelectorSpec
+from scraper_extract import compile_plan
+from scraper_interact import (
+    CAPTCHA_IMAGE_SELECTOR, CAPTCHA_INPUT_SELECTOR, CAPTCHA_RELOAD_WAIT, CAPTCHA_SUBMIT_WAIT, DYNAMIC_HEADERS,
+    NAVIGATION_TIMEOUT_MS, SLIDER_SELECTOR, SLIDER_SUCCESS_SELECTORS, SLIDER_TIMEOUT_MS, TOKEN_CAPTCHAS,
+    mouse_wander_points, navigation_wait, scroll_steps, slider_steps, token_injection_script,
+)
+from scraper_metrics import record_span, span
+from scraper_retry import check_response
+from scraper_readiness import LAZY_SCROLL_SCRIPT, LAZY_SCROLL_STEPS, LAZY_SETTLE_TIMEOUT, wait_until_ready_async
+
+
+class AsyncScraperEngine(ScraperEngine):
+    def __init__(self, on_event=None, stop_event=None, pool_size=10, concurrency=4, cache=None, scheduler=None,
+                 pause_event=None, extraction_pool=None, metrics=None):
+        super().__init__(on_event, stop_event, pool_size, cache, scheduler, pause_event, extraction_pool, metrics)
+        self.concurrency = concurrency
+        self._loop = None
+        self._loop_thread = None
+        self._playwright = None
+        self._browsers = {}
+        self._browser_lock = None
+        self.pages_rendered = 0
+        self.peak_in_flight = 0
+        self._in_flight = 0
+
+    def _ensure_loop(self):
+        """Start the background event loop on first use"""
+        with self._session_lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                self._loop_thread = threading.Thread(target=self._loop.run_forever, name="async-dynamic")
+                self._loop_thread.daemon = True
+                self._loop_thread.start()
+            return self._loop
+
+    def run_dynamic_batch(self, jobs: Iterable[ScrapeJob], concurrency=None) -> Iterator[ScrapeResult]:
+        """Render jobs concurrently on the shared event loop, yielding results as they finish"""
+        # Selector errors fail the whole batch before any page is opened
+        jobs = iter(jobs)
+        first = next(jobs, None)
+        if first is None:
+            return
+        compile_plan(first.selectors)
+        jobs = chain([first], jobs)
+
+        loop = self._ensure_loop()
+        results = queue.Queue()
+        finished = object()
+
+        async def produce():
+            try:
+                await self._render_all(jobs, concurrency or self.concurrency, results.put)
+            finally:
+                results.put(finished)
+
+        future = asyncio.run_coroutine_threadsafe(produce(), loop)
+        while True:
+            item = results.get()
+            if item is finished:
+                break
+            yield item
+        future.result()
+
+    def scrape_dynamic(self, job: ScrapeJob):
+        """Render one job on the shared event loop, so single pages and batches use the same browser"""
+        result = asyncio.run_coroutine_threadsafe(self.scrape_dynamic_async(job), self._ensure_loop()).result()
+        return result.results, result.html_content, result.links
+
+    async def with_retries_async(self, url, attempt_fn, policy=None):
+        """Async twin of ScraperEngine.with_retries"""
+        policy = policy or self.retry_policy
+        for attempt in range(policy.attempts):
+            self.breakers.check(url)
+            self.log(f"  Attempt {attempt + 1}/{policy.attempts}...\n")
+            try:
+                result = await attempt_fn(attempt)
+            except Exception as e:
+                delay = self._after_failure(url, e, attempt, policy)
+                if delay is None:
+                    raise
+                await asyncio.sleep(delay)
+                await self.scheduler.pace_async(url)
+                continue
+            self.breakers.record(url, ok=True)
+            return result
+
+    async def wait_if_paused_async(self):
+        """Async twin of wait_if_paused; other pages keep the loop while this one waits"""
+        while self.is_paused() and not self.should_stop():
+            await asyncio.sleep(PAUSE_POLL_INTERVAL)
+
+    async def _render_all(self, jobs, concurrency, put):
+        """Start a task per job while at most ``concurrency`` pages are open"""
+        semaphore = asyncio.Semaphore(concurrency)
+        tasks = set()
+        for job in jobs:
+            await semaphore.acquire()
+            await self.wait_if_paused_async()
+            if self.should_stop():
+                semaphore.release()
+                break
+            task = asyncio.create_task(self._render_one(job, semaphore, put))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+        if tasks:
+            await asyncio.gather(*tasks)
+
+    async def _render_one(self, job, semaphore, put):
+        self._in_flight += 1
+        self.peak_in_flight = max(self.peak_in_flight, self._in_flight)
+        try:
+            # Each task runs in its own copy of the context, so concurrent pages keep separate traces
+            with self.metrics.job(job.url, job.mode) as trace:
+                result = await self.scrape_dynamic_async(job)
+            self.log(f"  ⏱️ {trace.format()}\n")
+        except Exception as e:
+            result = ScrapeResult(job.url, job.mode, {}, "", error=str(e))
+        finally:
+            self._in_flight -= 1
+            semaphore.release()
+        put(result)
+
+    async def _get_browser(self, proxy_url):
+        """Return the shared Chromium for this proxy, launching it once"""
+        if self._browser_lock is None:
+            self._browser_lock = asyncio.Lock()
+        async with self._browser_lock:
+            browser = self._browsers.get(proxy_url)
+            if browser is not None and browser.is_connected():
+                return browser
+            if self._playwright is None:
+                self.log("  Initializing Playwright (async)...\n")
+                from playwright.async_api import async_playwright
+                self._playwright = await async_playwright().start()
+            self.log("  Launching Chromium browser with stealth mode...\n")
+            try:
+                with span("dynamic_launch"):
+                    browser = await self._playwright.chromium.launch(
+                        headless=True,
+                        proxy={"server": proxy_url} if proxy_url else None,
+                        args=CHROMIUM_ARGS,
+                    )
+            except Exception as e:
+                raise Exception(f"Failed to launch browser: {str(e)}")
+            self.log("  ✅ Browser launched with stealth mode.\n")
+            self._browsers[proxy_url] = browser
+            return browser
+
+    async def scrape_dynamic_async(self, job: ScrapeJob) -> ScrapeResult:
+        """Render one job in its own context of the shared browser"""
+        url = job.url
+        self.log(f"[DYNAMIC FETCH] {url}\n")
+        
+        try:
+            proxy_url = job.proxy_server()
+            if proxy_url:
+                self.log(f"  Using proxy: {proxy_url}\n")
+            
+            self.breakers.check(url)
+            browser = await self._get_browser(proxy_url)
+            context = await browser.new_context(user_agent=self.get_random_user_agent(), viewport=VIEWPORT)
+            try:
+                # Pages of one host share its rate and concurrency limits; other hosts render meanwhile
+                waited = await self.scheduler.acquire_async(url, proxy_url)
+                if waited > 0:
+                    self.log(f"  ⏳ Waited {waited:.1f}s for the host's rate limit\n")
+                try:
+                    page = await context.new_page()
+                    html_content = await self._scrape_page_async(job, page)
+                finally:
+                    self.scheduler.release_async(url)
+            finally:
+                try:
+                    await context.close()
+                except Exception:
+                    pass
+            self.pages_rendered += 1
+            
+            # Parsing is CPU work; keep the event loop free for the other pages
+            await self.wait_if_paused_async()
+            self.log("  Processing extracted content...\n")
+            results, links = await asyncio.to_thread(self.extract_job, job, html_content)
+            self.log("  ✅ Content processing completed.\n")
+            
+            return ScrapeResult(url, job.mode, results, html_content, links=links)
+        
+        except Exception as e:
+            error_msg = f"Dynamic scraping failed: {str(e)}"
+            self.log(f"  ❌ {error_msg}\n")
+            raise Exception(error_msg)
+    
+    async def solve_alibaba_nocaptcha_async(self, page, url):
+        """Async twin of ScraperEngine.solve_alibaba_nocaptcha"""
+        try:
+            self.log("  🎯 Detected Alibaba NoCaptcha slider\n")
+            self.log("  🤖 Attempting to solve with human-like behavior...\n")
+            try:
+                slider = await page.wait_for_selector(SLIDER_SELECTOR, timeout=SLIDER_TIMEOUT_MS)
+            except Exception:
+                slider = None
+            if not slider:
+                self.log("  ❌ Slider not found\n")
+                return False
+            slider_box = await slider.bounding_box()
+            if not slider_box:
+                self.log("  ❌ Could not get slider dimensions\n")
+                return False
+            
+            approach, drag = slider_steps(slider_box)
+            self.log("  🖱️ Moving mouse to slider, clicking and holding...\n")
+            await self._mouse_steps_async(page, approach)
+            self.log("  🖱️ Dragging slider...\n")
+            await self._mouse_steps_async(page, drag)
+            self.log("  ✅ Slider drag completed\n")
+            
+            self.log("  ⏳ Waiting for verification...\n")
+            await asyncio.sleep(random.uniform(2, 4))
+            try:
+                for indicator in SLIDER_SUCCESS_SELECTORS:
+                    if await page.query_selector(indicator):
+                        return self._slider_verified(True)
+                return self._slider_verified(False, await page.content())
+            except Exception as e:
+                self.log(f"  ⚠️ Verification check failed: {str(e)}\n")
+                return True  # Continue anyway
+        except Exception as e:
+            self.log(f"  ❌ Alibaba NoCaptcha solving failed: {str(e)}\n")
+            return False
+
+    async def _mouse_steps_async(self, page, steps):
+        for step in steps:
+            if step.action == "down":
+                await page.mouse.down()
+            elif step.action == "up":
+                await page.mouse.up()
+            else:
+                await page.mouse.move(step.x, step.y)
+            await asyncio.sleep(step.pause)
+
+    async def _scrape_page_async(self, job: ScrapeJob, page):
+        """Async twin of ScraperEngine._scrape_page"""
+        url = job.url
+        
+        try:
+            for script in self._init_scripts(url):
+                await page.add_init_script(script)
+            await page.set_extra_http_headers(DYNAMIC_HEADERS)
+            block_stats = await install_blocking_async(page, job.resource_policy())
+            self.log("  ✅ Page created with stealth settings.\n")
+        except Exception as e:
+            raise Exception(f"Failed to create page: {str(e)}")
+        
+        self.log("  Navigating to page...\n")
+        
+        async def navigate(attempt):
+            with span("dynamic_goto"):
+                response = await page.goto(url, timeout=NAVIGATION_TIMEOUT_MS, wait_until=navigation_wait(attempt))
+            check_response(response)
+            self.log(f"  ✅ Page loaded successfully (attempt {attempt + 1})\n")
+        
+        await self.with_retries_async(url, navigate)
+        
+        await self.wait_if_paused_async()
+        self.log("  Waiting for dynamic content to load...\n")
+        with span("dynamic_readiness"):
+            ready, waited = await wait_until_ready_async(page, job.selectors, job.quiet_ms, job.ready_timeout)
+        self._log_readiness(ready, waited)
+        
+        scroll_started = time.perf_counter()
+        if job.simulate_human:
+            await self._simulate_human_async(page)
+        else:
+            await self._lazy_scroll_async(job, page)
+        record_span("dynamic_scroll", time.perf_counter() - scroll_started)
+        
+        self.log("  Extracting page content...\n")
+        try:
+            with span("dynamic_content"):
+                html_content = await page.content()
+            self._log_content(html_content, block_stats)
+            return await self._handle_captcha_async(job, page, html_content)
+        except Exception as e:
+            raise Exception(f"Failed to extract content: {str(e)}")
+    
+    async def _simulate_human_async(self, page):
+        try:
+            self.log("  Simulating human-like scrolling...\n")
+            for position, pause in scroll_steps(await page.evaluate("document.body.scrollHeight")):
+                await page.evaluate(f"window.scrollTo(0, {position})")
+                await asyncio.sleep(pause)
+            try:
+                for x, y in mouse_wander_points():
+                    await page.mouse.move(x, y)
+                    await asyncio.sleep(random.uniform(0.5, 1.5))
+            except Exception:
+                pass
+            self.log("  ✅ Human-like behavior simulation completed.\n")
+        except Exception as e:
+            self.log(f"  ⚠️ Scrolling simulation failed: {str(e)[:50]}...\n")
+    
+    async def _lazy_scroll_async(self, job: ScrapeJob, page):
+        try:
+            await page.evaluate(LAZY_SCROLL_SCRIPT, LAZY_SCROLL_STEPS)
+            await wait_until_ready_async(page, SelectorSpec(), job.quiet_ms, min(LAZY_SETTLE_TIMEOUT, job.ready_timeout))
+        except Exception as e:
+            self.log(f"  ⚠️ Lazy-load scroll failed: {str(e)[:50]}...\n")
+    
+    async def _handle_captcha_async(self, job: ScrapeJob, page, html_content):
+        verdict = classify_page(html_content)
+        if not verdict.blocked:
+            return html_content
+        captcha_type = self._log_blocked(verdict)
+        
+        captcha_solved = False
+        if captcha_type == CAPTCHA_ALIBABA:
+            self.log("  🎯 Attempting to solve Alibaba NoCaptcha slider...\n")
+            captcha_solved = await self.solve_alibaba_nocaptcha_async(page, job.url)
+            if captcha_solved:
+                await asyncio.sleep(3)
+                html_content = await page.content()
+                self._log_slider_outcome(html_content)
+        elif job.captcha_key():
+            self.log("  🔐 Attempting to solve captcha with 2Captcha...\n")
+            captcha_solved = await self._solve_with_2captcha_async(job, page, captcha_type, html_content)
+            if captcha_solved:
+                await asyncio.sleep(CAPTCHA_SUBMIT_WAIT)
+                await page.reload()
+                await asyncio.sleep(CAPTCHA_RELOAD_WAIT)
+                html_content = await page.content()
+                self.log("  🔄 Page reloaded after captcha solution\n")
+            else:
+                self.log("  ⚠️ Could not solve captcha automatically\n")
+        
+        if not captcha_solved:
+            self._log_captcha_advice(captcha_type)
+        return html_content
+    
+    async def _solve_with_2captcha_async(self, job: ScrapeJob, page, captcha_type, html_content):
+        # The 2Captcha client blocks while it polls; other pages keep the loop meanwhile
+        try:
+            if captcha_type in TOKEN_CAPTCHAS:
+                site_key = self._site_key(captcha_type, html_content)
+                solution = site_key and await asyncio.to_thread(
+                    self.solve_2captcha, job.captcha_key(), captcha_type, job.url, site_key)
+                if solution:
+                    await page.evaluate(token_injection_script(captcha_type, solution))
+                    return self._captcha_answered(captcha_type)
+            elif captcha_type == CAPTCHA_IMAGE:
+                captcha_img = await page.query_selector(CAPTCHA_IMAGE_SELECTOR)
+                if captcha_img:
+                    img_data = await captcha_img.screenshot()
+                    solution = await asyncio.to_thread(self.solve_2captcha, job.captcha_key(), "image", job.url, None, img_data)
+                    input_field = solution and await page.query_selector(CAPTCHA_INPUT_SELECTOR)
+                    if input_field:
+                        await input_field.fill(solution)
+                        return self._captcha_answered(captcha_type)
+        except Exception as e:
+            self.log(f"  ❌ {self._captcha_name(captcha_type)} solving failed: {str(e)}\n")
+        return False
+    
+    async def _shutdown(self):
+        for browser in self._browsers.values():
+            try:
+                await browser.close()
+            except Exception:
+                pass
+        self._browsers = {}
+        if self._playwright is not None:
+            try:
+                await self._playwright.stop()
+            except Exception:
+                pass
+            self._playwright = None
+
+    def close(self):
+        """Close the async browsers and stop the event loop, then the sync resources"""
+        with self._session_lock:
+            loop, self._loop = self._loop, None
+        if loop is not None:
+            try:
+                asyncio.run_coroutine_threadsafe(self._shutdown(), loop).result(timeout=30)
+            except Exception:
+                pass
+            loop.call_soon_threadsafe(loop.stop)
+            self._loop_thread.join(timeout=10)
+            loop.close()
+        super().close()
@@ -0,0 +1,157 @@
+"""Resource blocking for dynamic-mode page loads.
+
+Extraction needs the DOM and the image URLs, not the image bytes, fonts,
+media or third-party analytics. A BlockPolicy is installed on a page with
+``page.route`` and aborts requests by Playwright resource type and by URL
+pattern; anything that looks like a captcha is always let through so the
+solvers can still screenshot and drag it. Sites that need a lighter touch
+get a per-domain preset.
+
+Aborted requests never reach the network, so their size is unknown. Each
+page reports how many requests were blocked (per type) next to how many
+were loaded and their bytes.
+"""
+
+import re
+from dataclasses import dataclass, field
+from typing import Dict, FrozenSet, Optional, Tuple
+from urllib.parse import urlsplit
+
+
+# Resource types aborted by default
+BLOCKED_RESOURCE_TYPES = frozenset({'image', 'media', 'font', 'stylesheet'})
+
+# Third-party analytics, ads and tag managers
+TRACKER_PATTERNS = (
+    r'google-analytics\.com',
+    r'googletagmanager\.com',
+    r'doubleclick\.net',
+    r'googlesyndication\.com',
+    r'facebook\.net',
+    r'connect\.facebook\.com',
+    r'hotjar\.com',
+    r'clarity\.ms',
+    r'scorecardresearch\.com',
+    r'/collect\?',
+    r'/beacon',
+)
+
+# Never blocked: captcha widgets and their images
+ALLOW_PATTERNS = (
+    r'captcha',
+    r'gstatic\.com/recaptcha',
+    r'/punish',
+)
+
+
+@dataclass(frozen=True)
+class BlockPolicy:
+    """Which requests a page may make"""
+    resource_types: FrozenSet[str] = BLOCKED_RESOURCE_TYPES
+    url_patterns: Tuple[str, ...] = TRACKER_PATTERNS
+    allow_patterns: Tuple[str, ...] = ALLOW_PATTERNS
+
+    def __post_init__(self):
+        # Compiled once; the route handler runs for every request of the page
+        object.__setattr__(self, '_blocked_re', _union(self.url_patterns))
+        object.__setattr__(self, '_allowed_re', _union(self.allow_patterns))
+
+    def should_block(self, resource_type, url) -> bool:
+        """Decide one request; documents (the page itself and frames) always load"""
+        if resource_type == 'document':
+            return False
+        if self._allowed_re is not None and self._allowed_re.search(url):
+            return False
+        if resource_type in self.resource_types:
+            return True
+        return self._blocked_re is not None and self._blocked_re.search(url) is not None
+
+
+def _union(patterns):
+    return re.compile('|'.join(f'(?:{p})' for p in patterns), re.IGNORECASE) if patterns else None
+
+
+DEFAULT_BLOCK_POLICY = BlockPolicy()
+
+# Per-domain presets, matched on the host suffix. Alibaba's slider captcha is
+# laid out by its stylesheets, so those sites keep CSS.
+DOMAIN_PRESETS: Dict[str, BlockPolicy] = {
+    'alibaba.com': BlockPolicy(resource_types=frozenset({'image', 'media', 'font'})),
+    'aliexpress.com': BlockPolicy(resource_types=frozenset({'image', 'media', 'font'})),
+    '1688.com': BlockPolicy(resource_types=frozenset({'image', 'media', 'font'})),
+    'taobao.com': BlockPolicy(resource_types=frozenset({'image', 'media', 'font'})),
+    'tmall.com': BlockPolicy(resource_types=frozenset({'image', 'media', 'font'})),
+}
+
+
+def policy_for_url(url, presets=None, default=DEFAULT_BLOCK_POLICY) -> BlockPolicy:
+    """The preset for the URL's domain, or the default policy"""
+    host = (urlsplit(url).hostname or '').lower()
+    for domain, policy in (presets if presets is not None else DOMAIN_PRESETS).items():
+        if host == domain or host.endswith('.' + domain):
+            return policy
+    return default
+
+
+@dataclass
+class BlockStats:
+    """Requests blocked and loaded while rendering one page"""
+    blocked: Dict[str, int] = field(default_factory=dict)
+    loaded: int = 0
+    loaded_bytes: int = 0
+
+    @property
+    def blocked_total(self):
+        return sum(self.blocked.values())
+
+    def on_response(self, response):
+        """page.on('response') listener counting what was actually loaded"""
+        self.loaded += 1
+        try:
+            self.loaded_bytes += int(response.headers.get('content-length', 0))
+        except ValueError:
+            pass
+
+    def format(self):
+        """One-line summary for the log"""
+        by_type = ", ".join(f"{kind} {count}" for kind, count in sorted(self.blocked.items()))
+        return (f"blocked {self.blocked_total} requests ({by_type or 'none'}), "
+                f"loaded {self.loaded} / {self.loaded_bytes / 1024:.1f} KB")
+
+
+def install_blocking(page, policy: Optional[BlockPolicy]) -> BlockStats:
+    """Route every request of a sync page through ``policy``"""
+    stats = BlockStats()
+    page.on('response', stats.on_response)
+    if policy is None:
+        return stats
+
+    def handle(route):
+        request = route.request
+        if policy.should_block(request.resource_type, request.url):
+            stats.blocked[request.resource_type] = stats.blocked.get(request.resource_type, 0) + 1
+            route.abort()
+        else:
+            route.continue_()
+
+    page.route('**/*', handle)
+    return stats
+
+
+async def install_blocking_async(page, policy: Optional[BlockPolicy]) -> BlockStats:
+    """Async twin of install_blocking"""
+    stats = BlockStats()
+    page.on('response', stats.on_response)
+    if policy is None:
+        return stats
+
+    async def handle(route):
+        request = route.request
+        if policy.should_block(request.resource_type, request.url):
+            stats.blocked[request.resource_type] = stats.blocked.get(request.resource_type, 0) + 1
+            await route.abort()
+        else:
+            await route.continue_()
+
+    await page.route('**/*', handle)
+    return stats
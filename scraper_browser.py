@@ -0,0 +1,231 @@
+"""Persistent Playwright browser pool for dynamic mode.
+
+Playwright's sync API is bound to the thread that started it, so each pool
+slot is a long-lived thread that owns its own Playwright driver and Chromium.
+Jobs are callables that receive a fresh page in a fresh browser context; the
+context is closed after every job and the browser itself is relaunched after
+``max_uses`` contexts to keep memory in check.
+"""
+
+import contextvars
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Callable, Optional
+
+from scraper_metrics import span
+
+
+# Launch arguments for the stealth Chromium used by dynamic mode
+CHROMIUM_ARGS = [
+    '--no-sandbox',
+    '--disable-dev-shm-usage',
+    '--disable-gpu',
+    '--disable-web-security',
+    '--disable-features=VizDisplayCompositor',
+    '--disable-blink-features=AutomationControlled',
+    '--disable-extensions',
+    '--no-first-run',
+    '--disable-default-apps',
+    '--disable-background-timer-throttling',
+    '--disable-backgrounding-occluded-windows',
+    '--disable-renderer-backgrounding',
+    '--disable-ipc-flooding-protection',
+    '--disable-hang-monitor',
+    '--disable-prompt-on-repost',
+    '--disable-sync',
+    '--disable-translate',
+    '--disable-logging',
+    '--disable-permissions-api',
+    '--disable-plugins-discovery',
+    '--disable-preconnect',
+    '--disable-print-preview',
+    '--disable-speech-api',
+    '--disable-web-resources',
+    '--hide-scrollbars',
+    '--mute-audio',
+    '--no-default-browser-check',
+    '--no-pings',
+    '--no-zygote',
+    '--disable-background-networking',
+    '--disable-component-extensions-with-background-pages',
+    '--disable-domain-reliability',
+    '--disable-features=TranslateUI',
+    '--disable-client-side-phishing-detection',
+    '--disable-sync-preferences',
+    '--disable-features=TranslateUI,BlinkGenPropertyTrees',
+]
+
+# Realistic viewport and screen resolution for every context
+VIEWPORT = {"width": 1920, "height": 1080}
+
+
+class BrowserPool:
+    def __init__(self, size=1, max_uses=50, on_log: Optional[Callable[[str], None]] = None):
+        self.max_uses = max_uses
+        self.on_log = on_log
+        self._queue = queue.Queue()
+        self._threads = []
+        self._lock = threading.Lock()
+        self._closed = False
+        self._stats = {
+            'launches': 0,
+            'recycles': 0,
+            'contexts': 0,
+            'jobs_ok': 0,
+            'jobs_failed': 0,
+            'launch_seconds': 0.0,
+        }
+        self._browsers = 0
+        self.ensure_size(size)
+
+    def log(self, message):
+        """Report a progress line"""
+        if self.on_log is not None:
+            self.on_log(message)
+
+    def ensure_size(self, size):
+        """Grow the pool to at least ``size`` browsers (it never shrinks)"""
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("Browser pool is closed")
+            while len(self._threads) < size:
+                thread = threading.Thread(target=self._slot_main, name=f"browser-slot-{len(self._threads)}")
+                thread.daemon = True
+                self._threads.append(thread)
+                thread.start()
+
+    @property
+    def size(self):
+        return len(self._threads)
+
+    def submit(self, fn, proxy=None, user_agent=None) -> Future:
+        """Queue ``fn(page)`` for the next free browser"""
+        if self._closed:
+            raise RuntimeError("Browser pool is closed")
+        future = Future()
+        # The caller's context travels with the job, so its metrics trace sees the launch and the page
+        self._queue.put((fn, proxy, user_agent, future, contextvars.copy_context()))
+        return future
+
+    def run(self, fn, proxy=None, user_agent=None):
+        """Run ``fn(page)`` on a pooled browser and return its result"""
+        return self.submit(fn, proxy, user_agent).result()
+
+    def stats(self):
+        """Snapshot of pool counters"""
+        with self._lock:
+            stats = dict(self._stats)
+            stats['size'] = len(self._threads)
+            stats['browsers'] = self._browsers
+            stats['queued'] = self._queue.qsize()
+        return stats
+
+    def format_stats(self):
+        """One-line summary of the pool counters"""
+        s = self.stats()
+        return (f"{s['browsers']}/{s['size']} browsers, {s['launches']} launches, "
+                f"{s['recycles']} recycles, {s['contexts']} contexts, "
+                f"{s['jobs_ok']} ok / {s['jobs_failed']} failed")
+
+    def close(self):
+        """Stop every slot and close its browser"""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            threads = list(self._threads)
+        for _ in threads:
+            self._queue.put(None)
+        for thread in threads:
+            thread.join(timeout=10)
+
+    def _count(self, key, amount=1):
+        with self._lock:
+            self._stats[key] += amount
+
+    def _slot_main(self):
+        """Own one Playwright driver and browser for the life of the pool"""
+        playwright_instance = None
+        browser = None
+        browser_proxy = None
+        uses = 0
+
+        while True:
+            item = self._queue.get()
+            if item is None:
+                break
+            fn, proxy, user_agent, future, caller_context = item
+            if not future.set_running_or_notify_cancel():
+                continue
+
+            try:
+                if playwright_instance is None:
+                    self.log("  Initializing Playwright...\n")
+                    # Imported on first use: loading Playwright slows down every start otherwise
+                    from playwright.sync_api import sync_playwright
+                    playwright_instance = sync_playwright().start()
+
+                # Relaunch when the proxy changes, the browser died or it has served enough contexts
+                if browser is not None and (browser_proxy != proxy or uses >= self.max_uses or not browser.is_connected()):
+                    self._close_browser(browser)
+                    browser = None
+                    self._count('recycles')
+                if browser is None:
+                    browser = caller_context.run(self._launch, playwright_instance, proxy)
+                    browser_proxy = proxy
+                    uses = 0
+
+                uses += 1
+                self._count('contexts')
+                context = browser.new_context(user_agent=user_agent, viewport=VIEWPORT)
+                try:
+                    result = caller_context.run(fn, context.new_page())
+                finally:
+                    try:
+                        context.close()
+                    except Exception:
+                        pass
+            except BaseException as e:
+                self._count('jobs_failed')
+                future.set_exception(e)
+            else:
+                self._count('jobs_ok')
+                future.set_result(result)
+
+        if browser is not None:
+            self._close_browser(browser)
+        if playwright_instance is not None:
+            try:
+                playwright_instance.stop()
+            except Exception:
+                pass
+
+    def _launch(self, playwright_instance, proxy):
+        """Launch a stealth Chromium, optionally behind a proxy"""
+        self.log("  Launching Chromium browser with stealth mode...\n")
+        started = time.perf_counter()
+        try:
+            with span("dynamic_launch"):
+                browser = playwright_instance.chromium.launch(
+                    headless=True,
+                    proxy={"server": proxy} if proxy else None,
+                    args=CHROMIUM_ARGS,
+                )
+        except Exception as e:
+            raise Exception(f"Failed to launch browser: {str(e)}")
+        with self._lock:
+            self._stats['launches'] += 1
+            self._stats['launch_seconds'] += time.perf_counter() - started
+            self._browsers += 1
+        self.log("  ✅ Browser launched with stealth mode.\n")
+        return browser
+
+    def _close_browser(self, browser):
+        with self._lock:
+            self._browsers -= 1
+        try:
+            browser.close()
+        except Exception:
+            pass
@@ -0,0 +1,236 @@
+"""Persistent HTTP response cache for static mode.
+
+Responses are stored in SQLite, keyed by the normalized URL plus the request
+headers that change the representation, with zlib-compressed bodies.
+Freshness follows ``Cache-Control`` (``max-age``, ``no-cache``, ``no-store``)
+and ``Expires``, falling back to a default TTL. Stale entries that carry an
+``ETag`` or ``Last-Modified`` are revalidated with a conditional request, and
+a ``304 Not Modified`` reuses the stored body.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+import zlib
+from dataclasses import dataclass, field
+from email.utils import parsedate_to_datetime
+from typing import Dict, Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+
+# Lifetime of responses that carry no caching directives of their own
+DEFAULT_CACHE_TTL = 300
+
+# Entries kept by prune(), newest first
+CACHE_MAX_ENTRIES = 5000
+
+CACHE_PATH = os.path.join(tempfile.gettempdir(), "scraper_http_cache.sqlite")
+
+# Request headers that select a different representation of the same URL
+KEY_HEADERS = ('Accept', 'Accept-Language')
+
+# Response headers worth keeping with the body
+STORED_HEADERS = ('Content-Type', 'ETag', 'Last-Modified', 'Cache-Control', 'Expires')
+
+_DEFAULT_PORTS = {'http': 80, 'https': 443}
+
+
+def normalize_url(url) -> str:
+    """Lowercase scheme and host, drop default ports and fragments, sort the query"""
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or '').lower()
+    if parts.port and parts.port != _DEFAULT_PORTS.get(scheme):
+        host = f"{host}:{parts.port}"
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    return urlunsplit((scheme, host, parts.path or '/', query, ''))
+
+
+def cache_key(url, headers=None) -> str:
+    """Key for a URL as requested with ``headers``"""
+    headers = {k.lower(): v for k, v in (headers or {}).items()}
+    selected = [f"{name.lower()}={headers.get(name.lower(), '')}" for name in KEY_HEADERS]
+    return hashlib.sha256("\n".join([normalize_url(url)] + selected).encode('utf-8')).hexdigest()
+
+
+def cache_directives(value) -> Dict[str, Optional[str]]:
+    """Parse a Cache-Control header into {directive: argument}"""
+    directives = {}
+    for part in (value or '').split(','):
+        name, _, argument = part.strip().partition('=')
+        if name:
+            directives[name.lower()] = argument.strip('"') or None
+    return directives
+
+
+def freshness_lifetime(headers, default_ttl=DEFAULT_CACHE_TTL) -> float:
+    """Seconds a response may be served without revalidation"""
+    directives = cache_directives(headers.get('Cache-Control'))
+    if 'no-cache' in directives:
+        return 0
+    if directives.get('max-age'):
+        try:
+            return max(0, int(directives['max-age']))
+        except ValueError:
+            return 0
+    if headers.get('Expires'):
+        try:
+            return max(0, parsedate_to_datetime(headers['Expires']).timestamp() - time.time())
+        except (TypeError, ValueError):
+            # An unparsable Expires means "already expired"
+            return 0
+    return default_ttl
+
+
+@dataclass
+class CachedResponse:
+    """A stored response and the validators needed to revalidate it"""
+    key: str
+    url: str
+    body: bytes
+    encoding: Optional[str]
+    headers: Dict[str, str] = field(default_factory=dict)
+    stored_at: float = 0.0
+    expires_at: float = 0.0
+
+    @property
+    def text(self) -> str:
+        return self.body.decode(self.encoding or 'utf-8', errors='replace')
+
+    def is_fresh(self, now=None) -> bool:
+        return (now or time.time()) < self.expires_at
+
+    def validators(self) -> Dict[str, str]:
+        """Conditional request headers for revalidation"""
+        headers = {}
+        if self.headers.get('ETag'):
+            headers['If-None-Match'] = self.headers['ETag']
+        if self.headers.get('Last-Modified'):
+            headers['If-Modified-Since'] = self.headers['Last-Modified']
+        return headers
+
+
+class ResponseCache:
+    def __init__(self, path=CACHE_PATH, default_ttl=DEFAULT_CACHE_TTL):
+        self.path = path
+        self.default_ttl = default_ttl
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            " key TEXT PRIMARY KEY, url TEXT, body BLOB, encoding TEXT,"
+            " headers TEXT, stored_at REAL, expires_at REAL)"
+        )
+        self._db.commit()
+        self._stats = {
+            'hits': 0,
+            'revalidated': 0,
+            'misses': 0,
+            'stores': 0,
+            'bytes_saved': 0,
+        }
+
+    def lookup(self, url, headers=None) -> Optional[CachedResponse]:
+        """Stored response for a request, fresh or not"""
+        key = cache_key(url, headers)
+        with self._lock:
+            row = self._db.execute(
+                "SELECT url, body, encoding, headers, stored_at, expires_at FROM responses WHERE key = ?",
+                (key,),
+            ).fetchone()
+        if row is None:
+            return None
+        stored_url, body, encoding, stored_headers, stored_at, expires_at = row
+        try:
+            body = zlib.decompress(body)
+        except zlib.error:
+            return None
+        return CachedResponse(key, stored_url, body, encoding, json.loads(stored_headers), stored_at, expires_at)
+
+    def store(self, url, headers, response, body=None, encoding=None) -> Optional[CachedResponse]:
+        """Store a 200 response unless its headers forbid it
+
+        ``body`` and ``encoding`` are given when the response was streamed and
+        its content has already been consumed.
+        """
+        directives = cache_directives(response.headers.get('Cache-Control'))
+        if response.status_code != 200 or 'no-store' in directives or response.headers.get('Vary') == '*':
+            return None
+        if body is None:
+            body, encoding = response.content, response.encoding or response.apparent_encoding
+        now = time.time()
+        entry = CachedResponse(
+            key=cache_key(url, headers),
+            url=url,
+            body=body,
+            encoding=encoding,
+            headers={name: response.headers[name] for name in STORED_HEADERS if name in response.headers},
+            stored_at=now,
+        )
+        entry.expires_at = now + freshness_lifetime(entry.headers, self.default_ttl)
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (entry.key, entry.url, zlib.compress(entry.body), entry.encoding,
+                 json.dumps(entry.headers), entry.stored_at, entry.expires_at),
+            )
+            self._db.commit()
+            self._stats['stores'] += 1
+        return entry
+
+    def refresh(self, entry: CachedResponse, response) -> CachedResponse:
+        """Extend a stored entry after a 304, taking over any updated headers"""
+        for name in STORED_HEADERS:
+            if name in response.headers:
+                entry.headers[name] = response.headers[name]
+        now = time.time()
+        entry.expires_at = now + freshness_lifetime(entry.headers, self.default_ttl)
+        with self._lock:
+            self._db.execute(
+                "UPDATE responses SET headers = ?, expires_at = ? WHERE key = ?",
+                (json.dumps(entry.headers), entry.expires_at, entry.key),
+            )
+            self._db.commit()
+        return entry
+
+    def record(self, outcome, saved_bytes=0):
+        """Count a 'hits', 'revalidated' or 'misses' outcome"""
+        with self._lock:
+            self._stats[outcome] += 1
+            self._stats['bytes_saved'] += saved_bytes
+
+    def stats(self):
+        """Snapshot of cache counters"""
+        with self._lock:
+            return dict(self._stats)
+
+    def format_stats(self):
+        """One-line summary of the cache counters"""
+        s = self.stats()
+        return (f"{s['hits']} hits, {s['revalidated']} revalidated, {s['misses']} misses, "
+                f"{s['bytes_saved'] / 1024:.1f} KB saved")
+
+    def prune(self, max_entries=CACHE_MAX_ENTRIES):
+        """Drop all but the newest ``max_entries`` responses"""
+        with self._lock:
+            self._db.execute(
+                "DELETE FROM responses WHERE key NOT IN "
+                "(SELECT key FROM responses ORDER BY stored_at DESC LIMIT ?)",
+                (max_entries,),
+            )
+            self._db.commit()
+
+    def clear(self):
+        """Forget every stored response"""
+        with self._lock:
+            self._db.execute("DELETE FROM responses")
+            self._db.commit()
+
+    def close(self):
+        with self._lock:
+            self._db.close()
@@ -0,0 +1,183 @@
+"""Crash-safe progress for batch and crawl jobs.
+
+A job's URLs are kept in SQLite with their state: pending, done (with the
+page's results when they stay in memory) or failed (with the error). Every page is committed as soon as it finishes, so after a crash or
+a closed window the same job can continue with only what was left.
+
+A job is identified by a key over the settings that decide its output (mode,
+selectors, item range, seed URLs, crawl limits); starting the same job again
+finds its checkpoint. A job that runs to the end removes its rows.
+
+A page is marked done only after its records were flushed to the export
+file, so only the unfinished pages can have partial records there; on
+resume those are removed (``drop_unfinished`` in scraper_export) before the
+pages are fetched again.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+
+CHECKPOINT_PATH = os.path.join(tempfile.gettempdir(), "scraper_checkpoint.sqlite")
+
+# URL states
+STATE_PENDING = "pending"
+STATE_DONE = "done"
+STATE_FAILED = "failed"
+
+
+def job_key(*settings) -> str:
+    """Stable id for a job from the settings that decide its output"""
+    return hashlib.sha256(repr(settings).encode('utf-8')).hexdigest()[:32]
+
+
+class JobCheckpoint:
+    def __init__(self, job_id, path=CHECKPOINT_PATH):
+        self.job_id = job_id
+        self.path = path
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        # WAL with NORMAL sync survives a process crash; only a power loss can drop the last commits
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS job_urls ("
+            " job_id TEXT, url TEXT, state TEXT, depth INTEGER, attempts INTEGER DEFAULT 0,"
+            " results TEXT, error TEXT, updated_at REAL,"
+            " PRIMARY KEY (job_id, url))"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS job_urls_state ON job_urls (job_id, state)")
+        self._db.commit()
+
+    def exists(self) -> bool:
+        """Whether an earlier run of this job left progress behind"""
+        with self._lock:
+            return self._db.execute("SELECT 1 FROM job_urls WHERE job_id = ? LIMIT 1", (self.job_id,)).fetchone() is not None
+
+    def counts(self) -> Dict[str, int]:
+        """URLs per state"""
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT state, COUNT(*) FROM job_urls WHERE job_id = ? GROUP BY state", (self.job_id,)
+            ).fetchall()
+        counts = {STATE_PENDING: 0, STATE_DONE: 0, STATE_FAILED: 0}
+        counts.update(rows)
+        return counts
+
+    def add_pending(self, urls: Iterable[str], depth=0) -> int:
+        """Record URLs still to fetch; URLs already known keep their state"""
+        now = time.time()
+        with self._lock:
+            before = self._db.total_changes
+            self._db.executemany(
+                "INSERT OR IGNORE INTO job_urls (job_id, url, state, depth, updated_at) VALUES (?, ?, ?, ?, ?)",
+                ((self.job_id, url, STATE_PENDING, depth, now) for url in urls),
+            )
+            self._db.commit()
+            return self._db.total_changes - before
+
+    def pending(self) -> List[Tuple[str, int]]:
+        """(url, depth) still to fetch, shallowest and oldest first"""
+        with self._lock:
+            return self._db.execute(
+                "SELECT url, depth FROM job_urls WHERE job_id = ? AND state = ? ORDER BY depth, rowid",
+                (self.job_id, STATE_PENDING),
+            ).fetchall()
+
+    def iter_urls(self, batch_size=10000) -> Iterator[Tuple[str, str, int]]:
+        """(url, state, depth) of every URL of the job, read in batches"""
+        last = 0
+        while True:
+            with self._lock:
+                rows = self._db.execute(
+                    "SELECT rowid, url, state, depth FROM job_urls WHERE job_id = ? AND rowid > ? ORDER BY rowid LIMIT ?",
+                    (self.job_id, last, batch_size),
+                ).fetchall()
+            if not rows:
+                return
+            for _, url, state, depth in rows:
+                yield url, state, depth
+            last = rows[-1][0]
+
+    def requeue_failed(self) -> int:
+        """Give failed URLs another try on resume"""
+        with self._lock:
+            cursor = self._db.execute(
+                "UPDATE job_urls SET state = ? WHERE job_id = ? AND state = ?",
+                (STATE_PENDING, self.job_id, STATE_FAILED),
+            )
+            self._db.commit()
+            return cursor.rowcount
+
+    def mark_done(self, url, results=None):
+        """Record a finished page; ``results`` are kept when items stay in memory rather than in an export file"""
+        self._finish_url(url, STATE_DONE, json.dumps(results, ensure_ascii=False) if results is not None else None,
+                         None)
+
+    def mark_failed(self, url, error):
+        self._finish_url(url, STATE_FAILED, None, error)
+
+    def record(self, result, sink=None):
+        """Record a ScrapeResult as done or failed; with a sink its records are already flushed there"""
+        if result.error:
+            self.mark_failed(result.url, result.error)
+        elif sink is not None:
+            self.mark_done(result.url)
+        else:
+            self.mark_done(result.url, results=result.results)
+
+    def _finish_url(self, url, state, results, error):
+        with self._lock:
+            self._db.execute(
+                "INSERT INTO job_urls (job_id, url, state, depth, attempts, results, error, updated_at)"
+                " VALUES (?, ?, ?, 0, 1, ?, ?, ?)"
+                " ON CONFLICT (job_id, url) DO UPDATE SET state = excluded.state, attempts = attempts + 1,"
+                " results = excluded.results, error = excluded.error, updated_at = excluded.updated_at",
+                (self.job_id, url, state, results, error, time.time()),
+            )
+            self._db.commit()
+
+    def completed_results(self) -> Dict[str, Dict[str, List[str]]]:
+        """Results of the pages already done, keyed by URL"""
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT url, results FROM job_urls WHERE job_id = ? AND state = ? ORDER BY rowid",
+                (self.job_id, STATE_DONE),
+            ).fetchall()
+        return {url: json.loads(results) for url, results in rows if results is not None}
+
+    def unfinished_urls(self) -> Set[str]:
+        """URLs of the pages not done yet, pending or failed"""
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT url FROM job_urls WHERE job_id = ? AND state != ?", (self.job_id, STATE_DONE)
+            ).fetchall()
+        return {url for url, in rows}
+
+    def failures(self) -> Dict[str, Optional[str]]:
+        """Errors of the failed URLs"""
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT url, error FROM job_urls WHERE job_id = ? AND state = ?", (self.job_id, STATE_FAILED)
+            ).fetchall()
+        return dict(rows)
+
+    def clear(self):
+        """Forget the job's progress: it finished, or is started over"""
+        with self._lock:
+            self._db.execute("DELETE FROM job_urls WHERE job_id = ?", (self.job_id,))
+            self._db.commit()
+
+    def format_counts(self):
+        counts = self.counts()
+        return f"{counts[STATE_DONE]} done, {counts[STATE_PENDING]} pending, {counts[STATE_FAILED]} failed"
+
+    def close(self):
+        with self._lock:
+            self._db.close()
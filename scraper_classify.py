@@ -0,0 +1,179 @@
+"""Block and challenge page detection.
+
+Every indicator keyword is folded into one alternation compiled at import
+and shaped as a trie (keywords sharing a prefix share a branch). A page is
+lowercased once and scanned once (text as its UTF-8 bytes), and every
+indicator whose keywords occur on it is reported, overlapping ones included.
+Each indicator carries a weight: markers that only appear on challenge pages
+(the Alibaba slider, reCAPTCHA/hCaptcha widgets, a "Just a moment..." title)
+decide on their own; generic words ("robot", "verification", "blocked")
+count once together and only add to stronger signals. Words present on
+ordinary Alibaba pages ("security", "alibaba.com") are not indicators at all.
+
+The result is a PageVerdict: whether the page is blocked, why, and which
+kind of captcha the solvers should try.
+"""
+
+import re
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple, Union
+
+
+# Captcha kinds understood by the solvers, most specific first
+CAPTCHA_ALIBABA = "alibaba_nocaptcha"
+CAPTCHA_RECAPTCHA = "recaptcha_v2"
+CAPTCHA_HCAPTCHA = "hcaptcha"
+CAPTCHA_IMAGE = "image_captcha"
+CAPTCHA_CLOUDFLARE = "cloudflare"
+CAPTCHA_UNKNOWN = "unknown"
+CAPTCHA_PRIORITY = (CAPTCHA_ALIBABA, CAPTCHA_RECAPTCHA, CAPTCHA_HCAPTCHA, CAPTCHA_IMAGE, CAPTCHA_CLOUDFLARE)
+
+# Score at which a page counts as blocked
+BLOCK_THRESHOLD = 4
+
+@dataclass(frozen=True)
+class Indicator:
+    """Lowercase keywords that signal a block page, and how much they weigh"""
+    name: str
+    keywords: Tuple[str, ...]
+    weight: int
+    captcha_type: Optional[str] = None
+    # Keywords must stand alone ("robot", not "robots")
+    whole_word: bool = False
+    # Regex that must also match where the keyword was found
+    confirm: Optional[str] = None
+
+
+# Each indicator counts once per page, however often its keywords appear
+INDICATORS = (
+    # Alibaba / Taobao slider and punish pages
+    Indicator("alibaba slider", ("nc_1_nocaptcha", "slidetounlock", "slide to unlock", "slide to verify"), 5,
+              CAPTCHA_ALIBABA),
+    Indicator("alibaba punish page", ("x5secdata", "/_____tmd_____/punish"), 5, CAPTCHA_ALIBABA),
+    Indicator("alibaba verify form", ("nc-verify-form", "nc-container"), 4, CAPTCHA_ALIBABA),
+    Indicator("alibaba captcha widgets", ("captcha-loading", "bx-feedback-btn"), 3),
+    Indicator("nocaptcha", ("nocaptcha",), 2, CAPTCHA_ALIBABA),
+    # Captcha widgets
+    Indicator("recaptcha widget", ("g-recaptcha", "recaptcha/api.js"), 4, CAPTCHA_RECAPTCHA),
+    Indicator("recaptcha", ("recaptcha",), 2, CAPTCHA_RECAPTCHA),
+    Indicator("hcaptcha widget", ("h-captcha", "hcaptcha.com"), 4, CAPTCHA_HCAPTCHA),
+    Indicator("hcaptcha", ("hcaptcha",), 2, CAPTCHA_HCAPTCHA),
+    Indicator("captcha image", ("<img",), 4, CAPTCHA_IMAGE, confirm=r"<img[^>]{0,200}captcha"),
+    # Cloudflare and generic WAF interstitials
+    Indicator("cloudflare challenge", ("cf-challenge", "cf-browser-verification", "challenge-platform", "cf_chl_"), 5,
+              CAPTCHA_CLOUDFLARE),
+    Indicator("block page title", ("<title",), 5,
+              confirm=r"<title[^>]*>\s*(?:just a moment|attention required|access denied|security check|captcha"
+                      r"|robot check)"),
+    Indicator("ddos protection", ("ddos protection",), 3),
+    Indicator("cloudflare", ("cloudflare",), 1, CAPTCHA_CLOUDFLARE),
+    # Wording of block pages
+    Indicator("human check", ("verify you are human", "verify you are a human", "are you a robot", "unusual traffic",
+                              "suspicious activity"), 4),
+    Indicator("rate limited", ("too many requests", "rate limit"), 3),
+    Indicator("access check", ("access denied", "verification required", "security check", "bot detection"), 2),
+    Indicator("captcha", ("captcha",), 2),
+    Indicator("block words", ("blocked", "robot", "challenge", "verification", "please wait", "punish"), 1,
+              whole_word=True),
+)
+
+
+@dataclass(frozen=True)
+class PageVerdict:
+    blocked: bool
+    score: int
+    # One of CAPTCHA_PRIORITY, or CAPTCHA_UNKNOWN (always, for pages that are not blocked)
+    captcha_type: str
+    # Indicators that matched, strongest first
+    signals: Tuple[str, ...] = ()
+
+    def describe(self):
+        return f"score {self.score}: {', '.join(self.signals) or 'no signals'}"
+
+
+def trie_pattern(keywords) -> str:
+    """One regex matching any keyword, longest first, with shared prefixes factored out"""
+    trie = {}
+    for keyword in keywords:
+        node = trie
+        for char in keyword:
+            node = node.setdefault(char, {})
+        node[''] = {}
+
+    def branch(node):
+        ends = '' in node
+        alternatives = [re.escape(char) + branch(child) for char, child in sorted(node.items()) if char]
+        if not alternatives:
+            return ''
+        if len(alternatives) == 1 and not ends:
+            return alternatives[0]
+        return f"(?:{'|'.join(alternatives)}){'?' if ends else ''}"
+
+    return branch(trie)
+
+
+class PageClassifier:
+    def __init__(self, indicators=INDICATORS, threshold=BLOCK_THRESHOLD):
+        self.indicators = indicators
+        self.threshold = threshold
+        owners: Dict[str, set] = {}
+        for index, indicator in enumerate(indicators):
+            for keyword in indicator.keywords:
+                owners.setdefault(keyword, set()).add(index)
+        # The longest keyword found at a position stands for the keywords that are its prefixes too;
+        # (indicator index, keyword length) pairs for each keyword
+        self._owners = {
+            keyword.encode('ascii'): tuple((index, len(prefix)) for prefix in sorted(owners, key=len, reverse=True)
+                                           if keyword.startswith(prefix) for index in sorted(owners[prefix]))
+            for keyword in owners
+        }
+        # Content is lowercased (one C-speed copy), which is far cheaper than an IGNORECASE scan
+        self._pattern = re.compile(trie_pattern(owners).encode('ascii'))
+        self._confirm = {index: re.compile(indicator.confirm.encode('ascii'))
+                         for index, indicator in enumerate(indicators) if indicator.confirm}
+
+    def classify(self, content: Union[str, bytes, None]) -> PageVerdict:
+        """Scan a page once and score every indicator it matched"""
+        if not content:
+            return PageVerdict(False, 0, CAPTCHA_UNKNOWN)
+        if isinstance(content, str):
+            # Keywords are ASCII, so the UTF-8 bytes match exactly where the text does
+            content = content.encode('utf-8', errors='replace')
+        content = content.lower()
+        seen = set()
+        match = self._pattern.search(content)
+        while match:
+            start = match.start()
+            for index, length in self._owners[match.group()]:
+                if index in seen:
+                    continue
+                indicator = self.indicators[index]
+                if indicator.whole_word and not _stands_alone(content, start, start + length):
+                    continue
+                if indicator.confirm and not self._confirm[index].match(content, start):
+                    continue
+                seen.add(index)
+            # Resume right after the match's start, so keywords overlapping it are found as well
+            match = self._pattern.search(content, start + 1)
+
+        matched = sorted(seen, key=lambda i: -self.indicators[i].weight)
+        score = sum(self.indicators[i].weight for i in matched)
+        blocked = score >= self.threshold
+        kinds = {self.indicators[i].captcha_type for i in matched} if blocked else set()
+        captcha_type = next((kind for kind in CAPTCHA_PRIORITY if kind in kinds), CAPTCHA_UNKNOWN)
+        return PageVerdict(blocked, score, captcha_type, tuple(self.indicators[i].name for i in matched))
+
+
+def _stands_alone(content, start, end) -> bool:
+    """Whether content[start:end] is not part of a longer word"""
+    before = content[start - 1:start]
+    after = content[end:end + 1]
+    return not (before.isalnum() or after.isalnum())
+
+
+DEFAULT_CLASSIFIER = PageClassifier()
+
+
+def classify_page(content: Union[str, bytes, None]) -> PageVerdict:
+    """Verdict for a page from the shared classifier"""
+    return DEFAULT_CLASSIFIER.classify(content)
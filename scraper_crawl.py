@@ -0,0 +1,237 @@
+"""Link-following crawl over the engine's static and dynamic batches.
+
+A crawl starts from seed URLs and follows the links matched by its own
+selectors, breadth first by default, within a depth limit, a page budget and
+a set of allowed domains. URLs wait in a Frontier: a heap ordered by priority
+(the link depth unless the caller says otherwise) in front of a Bloom filter
+over normalized URLs. The filter answers "seen before?" in a fixed number of
+bits per URL, so deduplicating millions of discovered links costs megabytes
+instead of a set of strings; a false positive skips a URL that was never
+fetched, at the configured error rate.
+
+Pages are fetched in waves taken from the front of the frontier, through
+``run_batch`` for static jobs or ``run_dynamic_batch`` for dynamic ones, so
+a crawl gets the same worker pools, cache and resource blocking as a URL list.
+Links are collected by the engine from the parse it already does for
+extraction (in the fetching worker or the extraction pool) and come back with
+each result, so the crawl loop never parses a page itself.
+"""
+
+import hashlib
+import heapq
+import math
+from dataclasses import dataclass, replace
+from itertools import count
+from typing import Iterable, Iterator, Optional, Tuple
+from urllib.parse import urlsplit
+
+from scraper_cache import normalize_url
+from scraper_checkpoint import STATE_PENDING, JobCheckpoint
+from scraper_engine import ScrapeJob, ScrapeResult, SelectorSpec
+from scraper_extract import compile_plan
+
+
+# URLs the seen-set is sized for, and its false-positive rate at that size (~3.6 MB)
+SEEN_CAPACITY = 2_000_000
+SEEN_ERROR_RATE = 0.001
+
+# URLs allowed to wait in the frontier; further links are dropped and counted
+FRONTIER_MAX_PENDING = 1_000_000
+
+# Pages taken from the frontier per wave, per worker
+WAVE_PER_WORKER = 4
+
+# Links are followed from any matched element: the element itself or the anchors inside it
+DEFAULT_LINK_SELECTORS = SelectorSpec(css_selector="a[href]")
+
+
+class BloomFilter:
+    """Fixed-size probabilistic set of strings: no false negatives"""
+
+    def __init__(self, capacity=SEEN_CAPACITY, error_rate=SEEN_ERROR_RATE):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.num_bits = max(8, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.num_hashes = max(1, round(self.num_bits / capacity * math.log(2)))
+        self._bits = bytearray((self.num_bits + 7) // 8)
+        self.count = 0
+
+    def _positions(self, item):
+        # Double hashing: k positions from the two halves of one 128-bit digest
+        digest = hashlib.blake2b(item.encode('utf-8'), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        return [(h1 + i * h2) % self.num_bits for i in range(self.num_hashes)]
+
+    def add(self, item) -> bool:
+        """Add an item; False if it was (probably) present already"""
+        added = False
+        for position in self._positions(item):
+            byte, mask = position >> 3, 1 << (position & 7)
+            if not self._bits[byte] & mask:
+                self._bits[byte] |= mask
+                added = True
+        if added:
+            self.count += 1
+        return added
+
+    def __contains__(self, item):
+        return all(self._bits[p >> 3] & (1 << (p & 7)) for p in self._positions(item))
+
+    def __len__(self):
+        return self.count
+
+    @property
+    def size_bytes(self):
+        return len(self._bits)
+
+
+class Frontier:
+    """Priority queue of URLs to fetch; each normalized URL is admitted once"""
+
+    def __init__(self, capacity=SEEN_CAPACITY, error_rate=SEEN_ERROR_RATE, max_pending=FRONTIER_MAX_PENDING):
+        self.seen = BloomFilter(capacity, error_rate)
+        self.max_pending = max_pending
+        self.dropped = 0
+        self._heap = []
+        self._order = count()
+
+    def push(self, url, depth, priority=None) -> bool:
+        """Queue a URL unless it was seen before; lower priorities are popped first
+
+        A URL dropped because the frontier is full is not marked seen, so it
+        can still be queued from another page once the frontier drains.
+        """
+        key = normalize_url(url)
+        if key in self.seen:
+            return False
+        if len(self._heap) >= self.max_pending:
+            self.dropped += 1
+            return False
+        self.seen.add(key)
+        heapq.heappush(self._heap, (depth if priority is None else priority, next(self._order), url, depth))
+        return True
+
+    def pop(self) -> Tuple[str, int]:
+        """Next (url, depth) to fetch"""
+        _, _, url, depth = heapq.heappop(self._heap)
+        return url, depth
+
+    def __len__(self):
+        return len(self._heap)
+
+
+def host_allowed(url, domains) -> bool:
+    """Whether the URL's host is one of ``domains`` or a subdomain of one"""
+    host = (urlsplit(url).hostname or '').lower()
+    return any(host == domain or host.endswith('.' + domain) for domain in domains)
+
+
+@dataclass
+class CrawlConfig:
+    """Which links a crawl follows and how far"""
+    link_selectors: SelectorSpec = DEFAULT_LINK_SELECTORS
+    # Seeds are depth 0; links found on a page at max_depth are not followed
+    max_depth: int = 2
+    # Pages fetched before the crawl stops (None means until the frontier is empty)
+    max_pages: Optional[int] = 100
+    # Hosts links may point to (with subdomains); None means the seeds' hosts
+    allowed_domains: Optional[Tuple[str, ...]] = None
+    workers: int = 8
+
+
+@dataclass
+class CrawlPage:
+    """One fetched page of a crawl"""
+    result: ScrapeResult
+    depth: int
+    # Links from this page that were new and queued
+    queued: int = 0
+
+
+class Crawler:
+    def __init__(self, engine, config: Optional[CrawlConfig] = None, frontier: Optional[Frontier] = None,
+                 checkpoint: Optional[JobCheckpoint] = None):
+        self.engine = engine
+        self.config = config or CrawlConfig()
+        self.frontier = frontier if frontier is not None else Frontier()
+        # Discovered links and finished pages are recorded here, so an interrupted crawl can resume
+        self.checkpoint = checkpoint
+        self.pages = 0
+
+    def crawl(self, job: ScrapeJob, seeds: Iterable[str]) -> Iterator[CrawlPage]:
+        """Fetch the seeds with ``job``'s settings and follow their links, yielding pages as they finish"""
+        config = self.config
+        # Both plans are validated before anything is fetched
+        compile_plan(config.link_selectors)
+        compile_plan(job.selectors)
+        # Links can sit anywhere on a page, so pages are always read to the end; the engine collects them
+        job = replace(job, stream=False, link_selectors=config.link_selectors)
+
+        seeds = list(seeds)
+        domains = tuple(d.lower() for d in config.allowed_domains) if config.allowed_domains else tuple(
+            (urlsplit(seed).hostname or '').lower() for seed in seeds)
+        if self.checkpoint is not None and self.checkpoint.exists():
+            self._restore()
+        else:
+            for seed in seeds:
+                self.frontier.push(seed, 0)
+            if self.checkpoint is not None:
+                self.checkpoint.add_pending(seeds, 0)
+        self.engine.log(f"🕸️ Crawling from {len(seeds)} seed(s), depth ≤ {config.max_depth}, "
+                        f"domains: {', '.join(sorted(set(domains)))}\n")
+
+        while self.frontier and not self.engine.should_stop():
+            wave_size = config.workers * WAVE_PER_WORKER
+            if config.max_pages is not None:
+                wave_size = min(wave_size, config.max_pages - self.pages)
+                if wave_size <= 0:
+                    break
+            wave = dict(self.frontier.pop() for _ in range(min(wave_size, len(self.frontier))))
+            # Links of pages at the depth limit would not be followed, so they are not collected
+            jobs = (job.with_url(url) if depth < config.max_depth else replace(job, url=url, link_selectors=None)
+                    for url, depth in wave.items())
+            for result in self._run_wave(jobs):
+                self.pages += 1
+                depth = wave[result.url]
+                queued = 0
+                if not result.error and depth < config.max_depth:
+                    queued = self._follow(result, depth + 1, domains, job.proxy_server())
+                # Recorded after its links, so a crash in between only refetches the page
+                if self.checkpoint is not None:
+                    self.checkpoint.record(result, job.sink)
+                yield CrawlPage(result, depth, queued)
+
+        self.engine.log(f"🕸️ Crawl finished: {self.pages} pages, {len(self.frontier)} still queued, "
+                        f"{len(self.frontier.seen)} URLs seen ({self.frontier.seen.size_bytes / 1024 / 1024:.1f} MB), "
+                        f"{self.frontier.dropped} dropped\n")
+
+    def _restore(self):
+        """Rebuild the frontier and the seen-set from the checkpoint of an interrupted crawl"""
+        for url, state, depth in self.checkpoint.iter_urls():
+            if state == STATE_PENDING:
+                self.frontier.push(url, depth)
+            else:
+                self.frontier.seen.add(normalize_url(url))
+                self.pages += 1
+        self.engine.log(f"♻️ Resuming crawl: {self.pages} pages done, {len(self.frontier)} queued\n")
+
+    def _run_wave(self, jobs) -> Iterator[ScrapeResult]:
+        """One wave of jobs through the engine's batch runner for their mode"""
+        jobs = list(jobs)
+        run_dynamic_batch = getattr(self.engine, 'run_dynamic_batch', None)
+        if jobs and jobs[0].mode == "dynamic" and run_dynamic_batch is not None:
+            # Pages render concurrently in one Chromium on the async engine
+            return run_dynamic_batch(jobs, concurrency=self.config.workers)
+        return self.engine.run_batch(jobs, max_workers=self.config.workers)
+
+    def _follow(self, result: ScrapeResult, depth, domains, proxy=None) -> int:
+        """Queue the new in-domain links of a fetched page"""
+        new_links = []
+        for url in result.links or ():
+            # Only links robots.txt allows are crawled; seeds were asked for explicitly
+            if host_allowed(url, domains) and self.engine.scheduler.allowed(url, proxy) and self.frontier.push(url, depth):
+                new_links.append(url)
+        if new_links and self.checkpoint is not None:
+            self.checkpoint.add_pending(new_links, depth)
+        return len(new_links)
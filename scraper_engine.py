@@ -0,0 +1,1160 @@
+"""Tk-free scraping engine shared by the GUI and headless batch runs.
+
+The engine never touches a widget: every progress line and every image it
+finds is reported through an ``on_event`` callback, so the GUI is just one
+consumer and batch hosts can run the same code without a Tk root.
+"""
+
+import base64
+import random
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field, replace
+from datetime import datetime, timezone
+from itertools import chain, islice
+from typing import Callable, Dict, Iterable, Iterator, List, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from scraper_blocking import BlockPolicy, install_blocking, policy_for_url
+from scraper_browser import BrowserPool
+from scraper_cache import ResponseCache
+from scraper_classify import CAPTCHA_ALIBABA, CAPTCHA_IMAGE, classify_page
+from scraper_export import ResultSink, ScrapeRecord
+from scraper_metrics import Metrics, increment, record_span, span, time_connections
+from scraper_parallel import ExtractedItems, ExtractionPool
+from scraper_politeness import ROBOTS_TIMEOUT, HostScheduler, RobotsCache, host_key
+from scraper_retry import DEFAULT_RETRY_POLICY, CircuitBreakers, RetryPolicy, check_response, classify_error
+from scraper_extract import (
+    ITEM_ERROR, ITEM_IMAGE, ITEM_LINK, LINKS, RESULT_LIMIT, STREAM_CHUNK_SIZE, SelectorPlan, compile_plan,
+    iter_plan_items, link_items, parse_document, parse_stream,
+)
+from scraper_interact import (
+    CAPTCHA_IMAGE_SELECTOR, CAPTCHA_INPUT_SELECTOR, CAPTCHA_RELOAD_WAIT, CAPTCHA_SUBMIT_WAIT, DYNAMIC_HEADERS,
+    ECOMMERCE_DOMAINS, ECOMMERCE_STEALTH_SCRIPT, NAVIGATION_TIMEOUT_MS, SLIDER_SELECTOR, SLIDER_SUCCESS_SELECTORS,
+    SLIDER_TIMEOUT_MS, TOKEN_CAPTCHAS, captcha_advice, find_site_key, mouse_wander_points, navigation_wait,
+    scroll_steps, slider_steps, token_injection_script,
+)
+from scraper_readiness import LAZY_SCROLL_SCRIPT, LAZY_SCROLL_STEPS, LAZY_SETTLE_TIMEOUT, wait_until_ready
+
+
+# Event kinds emitted through ScraperEngine.on_event
+EVENT_LOG = "log"
+EVENT_IMAGE = "image"
+
+# Enhanced headers to mimic a real browser in static mode
+STATIC_HEADERS = {
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8,application/signed-exchange;v=b3;q=0.7',
+    'Accept-Language': 'en-US,en;q=0.9',
+    'Accept-Encoding': 'gzip, deflate, br',
+    'Connection': 'keep-alive',
+    'Upgrade-Insecure-Requests': '1',
+    'Sec-Fetch-Dest': 'document',
+    'Sec-Fetch-Mode': 'navigate',
+    'Sec-Fetch-Site': 'none',
+    'Sec-Fetch-User': '?1',
+    'Cache-Control': 'max-age=0',
+    'DNT': '1'
+}
+
+
+# Result headings and the SelectorSpec field behind each selector type
+SELECTOR_LABELS = {
+    'tag': "HTML tag <{}>",
+    'class': "CSS class '{}'",
+    'id': "element ID '{}'",
+    'css': "CSS selector '{}'",
+    'xpath': "XPath '{}'",
+}
+SELECTOR_FIELDS = {
+    'tag': 'tag',
+    'class': 'class_name',
+    'id': 'id_name',
+    'css': 'css_selector',
+    'xpath': 'xpath_selector',
+}
+
+# How often a paused engine checks for a stop (seconds)
+PAUSE_POLL_INTERVAL = 0.2
+
+# Items per selector echoed to the log (and shown as thumbnails); the rest only reach results or the sink
+LOGGED_ITEMS_PER_SELECTOR = 10
+
+
+@dataclass(frozen=True)
+class SelectorSpec:
+    """Content selectors for one job; empty values are skipped"""
+    tag: Optional[str] = None
+    class_name: Optional[str] = None
+    id_name: Optional[str] = None
+    css_selector: Optional[str] = None
+    xpath_selector: Optional[str] = None
+
+
+@dataclass
+class ScrapeJob:
+    """Everything the engine needs to scrape one URL"""
+    url: str
+    mode: str = "static"
+    selectors: SelectorSpec = field(default_factory=SelectorSpec)
+    proxy_url: Optional[str] = None
+    use_2captcha: bool = False
+    captcha_api_key: str = ""
+    # Dynamic mode: readiness deadline (seconds), DOM quiet window (ms) and slow human-like scrolling
+    ready_timeout: float = 30.0
+    quiet_ms: int = 500
+    simulate_human: bool = False
+    # Static mode: answer from the engine's response cache when it has one
+    use_cache: bool = True
+    # Static mode: download and parse incrementally, stopping once every selector has its matches
+    stream: bool = False
+    # Matches skipped and used per selector (limit None means all); with a sink, items go there instead of results
+    limit: Optional[int] = RESULT_LIMIT
+    offset: int = 0
+    sink: Optional[ResultSink] = field(default=None, compare=False, repr=False)
+    # Dynamic mode: abort images, fonts, media and trackers; None picks the domain preset
+    block_resources: bool = True
+    block_policy: Optional[BlockPolicy] = None
+    # Links to collect from the page's parse (the crawler's link selectors); None collects none
+    link_selectors: Optional[SelectorSpec] = None
+
+    def proxy_server(self) -> Optional[str]:
+        """Return the proxy URL with a scheme, or None when no proxy is set"""
+        proxy_url = (self.proxy_url or "").strip()
+        if not proxy_url:
+            return None
+        if not proxy_url.startswith(('http://', 'https://')):
+            proxy_url = 'http://' + proxy_url
+        return proxy_url
+
+    def with_url(self, url) -> "ScrapeJob":
+        """Return a copy of this job for another URL"""
+        return replace(self, url=url)
+
+    def resource_policy(self) -> Optional[BlockPolicy]:
+        """Return the request blocking policy for this job, or None to load everything"""
+        if not self.block_resources:
+            return None
+        return self.block_policy or policy_for_url(self.url)
+
+    def captcha_key(self) -> Optional[str]:
+        """Return the 2Captcha API key when auto-solving is enabled"""
+        api_key = (self.captcha_api_key or "").strip()
+        if not self.use_2captcha or not api_key:
+            return None
+        return api_key
+
+
+@dataclass
+class ScrapeResult:
+    """Outcome of one job: extracted items per selector type plus the page"""
+    url: str
+    mode: str
+    results: Dict[str, List[str]]
+    html_content: str
+    error: Optional[str] = None
+    # Absolute URLs matched by the job's link selectors
+    links: Optional[List[str]] = None
+
+
+@dataclass
+class ScrapeEvent:
+    """A progress line (EVENT_LOG) or a discovered image (EVENT_IMAGE)"""
+    kind: str
+    message: str = ""
+    url: Optional[str] = None
+
+
+def parse_url_list(text) -> List[str]:
+    """Parse one URL per line, skipping blanks, '#' comments and duplicates"""
+    urls = []
+    seen = set()
+    for line in text.splitlines():
+        url = line.strip()
+        if not url or url.startswith('#') or url in seen:
+            continue
+        seen.add(url)
+        urls.append(url)
+    return urls
+
+
+def load_url_list(path) -> List[str]:
+    """Read a URL list file (one URL per line)"""
+    with open(path, 'r', encoding='utf-8') as f:
+        return parse_url_list(f.read())
+
+
+class ScraperEngine:
+    def __init__(self, on_event: Optional[Callable[[ScrapeEvent], None]] = None,
+                 stop_event: Optional[threading.Event] = None, pool_size=10,
+                 cache: Optional[ResponseCache] = None, scheduler: Optional[HostScheduler] = None,
+                 pause_event: Optional[threading.Event] = None, extraction_pool: Optional[ExtractionPool] = None,
+                 metrics: Optional[Metrics] = None):
+        self.on_event = on_event
+        self.stop_event = stop_event or threading.Event()
+        # Cleared by the consumer to pause between pages and stages; None never pauses
+        self.pause_event = pause_event
+        # Which failures are retried and how, and per-host circuits that stop retrying dead hosts
+        self.retry_policy = DEFAULT_RETRY_POLICY
+        self.breakers = CircuitBreakers()
+        self.pool_size = pool_size
+        self.cache = cache
+        # Parses and extracts pages in worker processes; None extracts on the fetching thread
+        self.extraction_pool = extraction_pool
+        # Phase timings and counters of every job; in memory only unless given export paths
+        self.metrics = metrics or Metrics()
+        # Per-host rate and concurrency limits; robots.txt is fetched over the shared session
+        self.scheduler = scheduler or HostScheduler(robots=RobotsCache(fetch=self._fetch_robots))
+        self._session = None
+        self._session_lock = threading.Lock()
+        self._browser_pool = None
+
+    def emit(self, kind, message="", url=None):
+        """Report an event to the consumer, if any"""
+        if self.on_event is not None:
+            self.on_event(ScrapeEvent(kind, message, url))
+
+    def log(self, message):
+        """Report a progress line"""
+        self.emit(EVENT_LOG, message)
+
+    def _fetch_robots(self, robots_url, proxy=None):
+        """Fetch a robots.txt for the scheduler, through the job's proxy if it has one"""
+        proxies = {'http': proxy, 'https': proxy} if proxy else None
+        return self.get_session().get(robots_url, headers={'User-Agent': self.get_random_user_agent()},
+                                      timeout=ROBOTS_TIMEOUT, proxies=proxies)
+
+    def wait_for_host(self, url, proxy=None):
+        """Take a request slot for the URL's host, logging any wait its rate limit imposes"""
+        waited = self.scheduler.acquire(url, self.stop_event, proxy)
+        if waited > 0:
+            self.log(f"  ⏳ Waited {waited:.1f}s for the host's rate limit\n")
+
+    def with_retries(self, url, attempt_fn, policy: Optional[RetryPolicy] = None):
+        """Call ``attempt_fn(attempt)`` until it succeeds, fails for good or the host's circuit opens"""
+        policy = policy or self.retry_policy
+        for attempt in range(policy.attempts):
+            self.breakers.check(url)
+            self.log(f"  Attempt {attempt + 1}/{policy.attempts}...\n")
+            try:
+                result = attempt_fn(attempt)
+            except Exception as e:
+                delay = self._after_failure(url, e, attempt, policy)
+                if delay is None:
+                    raise
+                self.stop_event.wait(delay)
+                # A retry is another request to the same host
+                self.scheduler.pace(url, self.stop_event)
+                continue
+            self.breakers.record(url, ok=True)
+            return result
+
+    def _after_failure(self, url, error, attempt, policy: RetryPolicy) -> Optional[float]:
+        """Record a failed attempt; seconds to wait before the next one, or None to give up"""
+        decision = classify_error(error)
+        if self.breakers.record(url, ok=not decision.host_failure):
+            self.log(f"  🔌 Circuit opened for {host_key(url)}: failing fast for {self.breakers.cooldown:.0f}s\n")
+        delay = None
+        if decision.retryable and attempt < policy.attempts - 1 and not self.should_stop():
+            delay = policy.backoff(attempt, decision.retry_after)
+        if delay is None:
+            increment("failed_attempts")
+            kind = "retryable" if decision.retryable else "fatal"
+            self.log(f"  ❌ Attempt {attempt + 1} failed ({kind}): {str(error)[:100]}\n")
+        else:
+            increment("retries")
+            self.log(f"  ⚠️ Attempt {attempt + 1} failed, retrying in {delay:.1f}s: {str(error)[:100]}\n")
+        return delay
+
+    def should_stop(self):
+        """Check if the consumer asked the engine to stop"""
+        return self.stop_event.is_set()
+
+    def is_paused(self):
+        return self.pause_event is not None and not self.pause_event.is_set()
+
+    def wait_if_paused(self):
+        """Block while the consumer has paused the engine; a stop ends the wait"""
+        while self.is_paused() and not self.should_stop():
+            self.pause_event.wait(PAUSE_POLL_INTERVAL)
+
+    def get_session(self) -> requests.Session:
+        """Return the shared HTTP session, creating it on first use"""
+        with self._session_lock:
+            if self._session is None:
+                session = requests.Session()
+                session.headers.update(STATIC_HEADERS)
+                self._mount_adapters(session)
+                self._session = session
+            return self._session
+
+    def _mount_adapters(self, session):
+        """Size the per-host connection pools to the number of workers"""
+        adapter = time_connections(HTTPAdapter(pool_connections=self.pool_size, pool_maxsize=self.pool_size))
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+
+    def close(self):
+        """Close pooled connections and browsers"""
+        with self._session_lock:
+            if self._session is not None:
+                self._session.close()
+                self._session = None
+            browser_pool, self._browser_pool = self._browser_pool, None
+        if browser_pool is not None:
+            browser_pool.close()
+
+    def run(self, job: ScrapeJob) -> ScrapeResult:
+        """Scrape one job in the mode it asks for"""
+        # Compile (and validate) the selectors before any fetch is spent
+        compile_plan(job.selectors)
+        self.wait_if_paused()
+        with self.metrics.job(job.url, job.mode) as trace:
+            if job.mode == "static":
+                results, html_content, links = self.scrape_static(job)
+            else:
+                results, html_content, links = self.scrape_dynamic(job)
+        self.log(f"  ⏱️ {trace.format()}\n")
+        return ScrapeResult(job.url, job.mode, results, html_content, links=links)
+
+    def _run_safely(self, job):
+        """Run one batch item, turning a failure into an error result"""
+        try:
+            return self.run(job)
+        except Exception as e:
+            return ScrapeResult(job.url, job.mode, {}, "", error=str(e))
+
+    def run_batch(self, jobs: Iterable[ScrapeJob], max_workers=8) -> Iterator[ScrapeResult]:
+        """Scrape many jobs on a bounded thread pool, yielding results as they finish
+
+        Only a small window of jobs is in flight at a time, so very long URL
+        lists are never materialized as futures. Stopping the engine lets the
+        in-flight jobs finish and submits nothing new.
+        """
+        with self._session_lock:
+            if max_workers > self.pool_size:
+                self.pool_size = max_workers
+                if self._session is not None:
+                    self._mount_adapters(self._session)
+
+        # Selector errors fail the whole batch up front instead of once per URL
+        jobs = iter(jobs)
+        first = next(jobs, None)
+        if first is None:
+            return
+        compile_plan(first.selectors)
+        jobs = chain([first], jobs)
+        if first.mode == "dynamic":
+            # One browser per worker, or the workers would queue for a single page
+            self.get_browser_pool(max_workers)
+        
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            pending = {pool.submit(self._run_safely, job) for job in islice(jobs, max_workers * 2)}
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield future.result()
+                if not self.should_stop():
+                    for job in islice(jobs, len(done)):
+                        pending.add(pool.submit(self._run_safely, job))
+
+    def detect_captcha_or_blocking(self, html_content):
+        """Detect if the page contains captcha or blocking mechanisms"""
+        return classify_page(html_content).blocked
+    
+    def detect_captcha_type(self, html_content):
+        """Detect the specific type of captcha present"""
+        return classify_page(html_content).captcha_type
+    
+    def get_random_user_agent(self):
+        """Get a random realistic user agent"""
+        user_agents = [
+            "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
+            "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/119.0.0.0 Safari/537.36",
+            "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
+            "Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:109.0) Gecko/20100101 Firefox/121.0",
+            "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/17.1 Safari/605.1.15",
+            "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Edge/120.0.0.0 Safari/537.36",
+            "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
+            "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/118.0.0.0 Safari/537.36"
+        ]
+        return random.choice(user_agents)
+    
+    def is_ecommerce_site(self, url):
+        """Check if the URL is from a known e-commerce site with strict anti-bot protection"""
+        url_lower = url.lower()
+        return any(domain in url_lower for domain in ECOMMERCE_DOMAINS)
+    
+    def get_enhanced_stealth_script(self):
+        """Get enhanced stealth script for better anti-detection"""
+        return """
+        // Enhanced stealth script for better anti-detection
+        
+        // Remove webdriver property completely
+        Object.defineProperty(navigator, 'webdriver', {
+            get: () => undefined,
+        });
+        
+        // Mock plugins array with realistic data
+        Object.defineProperty(navigator, 'plugins', {
+            get: () => {
+                return {
+                    0: {name: 'Chrome PDF Plugin', filename: 'internal-pdf-viewer'},
+                    1: {name: 'Chrome PDF Viewer', filename: 'mhjfbmdgcfjbbpaeojofohoefgiehjai'},
+                    2: {name: 'Native Client', filename: 'internal-nacl-plugin'},
+                    length: 3
+                };
+            },
+        });
+        
+        // Mock languages
+        Object.defineProperty(navigator, 'languages', {
+            get: () => ['en-US', 'en'],
+        });
+        
+        // Mock permissions API
+        const originalQuery = window.navigator.permissions.query;
+        window.navigator.permissions.query = (parameters) => (
+            parameters.name === 'notifications' ?
+                Promise.resolve({ state: Notification.permission }) :
+                originalQuery(parameters)
+        );
+        
+        // Mock chrome runtime
+        window.chrome = {
+            runtime: {
+                onConnect: undefined,
+                onMessage: undefined,
+            },
+        };
+        
+        // Remove automation indicators
+        delete window.cdc_adoQpoasnfa76pfcZLmcfl_Array;
+        delete window.cdc_adoQpoasnfa76pfcZLmcfl_Promise;
+        delete window.cdc_adoQpoasnfa76pfcZLmcfl_Symbol;
+        delete window.cdc_adoQpoasnfa76pfcZLmcfl_JSON;
+        delete window.cdc_adoQpoasnfa76pfcZLmcfl_Object;
+        delete window.cdc_adoQpoasnfa76pfcZLmcfl_Proxy;
+        delete window.cdc_adoQpoasnfa76pfcZLmcfl_Reflect;
+        
+        // Mock screen properties
+        Object.defineProperty(screen, 'availHeight', {get: () => 1040});
+        Object.defineProperty(screen, 'availWidth', {get: () => 1920});
+        Object.defineProperty(screen, 'colorDepth', {get: () => 24});
+        Object.defineProperty(screen, 'height', {get: () => 1080});
+        Object.defineProperty(screen, 'pixelDepth', {get: () => 24});
+        Object.defineProperty(screen, 'width', {get: () => 1920});
+        
+        // Mock timezone
+        Object.defineProperty(Intl, 'DateTimeFormat', {
+            value: function() {
+                return {
+                    resolvedOptions: () => ({timeZone: 'America/New_York'})
+                };
+            }
+        });
+        
+        // Mock hardware concurrency
+        Object.defineProperty(navigator, 'hardwareConcurrency', {
+            get: () => 8,
+        });
+        
+        // Mock device memory
+        Object.defineProperty(navigator, 'deviceMemory', {
+            get: () => 8,
+        });
+        
+        // Mock connection
+        Object.defineProperty(navigator, 'connection', {
+            get: () => ({
+                effectiveType: '4g',
+                rtt: 50,
+                downlink: 10
+            }),
+        });
+        """
+    
+    def solve_2captcha(self, api_key, captcha_type, page_url, site_key=None, captcha_image=None):
+        """Solve captcha using 2Captcha service"""
+        if not api_key:
+            return None
+        
+        try:
+            if captcha_type == "recaptcha_v2":
+                return self._solve_recaptcha_v2(api_key, page_url, site_key)
+            elif captcha_type == "image":
+                return self._solve_image_captcha(api_key, captcha_image)
+            elif captcha_type == "hcaptcha":
+                return self._solve_hcaptcha(api_key, page_url, site_key)
+            else:
+                self.log(f"  ⚠️ Unsupported captcha type: {captcha_type}\n")
+                return None
+        except Exception as e:
+            self.log(f"  ❌ 2Captcha error: {str(e)}\n")
+            return None
+    
+    def _solve_recaptcha_v2(self, api_key, page_url, site_key):
+        """Solve reCAPTCHA v2 using 2Captcha"""
+        self.log("  🔐 Solving reCAPTCHA v2 with 2Captcha...\n")
+        
+        # Submit captcha
+        submit_data = {
+            'key': api_key,
+            'method': 'userrecaptcha',
+            'googlekey': site_key,
+            'pageurl': page_url,
+            'json': 1
+        }
+        
+        response = requests.post('http://2captcha.com/in.php', data=submit_data)
+        result = response.json()
+        
+        if result['status'] != 1:
+            raise Exception(f"Failed to submit captcha: {result.get('error_text', 'Unknown error')}")
+        
+        captcha_id = result['request']
+        self.log(f"  📝 Captcha submitted, ID: {captcha_id}\n")
+        
+        # Wait for solution
+        for attempt in range(30):  # Wait up to 5 minutes
+            time.sleep(10)
+            
+            check_data = {
+                'key': api_key,
+                'action': 'get',
+                'id': captcha_id,
+                'json': 1
+            }
+            
+            response = requests.get('http://2captcha.com/res.php', params=check_data)
+            result = response.json()
+            
+            if result['status'] == 1:
+                self.log("  ✅ reCAPTCHA solved successfully!\n")
+                return result['request']
+            elif result['error_text'] == 'CAPCHA_NOT_READY':
+                self.log(f"  ⏳ Waiting for solution... ({attempt + 1}/30)\n")
+                continue
+            else:
+                raise Exception(f"Failed to solve captcha: {result.get('error_text', 'Unknown error')}")
+        
+        raise Exception("Captcha solving timeout")
+    
+    def _solve_image_captcha(self, api_key, captcha_image):
+        """Solve image captcha using 2Captcha"""
+        self.log("  🔐 Solving image captcha with 2Captcha...\n")
+        
+        # Convert image to base64
+        if isinstance(captcha_image, bytes):
+            image_b64 = base64.b64encode(captcha_image).decode('utf-8')
+        else:
+            image_b64 = captcha_image
+        
+        # Submit captcha
+        submit_data = {
+            'key': api_key,
+            'method': 'base64',
+            'body': image_b64,
+            'json': 1
+        }
+        
+        response = requests.post('http://2captcha.com/in.php', data=submit_data)
+        result = response.json()
+        
+        if result['status'] != 1:
+            raise Exception(f"Failed to submit captcha: {result.get('error_text', 'Unknown error')}")
+        
+        captcha_id = result['request']
+        self.log(f"  📝 Image captcha submitted, ID: {captcha_id}\n")
+        
+        # Wait for solution
+        for attempt in range(30):  # Wait up to 5 minutes
+            time.sleep(10)
+            
+            check_data = {
+                'key': api_key,
+                'action': 'get',
+                'id': captcha_id,
+                'json': 1
+            }
+            
+            response = requests.get('http://2captcha.com/res.php', params=check_data)
+            result = response.json()
+            
+            if result['status'] == 1:
+                self.log("  ✅ Image captcha solved successfully!\n")
+                return result['request']
+            elif result['error_text'] == 'CAPCHA_NOT_READY':
+                self.log(f"  ⏳ Waiting for solution... ({attempt + 1}/30)\n")
+                continue
+            else:
+                raise Exception(f"Failed to solve captcha: {result.get('error_text', 'Unknown error')}")
+        
+        raise Exception("Captcha solving timeout")
+    
+    def _solve_hcaptcha(self, api_key, page_url, site_key):
+        """Solve hCaptcha using 2Captcha"""
+        self.log("  🔐 Solving hCaptcha with 2Captcha...\n")
+        
+        # Submit captcha
+        submit_data = {
+            'key': api_key,
+            'method': 'hcaptcha',
+            'sitekey': site_key,
+            'pageurl': page_url,
+            'json': 1
+        }
+        
+        response = requests.post('http://2captcha.com/in.php', data=submit_data)
+        result = response.json()
+        
+        if result['status'] != 1:
+            raise Exception(f"Failed to submit captcha: {result.get('error_text', 'Unknown error')}")
+        
+        captcha_id = result['request']
+        self.log(f"  📝 hCaptcha submitted, ID: {captcha_id}\n")
+        
+        # Wait for solution
+        for attempt in range(30):  # Wait up to 5 minutes
+            time.sleep(10)
+            
+            check_data = {
+                'key': api_key,
+                'action': 'get',
+                'id': captcha_id,
+                'json': 1
+            }
+            
+            response = requests.get('http://2captcha.com/res.php', params=check_data)
+            result = response.json()
+            
+            if result['status'] == 1:
+                self.log("  ✅ hCaptcha solved successfully!\n")
+                return result['request']
+            elif result['error_text'] == 'CAPCHA_NOT_READY':
+                self.log(f"  ⏳ Waiting for solution... ({attempt + 1}/30)\n")
+                continue
+            else:
+                raise Exception(f"Failed to solve captcha: {result.get('error_text', 'Unknown error')}")
+        
+        raise Exception("Captcha solving timeout")
+    
+    def solve_alibaba_nocaptcha(self, page, url):
+        """Solve Alibaba's NoCaptcha slider using human-like behavior"""
+        try:
+            self.log("  🎯 Detected Alibaba NoCaptcha slider\n")
+            self.log("  🤖 Attempting to solve with human-like behavior...\n")
+            try:
+                slider = page.wait_for_selector(SLIDER_SELECTOR, timeout=SLIDER_TIMEOUT_MS)
+            except Exception:
+                slider = None
+            if not slider:
+                self.log("  ❌ Slider not found\n")
+                return False
+            slider_box = slider.bounding_box()
+            if not slider_box:
+                self.log("  ❌ Could not get slider dimensions\n")
+                return False
+            
+            approach, drag = slider_steps(slider_box)
+            self.log("  🖱️ Moving mouse to slider, clicking and holding...\n")
+            self._mouse_steps(page, approach)
+            self.log("  🖱️ Dragging slider...\n")
+            self._mouse_steps(page, drag)
+            self.log("  ✅ Slider drag completed\n")
+            
+            self.log("  ⏳ Waiting for verification...\n")
+            time.sleep(random.uniform(2, 4))
+            try:
+                for indicator in SLIDER_SUCCESS_SELECTORS:
+                    if page.query_selector(indicator):
+                        return self._slider_verified(True)
+                return self._slider_verified(False, page.content())
+            except Exception as e:
+                self.log(f"  ⚠️ Verification check failed: {str(e)}\n")
+                return True  # Continue anyway
+        except Exception as e:
+            self.log(f"  ❌ Alibaba NoCaptcha solving failed: {str(e)}\n")
+            return False
+
+    def _mouse_steps(self, page, steps):
+        for step in steps:
+            if step.action == "down":
+                page.mouse.down()
+            elif step.action == "up":
+                page.mouse.up()
+            else:
+                page.mouse.move(step.x, step.y)
+            time.sleep(step.pause)
+
+    def _slider_verified(self, indicator_found, html_content=None):
+        """Log how the slider outcome was judged; an unclear outcome still counts as solved"""
+        if indicator_found:
+            self.log("  ✅ Alibaba NoCaptcha solved successfully!\n")
+        elif not self.detect_captcha_or_blocking(html_content):
+            self.log("  ✅ Captcha appears to be solved!\n")
+        else:
+            self.log("  ⚠️ Verification status unclear, continuing...\n")
+        return True
+
+    def scrape_static(self, job: ScrapeJob):
+        """Static scraping method with enhanced anti-detection"""
+        url = job.url
+        self.log(f"[STATIC FETCH] {url}\n")
+        
+        # Rotate the user agent per request; the rest comes from the shared session
+        headers = {'User-Agent': self.get_random_user_agent()}
+        
+        # Shared session so connections are pooled across requests and workers
+        session = self.get_session()
+        
+        # A fresh cached copy needs no request at all
+        cache = self.cache if job.use_cache else None
+        cached = None
+        if cache is not None:
+            cached = cache.lookup(url, session.headers)
+            if cached is not None and cached.is_fresh():
+                cache.record('hits', len(cached.body))
+                increment("cache_hits")
+                self.log(f"  💾 Cache hit ({len(cached.body)} bytes, {cache.format_stats()})\n")
+                html_content = cached.text
+                results, links = self.extract_job(job, html_content)
+                return results, html_content, links
+            if cached is not None:
+                # Stale: ask the server whether our copy is still current
+                headers.update(cached.validators())
+        
+        # A host whose circuit is open fails at once; otherwise the scheduler paces it
+        proxy_url = job.proxy_server()
+        self.breakers.check(url)
+        self.wait_for_host(url, proxy_url)
+        
+        try:
+            # Configure proxy if enabled
+            proxies = None
+            if proxy_url:
+                proxies = {
+                    'http': proxy_url,
+                    'https': proxy_url
+                }
+                self.log(f"  Using proxy: {proxy_url}\n")
+            
+            def fetch(attempt):
+                # Always streamed, so the wait for the headers and the body download are timed apart
+                with span("static_ttfb"):
+                    res = session.get(url, headers=headers, timeout=30, allow_redirects=True, proxies=proxies,
+                                      stream=True)
+                try:
+                    res.raise_for_status()
+                except requests.HTTPError:
+                    res.close()
+                    raise
+                if not job.stream:
+                    # Read inside the attempt, so a transfer cut short is retried like before
+                    with span("static_download"):
+                        res.content
+                return res
+            
+            # Transient failures are retried with backoff; a 404 and the like fail at once
+            res = self.with_retries(url, fetch)
+            
+            if cache is not None and cached is not None and res.status_code == 304:
+                res.close()
+                cache.refresh(cached, res)
+                cache.record('revalidated', len(cached.body))
+                self.log(f"  💾 Not modified, reusing cached copy ({cache.format_stats()})\n")
+                html_content = cached.text
+                doc = None
+                body = cached.body
+            elif job.stream:
+                doc, html_content, body, encoding, complete = self._read_stream(res, job)
+                # A page cut short must not be served from the cache later
+                if cache is not None:
+                    cache.record('misses')
+                    if complete:
+                        cache.store(url, session.headers, res, body=body, encoding=encoding)
+            else:
+                html_content = res.text
+                body = res.content
+                doc = None
+                if cache is not None:
+                    cache.record('misses')
+                    cache.store(url, session.headers, res)
+            
+            increment("response_bytes", len(body))
+            
+            # Check if we got a captcha page; the raw bytes are scanned once, without decoding them
+            verdict = classify_page(body)
+            if verdict.blocked:
+                self.log(f"  ⚠️ Captcha detected ({verdict.describe()})! Consider using dynamic scraping instead.\n")
+            
+            self.wait_if_paused()
+            results, links = self.extract_job(job, html_content, doc)
+            return results, html_content, links
+            
+        except Exception as e:
+            self.log(f"  ❌ Static scraping failed: {str(e)}\n")
+            raise e
+        finally:
+            self.scheduler.release(url)
+    
+    def _read_stream(self, res, job: ScrapeJob):
+        """Parse a streamed response chunk by chunk and stop downloading once the selectors are satisfied"""
+        # Only trust a declared charset; otherwise the parser detects it from the page
+        encoding = res.encoding if 'charset' in res.headers.get('content-type', '').lower() else None
+        chunks = []
+        
+        def received_chunks():
+            for chunk in res.iter_content(STREAM_CHUNK_SIZE):
+                chunks.append(chunk)
+                yield chunk
+        
+        try:
+            wanted = None if job.limit is None else job.offset + job.limit
+            # Download and parse interleave, so they are timed as one phase
+            with span("static_stream"):
+                doc, received, complete = parse_stream(received_chunks(), compile_plan(job.selectors), wanted, encoding)
+        finally:
+            # Drops the connection if the body was not read to the end
+            res.close()
+        
+        if complete:
+            self.log(f"  Read the whole page ({received} bytes).\n")
+        else:
+            self.log(f"  ⏹️ Selectors satisfied, stopped after {received} bytes.\n")
+        
+        body = b''.join(chunks)
+        encoding = encoding or doc.getroottree().docinfo.encoding or 'utf-8'
+        return doc, body.decode(encoding, errors='replace'), body, encoding, complete
+    
+    def get_browser_pool(self, size=1) -> BrowserPool:
+        """Return the persistent browser pool with at least ``size`` browsers, starting it on first use"""
+        with self._session_lock:
+            if self._browser_pool is None:
+                self._browser_pool = BrowserPool(size=size, on_log=self.log)
+            else:
+                self._browser_pool.ensure_size(size)
+            return self._browser_pool
+
+    def scrape_dynamic(self, job: ScrapeJob):
+        """Ultra-robust dynamic scraping method with stealth mode and anti-detection"""
+        url = job.url
+        self.log(f"[DYNAMIC FETCH] {url}\n")
+        
+        try:
+            # Configure proxy if enabled
+            proxy_url = job.proxy_server()
+            if proxy_url:
+                self.log(f"  Using proxy: {proxy_url}\n")
+            
+            # Render the page in a fresh context of a pooled browser, paced per host
+            pool = self.get_browser_pool()
+            self.breakers.check(url)
+            self.wait_for_host(url, proxy_url)
+            try:
+                html_content = pool.run(
+                    lambda page: self._scrape_page(job, page),
+                    proxy=proxy_url,
+                    user_agent=self.get_random_user_agent(),
+                )
+            finally:
+                self.scheduler.release(url)
+            self.log(f"  🧰 Browser pool: {pool.format_stats()}\n")
+            
+            # Extract content using all selector types
+            self.wait_if_paused()
+            self.log("  Processing extracted content...\n")
+            results, links = self.extract_job(job, html_content)
+            self.log("  ✅ Content processing completed.\n")
+            
+            return results, html_content, links
+                
+        except Exception as e:
+            error_msg = f"Dynamic scraping failed: {str(e)}"
+            self.log(f"  ❌ {error_msg}\n")
+            raise Exception(error_msg)
+    
+    def _scrape_page(self, job: ScrapeJob, page):
+        """Navigate a pooled page to the job URL and return the rendered HTML"""
+        url = job.url
+        
+        # Apply enhanced stealth settings to the pooled page
+        try:
+            for script in self._init_scripts(url):
+                page.add_init_script(script)
+            page.set_extra_http_headers(DYNAMIC_HEADERS)
+            # Skip the bytes extraction does not need
+            block_stats = install_blocking(page, job.resource_policy())
+            self.log("  ✅ Page created with stealth settings.\n")
+        except Exception as e:
+            raise Exception(f"Failed to create page: {str(e)}")
+        
+        # Navigate, retrying transient failures with backoff and a more patient wait strategy
+        self.log("  Navigating to page...\n")
+        
+        def navigate(attempt):
+            with span("dynamic_goto"):
+                response = page.goto(url, timeout=NAVIGATION_TIMEOUT_MS, wait_until=navigation_wait(attempt))
+            check_response(response)
+            self.log(f"  ✅ Page loaded successfully (attempt {attempt + 1})\n")
+        
+        self.with_retries(url, navigate)
+        
+        # Wait until the requested content is present and the DOM has settled
+        self.wait_if_paused()
+        self.log("  Waiting for dynamic content to load...\n")
+        with span("dynamic_readiness"):
+            ready, waited = wait_until_ready(page, job.selectors, job.quiet_ms, job.ready_timeout)
+        self._log_readiness(ready, waited)
+        
+        scroll_started = time.perf_counter()
+        if job.simulate_human:
+            self._simulate_human(page)
+        else:
+            self._lazy_scroll(job, page)
+        record_span("dynamic_scroll", time.perf_counter() - scroll_started)
+        
+        self.log("  Extracting page content...\n")
+        try:
+            with span("dynamic_content"):
+                html_content = page.content()
+            self._log_content(html_content, block_stats)
+            return self._handle_captcha(job, page, html_content)
+        except Exception as e:
+            raise Exception(f"Failed to extract content: {str(e)}")
+    
+    def _simulate_human(self, page):
+        """Scroll like a reader and move the mouse a little"""
+        try:
+            self.log("  Simulating human-like scrolling...\n")
+            for position, pause in scroll_steps(page.evaluate("document.body.scrollHeight")):
+                page.evaluate(f"window.scrollTo(0, {position})")
+                time.sleep(pause)
+            try:
+                for x, y in mouse_wander_points():
+                    page.mouse.move(x, y)
+                    time.sleep(random.uniform(0.5, 1.5))
+            except Exception:
+                pass
+            self.log("  ✅ Human-like behavior simulation completed.\n")
+        except Exception as e:
+            self.log(f"  ⚠️ Scrolling simulation failed: {str(e)[:50]}...\n")
+    
+    def _lazy_scroll(self, job: ScrapeJob, page):
+        """Trigger lazy-loaded content with a quick scroll, then let the DOM settle again"""
+        try:
+            page.evaluate(LAZY_SCROLL_SCRIPT, LAZY_SCROLL_STEPS)
+            wait_until_ready(page, SelectorSpec(), job.quiet_ms, min(LAZY_SETTLE_TIMEOUT, job.ready_timeout))
+        except Exception as e:
+            self.log(f"  ⚠️ Lazy-load scroll failed: {str(e)[:50]}...\n")
+    
+    def _handle_captcha(self, job: ScrapeJob, page, html_content):
+        """Try to get past a blocked page; returns the HTML to extract from"""
+        # One verdict gives both the decision and the captcha type
+        verdict = classify_page(html_content)
+        if not verdict.blocked:
+            return html_content
+        captcha_type = self._log_blocked(verdict)
+        
+        captcha_solved = False
+        if captcha_type == CAPTCHA_ALIBABA:
+            self.log("  🎯 Attempting to solve Alibaba NoCaptcha slider...\n")
+            captcha_solved = self.solve_alibaba_nocaptcha(page, job.url)
+            if captcha_solved:
+                # Wait and check if page changed
+                time.sleep(3)
+                html_content = page.content()
+                self._log_slider_outcome(html_content)
+        elif job.captcha_key():
+            self.log("  🔐 Attempting to solve captcha with 2Captcha...\n")
+            captcha_solved = self._solve_with_2captcha(job, page, captcha_type, html_content)
+            if captcha_solved:
+                # Wait a bit and refresh page
+                time.sleep(CAPTCHA_SUBMIT_WAIT)
+                page.reload()
+                time.sleep(CAPTCHA_RELOAD_WAIT)
+                html_content = page.content()
+                self.log("  🔄 Page reloaded after captcha solution\n")
+            else:
+                self.log("  ⚠️ Could not solve captcha automatically\n")
+        
+        if not captcha_solved:
+            self._log_captcha_advice(captcha_type)
+        return html_content
+    
+    def _solve_with_2captcha(self, job: ScrapeJob, page, captcha_type, html_content):
+        """Have 2Captcha solve the page's captcha and hand the answer to the page"""
+        try:
+            if captcha_type in TOKEN_CAPTCHAS:
+                site_key = self._site_key(captcha_type, html_content)
+                solution = site_key and self.solve_2captcha(job.captcha_key(), captcha_type, job.url, site_key)
+                if solution:
+                    page.evaluate(token_injection_script(captcha_type, solution))
+                    return self._captcha_answered(captcha_type)
+            elif captcha_type == CAPTCHA_IMAGE:
+                captcha_img = page.query_selector(CAPTCHA_IMAGE_SELECTOR)
+                if captcha_img:
+                    img_data = captcha_img.screenshot()
+                    solution = self.solve_2captcha(job.captcha_key(), "image", job.url, None, img_data)
+                    input_field = solution and page.query_selector(CAPTCHA_INPUT_SELECTOR)
+                    if input_field:
+                        input_field.fill(solution)
+                        return self._captcha_answered(captcha_type)
+        except Exception as e:
+            self.log(f"  ❌ {self._captcha_name(captcha_type)} solving failed: {str(e)}\n")
+        return False
+    
+    def _init_scripts(self, url):
+        """Init scripts for a page about to load ``url``"""
+        scripts = [self.get_enhanced_stealth_script()]
+        if self.is_ecommerce_site(url):
+            self.log("  🛒 E-commerce site detected - applying enhanced stealth...\n")
+            scripts.append(ECOMMERCE_STEALTH_SCRIPT)
+        return scripts
+    
+    def _log_readiness(self, ready, waited):
+        if ready:
+            self.log(f"  ✅ Content ready after {waited:.1f}s.\n")
+        else:
+            self.log(f"  ⚠️ Content not ready after {waited:.1f}s, continuing...\n")
+    
+    def _log_content(self, html_content, block_stats):
+        increment("response_bytes", len(html_content.encode('utf-8')))
+        self.log(f"  ✅ Content extracted ({len(html_content)} characters).\n")
+        self.log(f"  🚫 Resources: {block_stats.format()}\n")
+    
+    def _log_blocked(self, verdict):
+        """Log a blocked page's verdict and return its captcha type"""
+        self.log(f"  ⚠️ Captcha or blocking detected in content ({verdict.describe()})!\n")
+        self.log(f"  🔍 Detected captcha type: {verdict.captcha_type}\n")
+        return verdict.captcha_type
+    
+    def _log_slider_outcome(self, html_content):
+        if not self.detect_captcha_or_blocking(html_content):
+            self.log("  ✅ Alibaba NoCaptcha solved successfully!\n")
+        else:
+            self.log("  ⚠️ Captcha still present, continuing anyway...\n")
+    
+    def _log_captcha_advice(self, captcha_type):
+        self.log("  💡 Recommendations:\n")
+        for advice in captcha_advice(captcha_type):
+            self.log(f"     • {advice}\n")
+    
+    def _captcha_name(self, captcha_type):
+        return TOKEN_CAPTCHAS[captcha_type][0] if captcha_type in TOKEN_CAPTCHAS else "Image captcha"
+    
+    def _site_key(self, captcha_type, html_content):
+        """The page's site key for a token captcha, logged when found"""
+        site_key = find_site_key(html_content)
+        if site_key:
+            self.log(f"  📝 Found {self._captcha_name(captcha_type)}, site key: {site_key}\n")
+        return site_key
+    
+    def _captcha_answered(self, captcha_type):
+        if captcha_type in TOKEN_CAPTCHAS:
+            self.log(f"  ✅ {self._captcha_name(captcha_type)} solution injected!\n")
+        else:
+            self.log("  ✅ Image captcha solution entered!\n")
+        return True
+    
+
+    def extract_job(self, job: ScrapeJob, html_content, doc=None):
+        """Extract a job's selectors with its limit, offset and sink; returns (results, links)
+
+        The page's links are collected from the same parse as its items, so
+        a crawl never parses a page a second time. ``links`` is None unless
+        the job has link selectors.
+        """
+        items = None
+        link_found = None
+        if doc is None and self.extraction_pool is not None:
+            # Parsing and matching run in a worker process; only the matched strings come back
+            with span("extract_pool"):
+                items = self.extraction_pool.extract(html_content, job.url, job.selectors, job.limit, job.offset,
+                                                     job.link_selectors)
+            link_found = items.pop(LINKS, None)
+        elif doc is None:
+            with span("parse"):
+                doc = parse_document(html_content)
+        results = self.extract_content(html_content, job.url, job.selectors, doc, job.limit, job.offset, job.sink,
+                                       items)
+        if job.link_selectors is None:
+            return results, None
+        if link_found is None:
+            link_found = link_items(doc, compile_plan(job.link_selectors), job.url)
+        links = []
+        for kind, value, _ in link_found:
+            if kind == ITEM_LINK:
+                links.append(value)
+            else:
+                self.log(f"  ⚠️ {value}\n")
+        return results, links
+    
+    def extract_content(self, html_content, base_url, selectors: SelectorSpec, doc=None,
+                        limit=RESULT_LIMIT, offset=0, sink: Optional[ResultSink] = None,
+                        items: Optional[ExtractedItems] = None):
+        """Parse the page once (unless it was already parsed) and extract every requested selector
+
+        Items are produced lazily. With a sink they are written to it as they
+        are found and the returned lists stay empty; only the first few per
+        selector are logged and shown as images. ``items`` already extracted
+        elsewhere (by an ExtractionPool) skip the parse.
+        """
+        plan: SelectorPlan = compile_plan(selectors)
+        if items is None:
+            if doc is None:
+                with span("parse"):
+                    doc = parse_document(html_content)
+            items = iter_plan_items(doc, plan, base_url, limit, offset)
+        fetched_at = datetime.now(timezone.utc)
+        results = {}
+        
+        for selector_type in plan.selector_types():
+            selector = getattr(selectors, SELECTOR_FIELDS[selector_type])
+            self.log(f"\nResults for {SELECTOR_LABELS[selector_type].format(selector)}:\n")
+            values = results[selector_type] = []
+            count = 0
+            failed = False
+            started = time.perf_counter()
+            last_match, item_index = None, 0
+            
+            for kind, value, match in items[selector_type]:
+                if kind == ITEM_ERROR:
+                    failed = True
+                    self.log(f"  {value}\n")
+                    continue
+                # A match's text and images share its position and are told apart by their item index
+                item_index = item_index + 1 if match == last_match else 0
+                last_match = match
+                record = ScrapeRecord(
+                    url=base_url,
+                    selector_type=selector_type,
+                    selector=selector,
+                    position=match,
+                    item=item_index,
+                    text=value if kind != ITEM_IMAGE else None,
+                    image_url=value if kind == ITEM_IMAGE else None,
+                    fetched_at=fetched_at,
+                )
+                count += 1
+                if sink is not None:
+                    sink.write(record)
+                else:
+                    values.append(record.value)
+                if count <= LOGGED_ITEMS_PER_SELECTOR:
+                    self.log(f"  {record.value}\n")
+                    if record.image_url:
+                        self.emit(EVENT_IMAGE, url=record.image_url)
+            
+            # Matching is lazy, so this is the selector's extraction time (plus writing its items)
+            record_span("extract", time.perf_counter() - started, selector=selector_type)
+            if count > LOGGED_ITEMS_PER_SELECTOR:
+                self.log(f"  ... and {count - LOGGED_ITEMS_PER_SELECTOR} more ({count} items)\n")
+            if selector_type == 'id' and count == 0 and not failed:
+                self.log("  No element found\n")
+        
+        if sink is not None:
+            sink.flush()
+        return results
@@ -0,0 +1,363 @@
+"""Output sinks for extracted items.
+
+The engine hands every extracted item to a sink as soon as it is produced,
+so a job with no result limit keeps memory flat however many items a page
+has. Sinks may be shared by the workers of a batch and must be thread-safe.
+
+Items are typed ScrapeRecords. Row sinks append one record per item (NDJSON
+or CSV) through a buffered file and flush every few hundred records, every
+second and after every page, so a crash or a stop loses nothing already
+extracted. Columnar sinks (Parquet, Arrow IPC stream) batch records into row groups
+with dictionary-encoded string columns; they need the optional pyarrow
+package and are only readable once closed.
+
+A resumed job appends to its row export. Pages in flight when it stopped may
+have flushed part of their records and are fetched again, so before resuming
+the records of the job's unfinished pages are removed from the file
+(``drop_unfinished``); records of other runs stay. Columnar files are
+rewritten by every run and cannot be resumed (``can_resume``).
+"""
+
+import csv
+import json
+import os
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from typing import Container, List, Optional
+
+
+# Buffered file writes, and how often buffered records are pushed to disk
+EXPORT_BUFFER_SIZE = 64 * 1024
+FLUSH_EVERY_RECORDS = 500
+FLUSH_INTERVAL = 1.0
+
+# Rows buffered per Parquet row group / Arrow record batch
+ROW_GROUP_SIZE = 64 * 1024
+
+
+@dataclass
+class ScrapeRecord:
+    """One extracted item: text, or the URL of an image"""
+    url: str
+    selector_type: str
+    selector: str
+    # Index of the matched element among its selector's matches on this page (offset included)
+    position: int
+    # Index of the item among its element's items: its text first, then its images
+    item: int
+    text: Optional[str]
+    image_url: Optional[str]
+    fetched_at: datetime
+
+    @property
+    def is_image(self):
+        return self.text is None
+
+    @property
+    def value(self) -> str:
+        """Display form used in the results pane and in-memory results"""
+        if self.is_image:
+            return f"[IMAGE] {self.image_url}" if self.image_url else "[IMAGE] No source found"
+        return self.text
+
+    def to_row(self):
+        """Flat dict with the timestamp as ISO 8601"""
+        row = asdict(self)
+        row['fetched_at'] = self.fetched_at.isoformat()
+        return row
+
+
+EXPORT_FIELDS = ('url', 'selector_type', 'selector', 'position', 'item', 'text', 'image_url', 'fetched_at')
+
+
+class ResultSink:
+    """Receives extracted items one at a time"""
+
+    def write(self, record: ScrapeRecord):
+        """Accept one extracted item"""
+        raise NotImplementedError
+
+    def flush(self):
+        """Make everything written so far durable; called after every page"""
+
+    def close(self):
+        """Flush and release whatever the sink holds"""
+
+    @property
+    def written(self) -> int:
+        """Records accepted so far"""
+        return self.records
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class MemorySink(ResultSink):
+    """Collects records in a list"""
+
+    def __init__(self):
+        self.records: List[ScrapeRecord] = []
+        self._lock = threading.Lock()
+
+    def write(self, record: ScrapeRecord):
+        with self._lock:
+            self.records.append(record)
+
+    @property
+    def written(self) -> int:
+        return len(self.records)
+
+
+class FileSink(ResultSink):
+    """Appends records to a file with buffered writes and periodic flushes"""
+
+    def __init__(self, path, flush_every=FLUSH_EVERY_RECORDS, flush_interval=FLUSH_INTERVAL):
+        self.path = path
+        self.flush_every = flush_every
+        self.flush_interval = flush_interval
+        self.records = 0
+        self._lock = threading.Lock()
+        # Appending lets an interrupted run be continued into the same file
+        self._new_file = not os.path.exists(path) or os.path.getsize(path) == 0
+        self._file = open(path, 'a', encoding='utf-8', newline='', buffering=EXPORT_BUFFER_SIZE)
+        self._pending = 0
+        self._last_flush = time.monotonic()
+
+    def write(self, record: ScrapeRecord):
+        with self._lock:
+            if self._file is None:
+                raise Exception(f"Export file is closed: {self.path}")
+            self._write_record(record.to_row())
+            self.records += 1
+            self._pending += 1
+            if self._pending >= self.flush_every or time.monotonic() - self._last_flush >= self.flush_interval:
+                self._flush()
+
+    def flush(self):
+        with self._lock:
+            if self._file is not None:
+                self._flush()
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._flush()
+                self._file.close()
+                self._file = None
+
+    def _flush(self):
+        self._file.flush()
+        self._pending = 0
+        self._last_flush = time.monotonic()
+
+    def _write_record(self, record):
+        raise NotImplementedError
+
+    @classmethod
+    def discard(cls, path, urls: Container[str]) -> int:
+        """Rewrite the file without the records of ``urls`` or a record cut short; returns how many were dropped"""
+        raise NotImplementedError
+
+
+@contextmanager
+def _rewrite(path):
+    """Text file replacing ``path`` once the block completes; the original stays on failure"""
+    fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)), suffix=".tmp")
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8', newline='', buffering=EXPORT_BUFFER_SIZE) as f:
+            yield f
+        os.replace(temp_path, path)
+    except BaseException:
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+        raise
+
+
+class JsonlSink(FileSink):
+    """One JSON object per line (NDJSON)"""
+
+    def _write_record(self, record):
+        self._file.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+    @classmethod
+    def discard(cls, path, urls: Container[str]) -> int:
+        dropped = 0
+        with open(path, 'r', encoding='utf-8', newline='') as source, _rewrite(path) as target:
+            for line in source:
+                try:
+                    complete = line.endswith("\n")
+                    url = json.loads(line)['url']
+                except (ValueError, KeyError, TypeError):
+                    # A line cut short by a crash
+                    complete = False
+                if complete and url not in urls:
+                    target.write(line)
+                else:
+                    dropped += 1
+        return dropped
+
+
+class CsvSink(FileSink):
+    """CSV with a header row written once per file"""
+
+    def __init__(self, path, **kwargs):
+        super().__init__(path, **kwargs)
+        self._writer = csv.DictWriter(self._file, fieldnames=EXPORT_FIELDS)
+        if self._new_file:
+            self._writer.writeheader()
+
+    def _write_record(self, record):
+        self._writer.writerow(record)
+
+    @classmethod
+    def discard(cls, path, urls: Container[str]) -> int:
+        dropped = 0
+        with open(path, 'r', encoding='utf-8', newline='') as source, _rewrite(path) as target:
+            writer = csv.DictWriter(target, fieldnames=EXPORT_FIELDS)
+            writer.writeheader()
+            for row in csv.DictReader(source):
+                # A row cut short by a crash goes too
+                if row.get('url') not in urls and None not in row.values():
+                    writer.writerow(row)
+                else:
+                    dropped += 1
+        return dropped
+
+
+class ColumnarSink(ResultSink):
+    """Buffers records column by column and writes them in row groups with pyarrow"""
+
+    def __init__(self, path, row_group_size=ROW_GROUP_SIZE):
+        try:
+            import pyarrow as pa
+        except ImportError:
+            raise Exception("Parquet/Arrow export needs pyarrow: pip install pyarrow")
+        self.pa = pa
+        self.path = path
+        self.row_group_size = row_group_size
+        self.records = 0
+        # Repeated strings (URL, selector) are dictionary-encoded; item text is not
+        self.schema = pa.schema([
+            ('url', pa.dictionary(pa.int32(), pa.string())),
+            ('selector_type', pa.dictionary(pa.int8(), pa.string())),
+            ('selector', pa.dictionary(pa.int32(), pa.string())),
+            ('position', pa.int32()),
+            ('item', pa.int32()),
+            ('text', pa.string()),
+            ('image_url', pa.string()),
+            ('fetched_at', pa.timestamp('us', tz='UTC')),
+        ])
+        self._columns = {name: [] for name in self.schema.names}
+        self._lock = threading.Lock()
+        self._writer = self._open_writer()
+
+    def write(self, record: ScrapeRecord):
+        with self._lock:
+            if self._writer is None:
+                raise Exception(f"Export file is closed: {self.path}")
+            for name, column in self._columns.items():
+                column.append(getattr(record, name))
+            self.records += 1
+            if len(self._columns['url']) >= self.row_group_size:
+                self._write_batch()
+
+    def close(self):
+        with self._lock:
+            if self._writer is None:
+                return
+            if self._columns['url']:
+                self._write_batch()
+            self._close_writer()
+            self._writer = None
+
+    def _write_batch(self):
+        pa = self.pa
+        arrays = []
+        for field in self.schema:
+            values = self._columns[field.name]
+            if pa.types.is_dictionary(field.type):
+                arrays.append(pa.array(values, type=pa.string()).dictionary_encode().cast(field.type))
+            else:
+                arrays.append(pa.array(values, type=field.type))
+        self._write_table(pa.Table.from_arrays(arrays, schema=self.schema))
+        self._columns = {name: [] for name in self.schema.names}
+
+    def _open_writer(self):
+        raise NotImplementedError
+
+    def _write_table(self, table):
+        raise NotImplementedError
+
+    def _close_writer(self):
+        self._writer.close()
+
+
+class ParquetSink(ColumnarSink):
+    """Parquet file, one row group per ``row_group_size`` records"""
+
+    def _open_writer(self):
+        import pyarrow.parquet as pq
+        return pq.ParquetWriter(self.path, self.schema, compression='zstd', use_dictionary=True)
+
+    def _write_table(self, table):
+        self._writer.write_table(table, row_group_size=self.row_group_size)
+
+
+class ArrowSink(ColumnarSink):
+    """Arrow IPC stream, one record batch per ``row_group_size`` records
+
+    The stream format is used because each batch carries its own dictionaries,
+    which the IPC file format does not allow.
+    """
+
+    def _open_writer(self):
+        self._file = self.pa.OSFile(self.path, 'wb')
+        return self.pa.ipc.new_stream(self._file, self.schema)
+
+    def _write_table(self, table):
+        self._writer.write_table(table)
+
+    def _close_writer(self):
+        self._writer.close()
+        self._file.close()
+
+
+# File extensions understood by open_sink
+SINK_TYPES = {
+    '.jsonl': JsonlSink,
+    '.ndjson': JsonlSink,
+    '.csv': CsvSink,
+    '.parquet': ParquetSink,
+    '.arrows': ArrowSink,
+}
+
+
+def can_resume(path) -> bool:
+    """Whether a resumed job can keep appending to this export; columnar files are rewritten by every run"""
+    sink_type = SINK_TYPES.get(os.path.splitext(path)[1].lower())
+    return sink_type is None or issubclass(sink_type, FileSink)
+
+
+def drop_unfinished(path, unfinished_urls: Container[str]) -> int:
+    """Remove the records of a resumed job's unfinished pages from its row export; returns the records dropped"""
+    sink_type = SINK_TYPES.get(os.path.splitext(path)[1].lower())
+    if sink_type is None or not issubclass(sink_type, FileSink) or not os.path.exists(path):
+        return 0
+    return sink_type.discard(path, unfinished_urls)
+
+
+def open_sink(path, **kwargs) -> FileSink:
+    """Open the file sink matching the extension of ``path``"""
+    extension = os.path.splitext(path)[1].lower()
+    if extension not in SINK_TYPES:
+        raise Exception(f"Unsupported export format: {extension or path}")
+    return SINK_TYPES[extension](path, **kwargs)
@@ -0,0 +1,427 @@
+"""Single-parse extraction for every selector type.
+
+Each page is parsed once into an lxml document. Matches are produced lazily,
+per selector type, with a configurable limit and offset, so a caller can
+stream every product of a long listing into a sink without building lists.
+Tag, class and id requested together share one walk of the tree
+(PlanMatches). CSS selectors are compiled to XPath by cssselect, and images
+inside matched elements are found on the same tree instead of
+re-serializing and re-parsing each match.
+
+parse_stream builds the same tree incrementally from downloaded chunks and
+stops as soon as every selector of a plan has enough complete matches, so a
+long page whose wanted items sit near the top is neither fully downloaded
+nor fully parsed.
+"""
+
+from functools import lru_cache
+from itertools import islice
+from typing import Dict, Iterator, List, Optional, Tuple
+from urllib.parse import urljoin, urlsplit
+
+from lxml import etree, html
+from lxml.cssselect import CSSSelector
+
+
+# Default number of matches used per selector type (None means all)
+RESULT_LIMIT = 10
+
+# Selector types matched by walking the tree rather than by a compiled expression
+SIMPLE_SELECTOR_TYPES = ('tag', 'class', 'id')
+
+# Item kinds produced by iter_selector_items; items are (kind, value, match) with the
+# index of the match the item came from among the selector's matches (None for errors and links)
+ITEM_TEXT = "text"
+ITEM_IMAGE = "image"
+ITEM_ERROR = "error"
+ITEM_LINK = "link"
+
+Item = Tuple[str, Optional[str], Optional[int]]
+
+# Key of the followed links among ExtractedItems, next to the selector types
+LINKS = "links"
+
+# Link schemes a crawl follows
+_LINK_SCHEMES = ('http', 'https')
+
+# Text nodes of an element, skipping script and style bodies like BeautifulSoup's get_text
+_TEXT_NODES = etree.XPath(".//text()[not(parent::script) and not(parent::style)]", smart_strings=False)
+
+# Attributes that may carry an image URL, in order of preference
+IMAGE_SOURCE_ATTRIBUTES = ('src', 'data-src', 'data-lazy-src', 'data-original')
+
+
+# Used for text that carries its own XML encoding declaration
+_UTF8_PARSER = html.HTMLParser(encoding='utf-8')
+
+# Bytes read per network chunk when streaming a page
+STREAM_CHUNK_SIZE = 64 * 1024
+
+
+def parse_document(html_content):
+    """Parse a page once; an empty or unparsable page becomes an empty document"""
+    try:
+        return html.document_fromstring(html_content)
+    except ValueError:
+        # lxml refuses str input with an encoding declaration
+        return html.document_fromstring(html_content.encode('utf-8'), parser=_UTF8_PARSER)
+    except etree.ParserError:
+        return html.document_fromstring("<html></html>")
+
+
+def element_text(element) -> str:
+    """Stripped text of an element, joined without separators"""
+    return ''.join(part.strip() for part in _TEXT_NODES(element))
+
+
+def get_image_url(img_element, base_url=None) -> Optional[str]:
+    """Get image URL from img element"""
+    for attribute in IMAGE_SOURCE_ATTRIBUTES:
+        img_url = img_element.get(attribute)
+        if img_url:
+            # Convert relative URL to absolute
+            if base_url and not img_url.startswith(('http://', 'https://', 'data:')):
+                img_url = urljoin(base_url, img_url)
+            return img_url
+    return None
+
+
+def element_items(element, base_url=None) -> Iterator[Tuple[str, Optional[str]]]:
+    """Text and images of one matched element"""
+    if element.tag == 'img':
+        yield ITEM_IMAGE, get_image_url(element, base_url)
+        return
+    text = element_text(element)
+    if text:
+        yield ITEM_TEXT, text
+    for img in element.iterdescendants('img'):
+        img_url = get_image_url(img, base_url)
+        if img_url:
+            yield ITEM_IMAGE, img_url
+
+
+def has_class(element, class_name) -> bool:
+    """Match like BeautifulSoup's class_: one of the classes, or the whole attribute"""
+    classes = element.get('class')
+    if not classes:
+        return False
+    return classes == class_name or class_name in classes.split()
+
+
+class SelectorError(ValueError):
+    """One or more selectors of a job do not compile"""
+
+
+class SelectorPlan:
+    """Selectors of a job compiled once and reused for every page
+
+    CSS is translated to XPath by cssselect and both are compiled with
+    etree.XPath, so syntax errors surface here, before anything is fetched.
+    """
+
+    def __init__(self, selectors):
+        self.selectors = selectors
+        self.tag = selectors.tag.lower() if selectors.tag else None
+        self.class_name = selectors.class_name or None
+        self.id_name = selectors.id_name or None
+        self.css = None
+        self.xpath = None
+        # Same expression with smart strings, so streamed text results can be traced to their element
+        self.xpath_probe = None
+
+        errors = []
+        if selectors.css_selector:
+            try:
+                self.css = CSSSelector(selectors.css_selector)
+            except Exception as e:
+                errors.append(f"CSS selector error: {str(e)}")
+        if selectors.xpath_selector:
+            try:
+                self.xpath = etree.XPath(selectors.xpath_selector, smart_strings=False)
+                self.xpath_probe = etree.XPath(selectors.xpath_selector)
+            except Exception as e:
+                errors.append(f"XPath error: {str(e)}")
+        if errors:
+            raise SelectorError("; ".join(errors))
+
+    def selector_types(self) -> List[str]:
+        """Requested selector types, in output order"""
+        wanted = [
+            ('tag', self.tag),
+            ('class', self.class_name),
+            ('id', self.id_name),
+            ('css', self.css),
+            ('xpath', self.xpath),
+        ]
+        return [selector_type for selector_type, value in wanted if value is not None]
+
+
+@lru_cache(maxsize=64)
+def compile_plan(selectors) -> SelectorPlan:
+    """Compile a SelectorSpec, reusing the plan for equal specs"""
+    return SelectorPlan(selectors)
+
+
+def match_simple(doc, tag=None, class_name=None, id_name=None, limit=RESULT_LIMIT):
+    """Match tag, class and id in a single walk; stop once every limit is reached (None walks the whole tree)"""
+    tag_matches = []
+    class_matches = []
+    id_match = None
+    want_tag = bool(tag)
+    want_class = bool(class_name)
+    want_id = bool(id_name)
+
+    for element in doc.iter(etree.Element):
+        if want_tag and element.tag == tag:
+            tag_matches.append(element)
+            want_tag = limit is None or len(tag_matches) < limit
+        if want_class and has_class(element, class_name):
+            class_matches.append(element)
+            want_class = limit is None or len(class_matches) < limit
+        if want_id and element.get('id') == id_name:
+            id_match = element
+            want_id = False
+        if not (want_tag or want_class or want_id):
+            break
+
+    return tag_matches, class_matches, id_match
+
+
+def xpath_items(result, base_url=None) -> Iterator[Tuple[str, Optional[str]]]:
+    """Text and images of one XPath result: elements as usual, strings and numbers as text"""
+    if isinstance(result, etree._Element):
+        if isinstance(result.tag, str):
+            yield from element_items(result, base_url)
+    else:
+        text = str(result).strip()
+        if text:
+            yield ITEM_TEXT, text
+
+
+def selector_matches(doc, plan: SelectorPlan, selector_type):
+    """Raw matches of one selector type: elements, or XPath strings and numbers
+
+    Lazy for tag, class and id (an id names at most one element). CSS and
+    XPath evaluation errors are raised to the caller.
+    """
+    if selector_type == 'tag':
+        return doc.iter(plan.tag)
+    if selector_type == 'class':
+        return (element for element in doc.iter(etree.Element) if has_class(element, plan.class_name))
+    if selector_type == 'id':
+        return islice((element for element in doc.iter(etree.Element) if element.get('id') == plan.id_name), 1)
+    if selector_type == 'css':
+        return plan.css(doc)
+    if selector_type == 'xpath':
+        results = plan.xpath(doc)
+        return results if isinstance(results, list) else [results]
+    raise ValueError(f"Unknown selector type: {selector_type}")
+
+
+class PlanMatches:
+    """Raw matches per selector type of one parsed page
+
+    With more than one of tag, class and id requested, the first of them to
+    be read walks the tree once for all three, keeping the first ``stop``
+    matches of each (None keeps all); the others reuse that walk. A single
+    simple type, CSS and XPath are evaluated lazily on their own.
+    """
+
+    def __init__(self, doc, plan: SelectorPlan, stop=RESULT_LIMIT):
+        self.doc = doc
+        self.plan = plan
+        self.stop = stop
+        self.shared = sum(t in SIMPLE_SELECTOR_TYPES for t in plan.selector_types()) > 1
+        self._walked = None
+
+    def __call__(self, selector_type):
+        if not self.shared or selector_type not in SIMPLE_SELECTOR_TYPES:
+            return selector_matches(self.doc, self.plan, selector_type)
+        if self._walked is None:
+            plan = self.plan
+            tag_matches, class_matches, id_match = match_simple(self.doc, plan.tag, plan.class_name, plan.id_name,
+                                                                self.stop)
+            self._walked = {'tag': tag_matches, 'class': class_matches,
+                            'id': [id_match] if id_match is not None else []}
+        return self._walked[selector_type]
+
+
+# Item text reported when a selector fails to evaluate
+_EVALUATION_ERRORS = {
+    'css': "CSS selector error",
+    'xpath': "XPath error",
+}
+
+
+def iter_selector_items(doc, plan: SelectorPlan, selector_type, base_url=None, limit=RESULT_LIMIT,
+                        offset=0, matches: Optional[PlanMatches] = None) -> Iterator[Item]:
+    """Lazily yield the (kind, value, match) items of one selector type
+
+    The first ``offset`` matches are skipped and at most ``limit`` are used;
+    a limit of None means every match. One match can give several items
+    (its text and images), which share its index. Tag, class and id walk the
+    tree only as far as needed; pass the page's PlanMatches to share that
+    walk between them. A selector that fails to evaluate yields a single
+    ITEM_ERROR.
+    """
+    stop = None if limit is None else offset + limit
+    try:
+        matches = selector_matches(doc, plan, selector_type) if matches is None else matches(selector_type)
+    except Exception as e:
+        if selector_type not in _EVALUATION_ERRORS:
+            raise
+        yield ITEM_ERROR, f"{_EVALUATION_ERRORS[selector_type]}: {str(e)}", None
+        return
+
+    match_items = xpath_items if selector_type == 'xpath' else element_items
+    for match, found in enumerate(islice(matches, offset, stop), offset):
+        for kind, value in match_items(found, base_url):
+            yield kind, value, match
+
+
+def iter_plan_items(doc, plan: SelectorPlan, base_url=None, limit=RESULT_LIMIT,
+                    offset=0) -> Dict[str, Iterator[Item]]:
+    """Lazy items per selector type of a plan, in output order, sharing one walk between tag, class and id"""
+    matches = PlanMatches(doc, plan, None if limit is None else offset + limit)
+    return {
+        selector_type: iter_selector_items(doc, plan, selector_type, base_url, limit, offset, matches)
+        for selector_type in plan.selector_types()
+    }
+
+
+def iter_items(doc, plan: SelectorPlan, base_url=None, limit=RESULT_LIMIT,
+               offset=0) -> Iterator[Tuple[str, str, Optional[str]]]:
+    """Lazily yield (selector type, item kind, value) for every selector of a plan"""
+    for selector_type, items in iter_plan_items(doc, plan, base_url, limit, offset).items():
+        for kind, value, _ in items:
+            yield selector_type, kind, value
+
+
+def extract_items(doc, plan: SelectorPlan, base_url=None, limit=RESULT_LIMIT,
+                  offset=0) -> Dict[str, List[Item]]:
+    """Evaluate every selector of a compiled plan on one parsed document
+
+    Returns items per selector type ('tag', 'class', 'id', 'css', 'xpath') in
+    that order, materialized from iter_plan_items.
+    """
+    return {selector_type: list(items)
+            for selector_type, items in iter_plan_items(doc, plan, base_url, limit, offset).items()}
+
+
+def extract_links(doc, plan: SelectorPlan, base_url) -> Iterator[str]:
+    """Absolute http(s) URLs of the links matched by a compiled plan
+
+    A matched element contributes its own ``href``, or the hrefs of the
+    anchors inside it; XPath string results (``//a/@href``) are URLs already.
+    """
+    matches = PlanMatches(doc, plan, None)
+    for selector_type in plan.selector_types():
+        for match in matches(selector_type):
+            if isinstance(match, etree._Element):
+                if not isinstance(match.tag, str):
+                    continue
+                anchors = [match] if match.get('href') is not None else match.iterdescendants('a')
+                hrefs = (anchor.get('href') for anchor in anchors)
+            else:
+                hrefs = [str(match)]
+            for href in hrefs:
+                href = (href or '').strip()
+                if not href:
+                    continue
+                url = urljoin(base_url, href)
+                if urlsplit(url).scheme in _LINK_SCHEMES:
+                    yield url
+
+
+def link_items(doc, plan: SelectorPlan, base_url) -> List[Item]:
+    """A page's links as ITEM_LINK items, or one ITEM_ERROR when the link selectors fail on it"""
+    try:
+        return [(ITEM_LINK, url, None) for url in extract_links(doc, plan, base_url)]
+    except Exception as e:
+        return [(ITEM_ERROR, f"Link extraction failed: {str(e)}", None)]
+
+
+def _complete(result, open_elements) -> bool:
+    """Whether an element (or the element holding a text result) has been fully parsed"""
+    element = result if isinstance(result, etree._Element) else getattr(result, 'getparent', lambda: None)()
+    return element is not None and element not in open_elements
+
+
+def _plan_satisfied(plan: SelectorPlan, root, counts, open_elements, limit) -> bool:
+    """Whether the first ``limit`` matches of every selector are already complete"""
+    if limit is None or not plan.selector_types():
+        # Every match wanted, or nothing to look for: read the whole page
+        return False
+    # Closed-element counts are a cheap gate before walking the partial tree
+    if (plan.tag and counts['tag'] < limit) or (plan.class_name and counts['class'] < limit) \
+            or (plan.id_name and not counts['id']):
+        return False
+
+    if plan.tag or plan.class_name or plan.id_name:
+        tag_matches, class_matches, id_match = match_simple(root, plan.tag, plan.class_name, plan.id_name, limit)
+        simple = tag_matches + class_matches + ([id_match] if id_match is not None else [])
+        if not all(_complete(element, open_elements) for element in simple):
+            return False
+
+    for selector in (plan.css, plan.xpath_probe):
+        if selector is None:
+            continue
+        try:
+            results = selector(root)
+        except Exception:
+            # Let the full parse report the error
+            return False
+        # Numbers and booleans depend on the whole document
+        if not isinstance(results, list) or len(results) < limit:
+            return False
+        if not all(_complete(result, open_elements) for result in results[:limit]):
+            return False
+    return True
+
+
+def parse_stream(chunks, plan: SelectorPlan, limit=RESULT_LIMIT, encoding=None):
+    """Parse byte chunks incrementally, stopping once ``plan`` has ``limit`` complete matches
+
+    A limit of None reads the whole stream. Returns (document, bytes read, whether the whole stream was read).
+    """
+    parser = etree.HTMLPullParser(events=('start', 'end'), encoding=encoding)
+    open_elements = []
+    counts = {'tag': 0, 'class': 0, 'id': 0}
+    root = None
+    received = 0
+    complete = True
+
+    for chunk in chunks:
+        if not chunk:
+            continue
+        received += len(chunk)
+        parser.feed(chunk)
+        for event, element in parser.read_events():
+            if event == 'start':
+                if root is None:
+                    root = element
+                open_elements.append(element)
+                continue
+            if open_elements and open_elements[-1] is element:
+                open_elements.pop()
+            elif element in open_elements:
+                open_elements.remove(element)
+            if not isinstance(element.tag, str):
+                continue
+            if plan.tag and element.tag == plan.tag:
+                counts['tag'] += 1
+            if plan.class_name and has_class(element, plan.class_name):
+                counts['class'] += 1
+            if plan.id_name and element.get('id') == plan.id_name:
+                counts['id'] += 1
+        if root is not None and _plan_satisfied(plan, root, counts, open_elements, limit):
+            complete = False
+            break
+
+    try:
+        doc = parser.close()
+    except etree.XMLSyntaxError:
+        doc = None
+    if doc is None:
+        doc = html.document_fromstring("<html></html>")
+    return doc, received, complete
@@ -1,19 +1,13 @@
 import tkinter as tk
 from tkinter import ttk, scrolledtext, messagebox, filedialog
-import requests
-from bs4 import BeautifulSoup
-from lxml import html
 import threading
+import multiprocessing
 import json
 import csv
 from datetime import datetime
 import os
 import sys
 from urllib.parse import urljoin, urlparse
-from PIL import Image, ImageTk
-import io
-import base64
-import math
 
 # Configure Playwright browsers path to bundled folder when frozen
 def _resource_path(relative_path: str) -> str:
@@ -34,7 +28,19 @@ try:
 except Exception:
     pass
 
-from playwright.sync_api import sync_playwright
+from scraper_engine import ScrapeJob, SelectorSpec, EVENT_IMAGE, parse_url_list, load_url_list
+from scraper_async import AsyncScraperEngine
+from scraper_cache import ResponseCache
+from scraper_checkpoint import STATE_DONE, STATE_FAILED, STATE_PENDING, JobCheckpoint, job_key
+from scraper_crawl import CrawlConfig, Crawler
+from scraper_extract import SelectorError, compile_plan
+from scraper_export import can_resume, drop_unfinished, open_sink
+from scraper_logpane import LogPane
+from scraper_metrics import METRICS_JOBS_PATH, METRICS_PROMETHEUS_PATH, Metrics
+from scraper_parallel import ExtractionPool
+from scraper_politeness import DEFAULT_HOST_CONCURRENCY, DEFAULT_HOST_RATE
+from scraper_images import ImageStore, ThumbnailPipeline
+from scraper_setup import PlaywrightProbe
 
 
 class WebScraperGUI:
@@ -47,11 +53,41 @@ class WebScraperGUI:
         # Variables
         self.url_var = tk.StringVar(value="https://example.com")
         self.scraping_type = tk.StringVar(value="static")
+        self.simulate_human = tk.BooleanVar(value=False)
+        self.use_cache = tk.BooleanVar(value=True)
+        self.block_resources = tk.BooleanVar(value=True)
+        self.stream_static = tk.BooleanVar(value=False)
         self.tag_var = tk.StringVar()
         self.class_var = tk.StringVar()
         self.id_var = tk.StringVar()
         self.css_var = tk.StringVar()
         self.xpath_var = tk.StringVar()
+        self.result_limit = tk.StringVar(value="10")
+        self.result_offset = tk.StringVar(value="0")
+        
+        # Batch settings
+        self.max_workers = tk.StringVar(value="8")
+        self.batch_urls = []
+        # Parse pages in worker processes (one per core), started on the first batch that asks for it
+        self.parallel_extract = tk.BooleanVar(value=False)
+        self.extraction_pool = None
+        # Per-host limits: requests per second and requests in flight to one host
+        self.host_rate = tk.StringVar(value=f"{DEFAULT_HOST_RATE:g}")
+        self.host_concurrency = tk.StringVar(value=str(DEFAULT_HOST_CONCURRENCY))
+        
+        # Crawl settings: follow links matched by a CSS selector from the URL (or URL list)
+        self.crawl_enabled = tk.BooleanVar(value=False)
+        self.crawl_link_css = tk.StringVar(value="a[href]")
+        self.crawl_depth = tk.StringVar(value="1")
+        self.crawl_max_pages = tk.StringVar(value="50")
+        
+        # Items are appended to this file as they are extracted (empty = keep in memory)
+        self.export_path = tk.StringVar()
+        self.export_sink = None
+        
+        # Batches and crawls record their progress so an interrupted run can continue
+        self.use_checkpoint = tk.BooleanVar(value=True)
+        self.checkpoint = None
         
         # Proxy settings
         self.use_proxy = tk.BooleanVar(value=False)
@@ -76,471 +112,45 @@ class WebScraperGUI:
         self.should_stop = False
         self.stop_event = threading.Event()
         
-        # Check Playwright installation
-        self.check_playwright_setup()
+        # Scraping engine; the GUI only consumes its events
+        self.response_cache = ResponseCache()
+        # Phase timings go to a Prometheus text file and one JSON line per job
+        self.metrics = Metrics(prometheus_path=METRICS_PROMETHEUS_PATH, jobs_path=METRICS_JOBS_PATH)
+        self.engine = AsyncScraperEngine(on_event=self.on_engine_event, stop_event=self.stop_event,
+                                         cache=self.response_cache, pause_event=self.pause_event,
+                                         metrics=self.metrics)
+        
+        # Images are fetched and decoded off the Tk thread; their bytes live on disk
+        self.image_store = ImageStore()
+        self.thumbnails = ThumbnailPipeline(on_ready=self.on_thumbnail_ready, store=self.image_store)
+        # PhotoImages and download metadata by image number, kept while the pane shows the image
+        self.image_references = {}
+        self.image_data = {}
+        self.image_count = 0
         
         self.setup_ui()
-    
-    def check_playwright_setup(self):
-        """Check if Playwright browsers are installed"""
-        try:
-            from playwright.sync_api import sync_playwright
-            p = sync_playwright().start()
-            # Try to launch browser to check if it's installed
-            browser = p.chromium.launch(headless=True)
-            browser.close()
-            p.stop()
-        except Exception as e:
-            # Show warning about Playwright setup
-            import tkinter.messagebox as mb
-            mb.showwarning(
-                "Playwright のセットアップが必要です", 
-                f"Playwright のブラウザがインストールされていません。\n\n"
-                f"インストールするまで Dynamic モードは使用できません。\n\n"
-                f"インストールするには次を実行してください:\n"
-                f"py -m playwright install chromium\n\n"
-                f"エラー: {str(e)}"
-            )
-    
-    def detect_captcha_or_blocking(self, html_content):
-        """Detect if the page contains captcha or blocking mechanisms"""
-        captcha_indicators = [
-            "captcha", "unusual traffic", "verify you are human", "robot", "bot detection",
-            "access denied", "blocked", "suspicious activity", "security check",
-            "please wait", "verification required", "challenge", "nocaptcha", "recaptcha",
-            "hcaptcha", "cloudflare", "ddos protection", "rate limit", "too many requests",
-            "captcha-loading", "nc_token", "x5secdata", "nc-verify-form", "bx-feedback-btn",
-            "alibaba.com", "punish", "verification", "security", "challenge", "slide to verify",
-            "nc_1_nocaptcha", "nc-container", "slidetounlock"
-        ]
-        
-        html_lower = html_content.lower()
-        for indicator in captcha_indicators:
-            if indicator in html_lower:
-                return True
-        return False
-    
-    def detect_captcha_type(self, html_content):
-        """Detect the specific type of captcha present"""
-        html_lower = html_content.lower()
-        
-        # Check for Alibaba NoCaptcha slider
-        if "nc_1_nocaptcha" in html_content or "slidetounlock" in html_lower or "slide to verify" in html_lower:
-            return "alibaba_nocaptcha"
-        
-        # Check for reCAPTCHA v2
-        if "g-recaptcha" in html_content or "recaptcha" in html_lower:
-            return "recaptcha_v2"
-        
-        # Check for hCaptcha
-        if "hcaptcha" in html_lower:
-            return "hcaptcha"
-        
-        # Check for image captcha
-        if "captcha" in html_lower and ("img" in html_lower or "image" in html_lower):
-            return "image_captcha"
-        
-        # Check for Cloudflare
-        if "cloudflare" in html_lower or "cf-challenge" in html_lower:
-            return "cloudflare"
-        
-        return "unknown"
-    
-    def get_random_user_agent(self):
-        """Get a random realistic user agent"""
-        user_agents = [
-            "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
-            "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/119.0.0.0 Safari/537.36",
-            "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
-            "Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:109.0) Gecko/20100101 Firefox/121.0",
-            "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/17.1 Safari/605.1.15",
-            "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Edge/120.0.0.0 Safari/537.36",
-            "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
-            "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/118.0.0.0 Safari/537.36"
-        ]
-        import random
-        return random.choice(user_agents)
-    
-    def is_ecommerce_site(self, url):
-        """Check if the URL is from a known e-commerce site with strict anti-bot protection"""
-        ecommerce_domains = [
-            "alibaba.com", "aliexpress.com", "amazon.com", "ebay.com", "walmart.com",
-            "target.com", "bestbuy.com", "homedepot.com", "lowes.com", "costco.com",
-            "wayfair.com", "overstock.com", "zappos.com", "nordstrom.com", "macys.com"
-        ]
-        
-        url_lower = url.lower()
-        for domain in ecommerce_domains:
-            if domain in url_lower:
-                return True
-        return False
-    
-    def get_enhanced_stealth_script(self):
-        """Get enhanced stealth script for better anti-detection"""
-        return """
-        // Enhanced stealth script for better anti-detection
-        
-        // Remove webdriver property completely
-        Object.defineProperty(navigator, 'webdriver', {
-            get: () => undefined,
-        });
-        
-        // Mock plugins array with realistic data
-        Object.defineProperty(navigator, 'plugins', {
-            get: () => {
-                return {
-                    0: {name: 'Chrome PDF Plugin', filename: 'internal-pdf-viewer'},
-                    1: {name: 'Chrome PDF Viewer', filename: 'mhjfbmdgcfjbbpaeojofohoefgiehjai'},
-                    2: {name: 'Native Client', filename: 'internal-nacl-plugin'},
-                    length: 3
-                };
-            },
-        });
-        
-        // Mock languages
-        Object.defineProperty(navigator, 'languages', {
-            get: () => ['en-US', 'en'],
-        });
-        
-        // Mock permissions API
-        const originalQuery = window.navigator.permissions.query;
-        window.navigator.permissions.query = (parameters) => (
-            parameters.name === 'notifications' ?
-                Promise.resolve({ state: Notification.permission }) :
-                originalQuery(parameters)
-        );
-        
-        // Mock chrome runtime
-        window.chrome = {
-            runtime: {
-                onConnect: undefined,
-                onMessage: undefined,
-            },
-        };
-        
-        // Remove automation indicators
-        delete window.cdc_adoQpoasnfa76pfcZLmcfl_Array;
-        delete window.cdc_adoQpoasnfa76pfcZLmcfl_Promise;
-        delete window.cdc_adoQpoasnfa76pfcZLmcfl_Symbol;
-        delete window.cdc_adoQpoasnfa76pfcZLmcfl_JSON;
-        delete window.cdc_adoQpoasnfa76pfcZLmcfl_Object;
-        delete window.cdc_adoQpoasnfa76pfcZLmcfl_Proxy;
-        delete window.cdc_adoQpoasnfa76pfcZLmcfl_Reflect;
-        
-        // Mock screen properties
-        Object.defineProperty(screen, 'availHeight', {get: () => 1040});
-        Object.defineProperty(screen, 'availWidth', {get: () => 1920});
-        Object.defineProperty(screen, 'colorDepth', {get: () => 24});
-        Object.defineProperty(screen, 'height', {get: () => 1080});
-        Object.defineProperty(screen, 'pixelDepth', {get: () => 24});
-        Object.defineProperty(screen, 'width', {get: () => 1920});
-        
-        // Mock timezone
-        Object.defineProperty(Intl, 'DateTimeFormat', {
-            value: function() {
-                return {
-                    resolvedOptions: () => ({timeZone: 'America/New_York'})
-                };
-            }
-        });
-        
-        // Mock hardware concurrency
-        Object.defineProperty(navigator, 'hardwareConcurrency', {
-            get: () => 8,
-        });
-        
-        // Mock device memory
-        Object.defineProperty(navigator, 'deviceMemory', {
-            get: () => 8,
-        });
-        
-        // Mock connection
-        Object.defineProperty(navigator, 'connection', {
-            get: () => ({
-                effectiveType: '4g',
-                rtt: 50,
-                downlink: 10
-            }),
-        });
-        """
-    
-    def solve_2captcha(self, captcha_type, page_url, site_key=None, captcha_image=None):
-        """Solve captcha using 2Captcha service"""
-        if not self.use_2captcha.get() or not self.captcha_api_key.get().strip():
-            return None
-            
-        api_key = self.captcha_api_key.get().strip()
-        
-        try:
-            if captcha_type == "recaptcha_v2":
-                return self._solve_recaptcha_v2(api_key, page_url, site_key)
-            elif captcha_type == "image":
-                return self._solve_image_captcha(api_key, captcha_image)
-            elif captcha_type == "hcaptcha":
-                return self._solve_hcaptcha(api_key, page_url, site_key)
-            else:
-                self.root.after(0, lambda: self.append_result(f"  ⚠️ Unsupported captcha type: {captcha_type}\n"))
-                return None
-        except Exception as e:
-            self.root.after(0, lambda: self.append_result(f"  ❌ 2Captcha error: {str(e)}\n"))
-            return None
-    
-    def _solve_recaptcha_v2(self, api_key, page_url, site_key):
-        """Solve reCAPTCHA v2 using 2Captcha"""
-        self.root.after(0, lambda: self.append_result("  🔐 Solving reCAPTCHA v2 with 2Captcha...\n"))
-        
-        # Submit captcha
-        submit_data = {
-            'key': api_key,
-            'method': 'userrecaptcha',
-            'googlekey': site_key,
-            'pageurl': page_url,
-            'json': 1
-        }
-        
-        response = requests.post('http://2captcha.com/in.php', data=submit_data)
-        result = response.json()
-        
-        if result['status'] != 1:
-            raise Exception(f"Failed to submit captcha: {result.get('error_text', 'Unknown error')}")
-        
-        captcha_id = result['request']
-        self.root.after(0, lambda: self.append_result(f"  📝 Captcha submitted, ID: {captcha_id}\n"))
-        
-        # Wait for solution
-        for attempt in range(30):  # Wait up to 5 minutes
-            time.sleep(10)
-            
-            check_data = {
-                'key': api_key,
-                'action': 'get',
-                'id': captcha_id,
-                'json': 1
-            }
-            
-            response = requests.get('http://2captcha.com/res.php', params=check_data)
-            result = response.json()
-            
-            if result['status'] == 1:
-                self.root.after(0, lambda: self.append_result("  ✅ reCAPTCHA solved successfully!\n"))
-                return result['request']
-            elif result['error_text'] == 'CAPCHA_NOT_READY':
-                self.root.after(0, lambda: self.append_result(f"  ⏳ Waiting for solution... ({attempt + 1}/30)\n"))
-                continue
-            else:
-                raise Exception(f"Failed to solve captcha: {result.get('error_text', 'Unknown error')}")
         
-        raise Exception("Captcha solving timeout")
+        # The browser check launches Chromium, so it runs in the background once the window is up
+        self.playwright_probe = PlaywrightProbe()
+        self.check_playwright_setup()
     
-    def _solve_image_captcha(self, api_key, captcha_image):
-        """Solve image captcha using 2Captcha"""
-        self.root.after(0, lambda: self.append_result("  🔐 Solving image captcha with 2Captcha...\n"))
-        
-        # Convert image to base64
-        if isinstance(captcha_image, bytes):
-            image_b64 = base64.b64encode(captcha_image).decode('utf-8')
-        else:
-            image_b64 = captcha_image
-        
-        # Submit captcha
-        submit_data = {
-            'key': api_key,
-            'method': 'base64',
-            'body': image_b64,
-            'json': 1
-        }
-        
-        response = requests.post('http://2captcha.com/in.php', data=submit_data)
-        result = response.json()
-        
-        if result['status'] != 1:
-            raise Exception(f"Failed to submit captcha: {result.get('error_text', 'Unknown error')}")
-        
-        captcha_id = result['request']
-        self.root.after(0, lambda: self.append_result(f"  📝 Image captcha submitted, ID: {captcha_id}\n"))
-        
-        # Wait for solution
-        for attempt in range(30):  # Wait up to 5 minutes
-            time.sleep(10)
-            
-            check_data = {
-                'key': api_key,
-                'action': 'get',
-                'id': captcha_id,
-                'json': 1
-            }
-            
-            response = requests.get('http://2captcha.com/res.php', params=check_data)
-            result = response.json()
-            
-            if result['status'] == 1:
-                self.root.after(0, lambda: self.append_result("  ✅ Image captcha solved successfully!\n"))
-                return result['request']
-            elif result['error_text'] == 'CAPCHA_NOT_READY':
-                self.root.after(0, lambda: self.append_result(f"  ⏳ Waiting for solution... ({attempt + 1}/30)\n"))
-                continue
-            else:
-                raise Exception(f"Failed to solve captcha: {result.get('error_text', 'Unknown error')}")
-        
-        raise Exception("Captcha solving timeout")
+    def check_playwright_setup(self):
+        """Check in the background if Playwright browsers are installed"""
+        self.playwright_probe.start(lambda result: self.log_pane.call(lambda: self.on_playwright_probe(result)))
     
-    def _solve_hcaptcha(self, api_key, page_url, site_key):
-        """Solve hCaptcha using 2Captcha"""
-        self.root.after(0, lambda: self.append_result("  🔐 Solving hCaptcha with 2Captcha...\n"))
-        
-        # Submit captcha
-        submit_data = {
-            'key': api_key,
-            'method': 'hcaptcha',
-            'sitekey': site_key,
-            'pageurl': page_url,
-            'json': 1
-        }
-        
-        response = requests.post('http://2captcha.com/in.php', data=submit_data)
-        result = response.json()
-        
-        if result['status'] != 1:
-            raise Exception(f"Failed to submit captcha: {result.get('error_text', 'Unknown error')}")
-        
-        captcha_id = result['request']
-        self.root.after(0, lambda: self.append_result(f"  📝 hCaptcha submitted, ID: {captcha_id}\n"))
-        
-        # Wait for solution
-        for attempt in range(30):  # Wait up to 5 minutes
-            time.sleep(10)
-            
-            check_data = {
-                'key': api_key,
-                'action': 'get',
-                'id': captcha_id,
-                'json': 1
-            }
-            
-            response = requests.get('http://2captcha.com/res.php', params=check_data)
-            result = response.json()
-            
-            if result['status'] == 1:
-                self.root.after(0, lambda: self.append_result("  ✅ hCaptcha solved successfully!\n"))
-                return result['request']
-            elif result['error_text'] == 'CAPCHA_NOT_READY':
-                self.root.after(0, lambda: self.append_result(f"  ⏳ Waiting for solution... ({attempt + 1}/30)\n"))
-                continue
-            else:
-                raise Exception(f"Failed to solve captcha: {result.get('error_text', 'Unknown error')}")
-        
-        raise Exception("Captcha solving timeout")
+    def on_playwright_probe(self, result):
+        """Warn about a missing Playwright browser (Tk thread)"""
+        if result.ok:
+            return
+        messagebox.showwarning(
+            "Playwright のセットアップが必要です", 
+            f"Playwright のブラウザがインストールされていません。\n\n"
+            f"インストールするまで Dynamic モードは使用できません。\n\n"
+            f"インストールするには次を実行してください:\n"
+            f"py -m playwright install chromium\n\n"
+            f"エラー: {result.error}"
+        )
     
-    def solve_alibaba_nocaptcha(self, page, url):
-        """Solve Alibaba's NoCaptcha slider using human-like behavior"""
-        try:
-            self.root.after(0, lambda: self.append_result("  🎯 Detected Alibaba NoCaptcha slider\n"))
-            self.root.after(0, lambda: self.append_result("  🤖 Attempting to solve with human-like behavior...\n"))
-            
-            # Wait for the slider to be visible
-            try:
-                slider = page.wait_for_selector('#nc_1_n1z', timeout=10000)
-                if not slider:
-                    self.root.after(0, lambda: self.append_result("  ❌ Slider not found\n"))
-                    return False
-            except:
-                self.root.after(0, lambda: self.append_result("  ❌ Slider not found\n"))
-                return False
-            
-            # Get slider dimensions
-            slider_box = slider.bounding_box()
-            if not slider_box:
-                self.root.after(0, lambda: self.append_result("  ❌ Could not get slider dimensions\n"))
-                return False
-            
-            # Calculate movement distance (slider width - handle width)
-            slider_width = slider_box['width']
-            handle_width = 40  # Approximate handle width
-            move_distance = slider_width - handle_width - 10  # Leave some margin
-            
-            # Human-like mouse movement to slider
-            self.root.after(0, lambda: self.append_result("  🖱️ Moving mouse to slider...\n"))
-            
-            # Move to slider with human-like behavior
-            start_x = slider_box['x'] + 20
-            start_y = slider_box['y'] + slider_box['height'] / 2
-            
-            # Move mouse to slider gradually
-            for i in range(5):
-                intermediate_x = start_x + (i * 10)
-                page.mouse.move(intermediate_x, start_y)
-                time.sleep(random.uniform(0.1, 0.3))
-            
-            # Click and hold on slider
-            self.root.after(0, lambda: self.append_result("  🖱️ Clicking and holding slider...\n"))
-            page.mouse.move(start_x, start_y)
-            time.sleep(random.uniform(0.2, 0.5))
-            page.mouse.down()
-            time.sleep(random.uniform(0.1, 0.3))
-            
-            # Human-like drag movement
-            self.root.after(0, lambda: self.append_result("  🖱️ Dragging slider...\n"))
-            
-            # Simulate human-like drag with slight variations
-            steps = random.randint(15, 25)
-            for i in range(steps):
-                progress = i / steps
-                
-                # Add slight curve to movement (human behavior)
-                curve_offset = math.sin(progress * math.pi) * random.uniform(-2, 2)
-                
-                current_x = start_x + (move_distance * progress) + curve_offset
-                current_y = start_y + random.uniform(-1, 1)  # Slight vertical variation
-                
-                page.mouse.move(current_x, current_y)
-                time.sleep(random.uniform(0.05, 0.15))  # Variable timing
-            
-            # Final position
-            final_x = start_x + move_distance
-            page.mouse.move(final_x, start_y)
-            time.sleep(random.uniform(0.2, 0.5))
-            
-            # Release mouse
-            page.mouse.up()
-            time.sleep(random.uniform(0.5, 1.0))
-            
-            self.root.after(0, lambda: self.append_result("  ✅ Slider drag completed\n"))
-            
-            # Wait for verification
-            self.root.after(0, lambda: self.append_result("  ⏳ Waiting for verification...\n"))
-            time.sleep(random.uniform(2, 4))
-            
-            # Check if verification was successful
-            try:
-                # Look for success indicators
-                success_indicators = [
-                    'nc_1_n1t[style*="width: 100%"]',  # Slider filled
-                    '.nc_ok',  # Success class
-                    '[class*="success"]',  # Success indicator
-                ]
-                
-                for indicator in success_indicators:
-                    if page.query_selector(indicator):
-                        self.root.after(0, lambda: self.append_result("  ✅ Alibaba NoCaptcha solved successfully!\n"))
-                        return True
-                
-                # Check if page content changed (no more captcha)
-                current_content = page.content()
-                if not self.detect_captcha_or_blocking(current_content):
-                    self.root.after(0, lambda: self.append_result("  ✅ Captcha appears to be solved!\n"))
-                    return True
-                
-                self.root.after(0, lambda: self.append_result("  ⚠️ Verification status unclear, continuing...\n"))
-                return True  # Assume success and continue
-                
-            except Exception as e:
-                self.root.after(0, lambda: self.append_result(f"  ⚠️ Verification check failed: {str(e)}\n"))
-                return True  # Continue anyway
-            
-        except Exception as e:
-            self.root.after(0, lambda: self.append_result(f"  ❌ Alibaba NoCaptcha solving failed: {str(e)}\n"))
-            return False
-        
     def setup_ui(self):
         # Main frame
         main_frame = ttk.Frame(self.root, padding="10")
@@ -563,58 +173,105 @@ class WebScraperGUI:
         url_entry = ttk.Entry(main_frame, textvariable=self.url_var, width=50)
         url_entry.grid(row=1, column=1, columnspan=2, sticky=(tk.W, tk.E), pady=5)
         
+        # URL list for batch jobs (one URL per line; overrides the URL field)
+        ttk.Label(main_frame, text="URL リスト:").grid(row=2, column=0, sticky=(tk.W, tk.N), pady=5)
+        batch_frame = ttk.Frame(main_frame)
+        batch_frame.grid(row=2, column=1, columnspan=2, sticky=(tk.W, tk.E), pady=5)
+        batch_frame.columnconfigure(0, weight=1)
+        self.url_list_text = scrolledtext.ScrolledText(batch_frame, height=4, width=50)
+        self.url_list_text.grid(row=0, column=0, rowspan=2, sticky=(tk.W, tk.E))
+        ttk.Button(batch_frame, text="ファイルから読み込み", command=self.load_url_file).grid(row=0, column=1, sticky=tk.W, padx=(10, 0))
+        workers_frame = ttk.Frame(batch_frame)
+        workers_frame.grid(row=1, column=1, sticky=tk.W, padx=(10, 0))
+        ttk.Label(workers_frame, text="並列数:").pack(side=tk.LEFT)
+        ttk.Spinbox(workers_frame, from_=1, to=64, textvariable=self.max_workers, width=5).pack(side=tk.LEFT, padx=(5, 0))
+        ttk.Checkbutton(workers_frame, text="複数プロセスで解析", variable=self.parallel_extract).pack(side=tk.LEFT, padx=(10, 0))
+        export_frame = ttk.Frame(batch_frame)
+        export_frame.grid(row=2, column=0, columnspan=2, sticky=tk.W, pady=(5, 0))
+        ttk.Label(export_frame, text="逐次保存（.jsonl / .csv / .parquet）:").pack(side=tk.LEFT)
+        ttk.Entry(export_frame, textvariable=self.export_path, width=40).pack(side=tk.LEFT, padx=(5, 5))
+        ttk.Button(export_frame, text="参照", command=self.choose_export_file).pack(side=tk.LEFT)
+        ttk.Checkbutton(export_frame, text="中断後に再開可能", variable=self.use_checkpoint).pack(side=tk.LEFT, padx=(10, 0))
+        crawl_frame = ttk.Frame(batch_frame)
+        crawl_frame.grid(row=3, column=0, columnspan=2, sticky=tk.W, pady=(5, 0))
+        ttk.Checkbutton(crawl_frame, text="リンクを辿る", variable=self.crawl_enabled).pack(side=tk.LEFT)
+        ttk.Label(crawl_frame, text="リンク CSS:").pack(side=tk.LEFT, padx=(10, 0))
+        ttk.Entry(crawl_frame, textvariable=self.crawl_link_css, width=20).pack(side=tk.LEFT, padx=(5, 10))
+        ttk.Label(crawl_frame, text="深さ:").pack(side=tk.LEFT)
+        ttk.Spinbox(crawl_frame, from_=0, to=10, textvariable=self.crawl_depth, width=4).pack(side=tk.LEFT, padx=(5, 10))
+        ttk.Label(crawl_frame, text="最大ページ数:").pack(side=tk.LEFT)
+        ttk.Spinbox(crawl_frame, from_=1, to=100000, textvariable=self.crawl_max_pages, width=7).pack(side=tk.LEFT, padx=(5, 0))
+        host_frame = ttk.Frame(batch_frame)
+        host_frame.grid(row=4, column=0, columnspan=2, sticky=tk.W, pady=(5, 0))
+        ttk.Label(host_frame, text="ホストごとの上限 毎秒:").pack(side=tk.LEFT)
+        ttk.Spinbox(host_frame, from_=0.1, to=100, increment=0.5, textvariable=self.host_rate, width=6).pack(side=tk.LEFT, padx=(5, 10))
+        ttk.Label(host_frame, text="同時接続:").pack(side=tk.LEFT)
+        ttk.Spinbox(host_frame, from_=1, to=64, textvariable=self.host_concurrency, width=5).pack(side=tk.LEFT, padx=(5, 0))
+        
         # Scraping type
-        ttk.Label(main_frame, text="スクレイピング種別:").grid(row=2, column=0, sticky=tk.W, pady=5)
+        ttk.Label(main_frame, text="スクレイピング種別:").grid(row=3, column=0, sticky=tk.W, pady=5)
         type_frame = ttk.Frame(main_frame)
-        type_frame.grid(row=2, column=1, sticky=tk.W, pady=5)
+        type_frame.grid(row=3, column=1, sticky=tk.W, pady=5)
         ttk.Radiobutton(type_frame, text="静的", variable=self.scraping_type, value="static").pack(side=tk.LEFT, padx=(0, 10))
-        ttk.Radiobutton(type_frame, text="動的", variable=self.scraping_type, value="dynamic").pack(side=tk.LEFT)
+        ttk.Radiobutton(type_frame, text="動的", variable=self.scraping_type, value="dynamic").pack(side=tk.LEFT, padx=(0, 10))
+        ttk.Checkbutton(type_frame, text="人間らしい操作（低速）", variable=self.simulate_human).pack(side=tk.LEFT)
+        ttk.Checkbutton(type_frame, text="キャッシュを使用", variable=self.use_cache).pack(side=tk.LEFT, padx=(10, 0))
+        ttk.Checkbutton(type_frame, text="必要な分だけ取得", variable=self.stream_static).pack(side=tk.LEFT, padx=(10, 0))
+        ttk.Checkbutton(type_frame, text="画像・フォント等をブロック", variable=self.block_resources).pack(side=tk.LEFT, padx=(10, 0))
         
         # Proxy settings
-        ttk.Label(main_frame, text="プロキシ設定:").grid(row=3, column=0, sticky=tk.W, pady=5)
+        ttk.Label(main_frame, text="プロキシ設定:").grid(row=4, column=0, sticky=tk.W, pady=5)
         proxy_frame = ttk.Frame(main_frame)
-        proxy_frame.grid(row=3, column=1, sticky=tk.W, pady=5)
+        proxy_frame.grid(row=4, column=1, sticky=tk.W, pady=5)
         ttk.Checkbutton(proxy_frame, text="プロキシを使用", variable=self.use_proxy).pack(side=tk.LEFT, padx=(0, 10))
         ttk.Entry(proxy_frame, textvariable=self.proxy_url, width=30).pack(side=tk.LEFT)
         
         # 2Captcha settings
-        ttk.Label(main_frame, text="2Captcha 設定:").grid(row=4, column=0, sticky=tk.W, pady=5)
+        ttk.Label(main_frame, text="2Captcha 設定:").grid(row=5, column=0, sticky=tk.W, pady=5)
         captcha_frame = ttk.Frame(main_frame)
-        captcha_frame.grid(row=4, column=1, sticky=tk.W, pady=5)
+        captcha_frame.grid(row=5, column=1, sticky=tk.W, pady=5)
         ttk.Checkbutton(captcha_frame, text="Captcha を自動解決", variable=self.use_2captcha).pack(side=tk.LEFT, padx=(0, 10))
         ttk.Label(captcha_frame, text="APIキー:").pack(side=tk.LEFT, padx=(0, 5))
         ttk.Entry(captcha_frame, textvariable=self.captcha_api_key, width=35).pack(side=tk.LEFT)
         
         # Separator
-        ttk.Separator(main_frame, orient='horizontal').grid(row=5, column=0, columnspan=3, sticky=(tk.W, tk.E), pady=10)
+        ttk.Separator(main_frame, orient='horizontal').grid(row=6, column=0, columnspan=3, sticky=(tk.W, tk.E), pady=10)
         
         # Selectors section
         selectors_label = ttk.Label(main_frame, text="コンテンツセレクタ（不要なら空のまま）:", font=('Arial', 10, 'bold'))
-        selectors_label.grid(row=6, column=0, columnspan=3, sticky=tk.W, pady=(0, 10))
+        selectors_label.grid(row=7, column=0, columnspan=3, sticky=tk.W, pady=(0, 10))
         
         # Tag selector
-        ttk.Label(main_frame, text="HTML タグ:").grid(row=7, column=0, sticky=tk.W, pady=2)
-        ttk.Entry(main_frame, textvariable=self.tag_var, width=20).grid(row=7, column=1, sticky=tk.W, pady=2)
+        ttk.Label(main_frame, text="HTML タグ:").grid(row=8, column=0, sticky=tk.W, pady=2)
+        ttk.Entry(main_frame, textvariable=self.tag_var, width=20).grid(row=8, column=1, sticky=tk.W, pady=2)
+        
+        # Matches per selector (0 = all) and how many to skip
+        range_frame = ttk.Frame(main_frame)
+        range_frame.grid(row=8, column=2, sticky=tk.W, pady=2)
+        ttk.Label(range_frame, text="取得件数（0=全件）:").pack(side=tk.LEFT)
+        ttk.Spinbox(range_frame, from_=0, to=10000, textvariable=self.result_limit, width=6).pack(side=tk.LEFT, padx=(5, 10))
+        ttk.Label(range_frame, text="開始位置:").pack(side=tk.LEFT)
+        ttk.Spinbox(range_frame, from_=0, to=10000, textvariable=self.result_offset, width=6).pack(side=tk.LEFT, padx=(5, 0))
         
         # Class selector
-        ttk.Label(main_frame, text="CSS クラス:").grid(row=8, column=0, sticky=tk.W, pady=2)
-        ttk.Entry(main_frame, textvariable=self.class_var, width=20).grid(row=8, column=1, sticky=tk.W, pady=2)
+        ttk.Label(main_frame, text="CSS クラス:").grid(row=9, column=0, sticky=tk.W, pady=2)
+        ttk.Entry(main_frame, textvariable=self.class_var, width=20).grid(row=9, column=1, sticky=tk.W, pady=2)
         
         # ID selector
-        ttk.Label(main_frame, text="要素 ID:").grid(row=9, column=0, sticky=tk.W, pady=2)
-        ttk.Entry(main_frame, textvariable=self.id_var, width=20).grid(row=9, column=1, sticky=tk.W, pady=2)
+        ttk.Label(main_frame, text="要素 ID:").grid(row=10, column=0, sticky=tk.W, pady=2)
+        ttk.Entry(main_frame, textvariable=self.id_var, width=20).grid(row=10, column=1, sticky=tk.W, pady=2)
         
         # CSS selector
-        ttk.Label(main_frame, text="CSS セレクタ:").grid(row=10, column=0, sticky=tk.W, pady=2)
-        ttk.Entry(main_frame, textvariable=self.css_var, width=30).grid(row=10, column=1, sticky=tk.W, pady=2)
+        ttk.Label(main_frame, text="CSS セレクタ:").grid(row=11, column=0, sticky=tk.W, pady=2)
+        ttk.Entry(main_frame, textvariable=self.css_var, width=30).grid(row=11, column=1, sticky=tk.W, pady=2)
         
         # XPath selector
-        ttk.Label(main_frame, text="XPath セレクタ:").grid(row=11, column=0, sticky=tk.W, pady=2)
-        ttk.Entry(main_frame, textvariable=self.xpath_var, width=30).grid(row=11, column=1, sticky=tk.W, pady=2)
+        ttk.Label(main_frame, text="XPath セレクタ:").grid(row=12, column=0, sticky=tk.W, pady=2)
+        ttk.Entry(main_frame, textvariable=self.xpath_var, width=30).grid(row=12, column=1, sticky=tk.W, pady=2)
         
         # Buttons frame
         buttons_frame = ttk.Frame(main_frame)
-        buttons_frame.grid(row=12, column=0, columnspan=3, pady=20)
+        buttons_frame.grid(row=13, column=0, columnspan=3, pady=20)
         
         # Scrape button
         self.scrape_btn = ttk.Button(buttons_frame, text="スクレイピング開始", command=self.start_scraping)
@@ -639,20 +296,24 @@ class WebScraperGUI:
         
         # Progress bar
         self.progress = ttk.Progressbar(main_frame, mode='indeterminate')
-        self.progress.grid(row=12, column=0, columnspan=3, sticky=(tk.W, tk.E), pady=5)
+        self.progress.grid(row=13, column=0, columnspan=3, sticky=(tk.W, tk.E), pady=5)
         
         # Results area
         results_label = ttk.Label(main_frame, text="結果:", font=('Arial', 10, 'bold'))
-        results_label.grid(row=13, column=0, columnspan=3, sticky=tk.W, pady=(20, 5))
+        results_label.grid(row=14, column=0, columnspan=3, sticky=tk.W, pady=(20, 5))
         
         self.results_text = scrolledtext.ScrolledText(main_frame, height=15, width=80)
-        self.results_text.grid(row=14, column=0, columnspan=3, sticky=(tk.W, tk.E, tk.N, tk.S), pady=5)
+        self.results_text.grid(row=15, column=0, columnspan=3, sticky=(tk.W, tk.E, tk.N, tk.S), pady=5)
         
         # Configure text widget for images
         self.results_text.configure(state='normal')
         
+        # Output is queued and drawn in batches at a fixed frame rate
+        self.log_pane = LogPane(self.root, self.results_text)
+        self.log_pane.start()
+        
         # Configure grid weights for resizing
-        main_frame.rowconfigure(14, weight=1)
+        main_frame.rowconfigure(15, weight=1)
     
     # Image gallery UI disabled
     # def setup_image_gallery_ui(self, frame):
@@ -661,13 +322,30 @@ class WebScraperGUI:
         
     def start_scraping(self):
         """Start scraping in a separate thread"""
-        if not self.url_var.get().strip():
+        self.batch_urls = parse_url_list(self.url_list_text.get(1.0, tk.END))
+        if not self.batch_urls and not self.url_var.get().strip():
             messagebox.showerror("エラー", "URL を入力してください")
             return
         
+        # Compile the selectors now so a typo is reported before anything is fetched
+        selectors = SelectorSpec(
+            self.tag_var.get().strip() or None,
+            self.class_var.get().strip() or None,
+            self.id_var.get().strip() or None,
+            self.css_var.get().strip() or None,
+            self.xpath_var.get().strip() or None,
+        )
+        try:
+            compile_plan(selectors)
+            if self.crawl_enabled.get():
+                compile_plan(self.get_crawl_config().link_selectors)
+        except SelectorError as e:
+            messagebox.showerror("セレクタエラー", f"セレクタが不正です:\n{str(e)}")
+            return
+        
         # Check if it's an e-commerce site and warn user
-        url = self.url_var.get().strip()
-        if self.is_ecommerce_site(url):
+        url = self.batch_urls[0] if self.batch_urls else self.url_var.get().strip()
+        if self.engine.is_ecommerce_site(url):
             result = messagebox.askyesno(
                 "EC サイトを検出", 
                 f"厳格なボット対策が施された EC サイトの可能性があります。\n\n"
@@ -680,6 +358,20 @@ class WebScraperGUI:
             if not result:
                 return
         
+        # New limits apply from this run on; robots.txt can still only slow a host down
+        self.engine.scheduler.configure(rate=self.get_host_rate(), concurrency=self.get_host_concurrency())
+        
+        # Single pages are not worth a round trip to another process
+        if self.parallel_extract.get() and self.batch_urls and self.extraction_pool is None:
+            self.extraction_pool = ExtractionPool()
+        self.engine.extraction_pool = self.extraction_pool if self.parallel_extract.get() and self.batch_urls else None
+        
+        # Batches and crawls continue from their checkpoint when the same job was interrupted
+        self.checkpoint = None
+        if self.use_checkpoint.get() and (self.batch_urls or self.crawl_enabled.get()):
+            if not self.open_checkpoint(selectors):
+                return
+        
         self.scrape_btn.config(state='disabled')
         self.pause_btn.config(state='normal', text="一時停止")
         self.stop_btn.config(state='normal')
@@ -688,7 +380,7 @@ class WebScraperGUI:
         self.pause_event.set()  # Ensure pause event is cleared
         self.stop_event.clear()  # Ensure stop event is cleared
         self.progress.start()
-        self.results_text.delete(1.0, tk.END)
+        self.log_pane.clear()
         
         # Start scraping in a separate thread
         self.scraping_thread = threading.Thread(target=self.scrape_worker)
@@ -718,13 +410,39 @@ class WebScraperGUI:
                 self.root.after(0, self.scraping_stopped)
                 return
             
+            # Items go straight to the export file instead of memory
+            export_path = self.export_path.get().strip()
+            if export_path:
+                if self.checkpoint is not None and self.checkpoint.exists():
+                    # Pages cut off by the interruption are fetched again, so their partial records go first
+                    dropped = drop_unfinished(export_path, self.checkpoint.unfinished_urls())
+                    if dropped:
+                        self.append_result(f"[RESUME] 未完了のページの {dropped} 件を保存ファイルから削除しました\n")
+                self.export_sink = open_sink(export_path)
+                self.append_result(f"[EXPORT] {export_path} に逐次保存します\n")
+            
             # Perform scraping
-            if scraping_type == "static":
+            self.wait_if_paused()
+            if self.crawl_enabled.get():
+                results = self.scrape_crawl(self.batch_urls or [url], scraping_type, tag, class_name, id_name, css_selector, xpath_selector)
+            elif self.batch_urls:
+                results = self.scrape_batch(self.batch_urls, scraping_type, tag, class_name, id_name, css_selector, xpath_selector)
+            elif scraping_type == "static":
                 results, html_content = self.scrape_static(url, tag, class_name, id_name, css_selector, xpath_selector)
             else:
                 results, html_content = self.scrape_dynamic(url, tag, class_name, id_name, css_selector, xpath_selector)
-
-            print(html_content)
+            
+            # Exported items are not kept in memory; save_results points at the file instead
+            if self.export_sink is not None:
+                results = {}
+            
+            # A job that ran to the end needs no checkpoint; one with failures keeps it to retry them
+            if self.checkpoint is not None and not self.check_should_stop():
+                counts = self.checkpoint.counts()
+                if self.crawl_enabled.get() or not (counts[STATE_PENDING] or counts[STATE_FAILED]):
+                    self.checkpoint.clear()
+                else:
+                    self.append_result(f"[CHECKPOINT] 失敗 {counts[STATE_FAILED]} 件は次回の実行で再試行できます\n")
             
             # Check for stop before image extraction
             if self.check_should_stop():
@@ -747,6 +465,19 @@ class WebScraperGUI:
                 self.root.after(0, self.scraping_error, str(e))
             else:
                 self.root.after(0, self.scraping_stopped)
+        finally:
+            # Flush whatever was extracted, also after a stop or an error
+            if self.export_sink is not None:
+                self.export_sink.close()
+                self.append_result(f"[EXPORT] {self.export_sink.records} 件を保存しました: {self.export_sink.path}\n")
+                self.export_sink = None
+            if self.checkpoint is not None:
+                self.checkpoint.close()
+                self.checkpoint = None
+            try:
+                self.metrics.write_prometheus()
+            except OSError as e:
+                self.append_result(f"[METRICS] 書き込みに失敗しました: {e}\n")
     
     def toggle_pause(self):
         """Toggle pause/resume functionality"""
@@ -764,9 +495,8 @@ class WebScraperGUI:
             self.append_result("\n[一時停止] スクレイピングを一時停止しました。\n『再開』をクリックしてください...\n")
     
     def wait_if_paused(self):
-        """Wait if scraping is paused"""
-        if self.is_paused:
-            self.pause_event.wait()  # This will block until resume is clicked
+        """Wait if scraping is paused (the engine also waits between pages and stages)"""
+        self.engine.wait_if_paused()
     
     def check_should_stop(self):
         """Check if scraping should be stopped"""
@@ -798,947 +528,270 @@ class WebScraperGUI:
         self.is_paused = False
         self.append_result("\n" + "="*50 + "\nユーザーによりスクレイピングが停止されました。\n")
     
-    def scrape_static(self, url, tag=None, class_name=None, id_name=None, css_selector=None, xpath_selector=None):
-        """Static scraping method with enhanced anti-detection"""
-        self.root.after(0, lambda: self.append_result(f"[STATIC FETCH] {url}\n"))
-        
-        # Enhanced headers to mimic real browser
-        headers = {
-            'User-Agent': self.get_random_user_agent(),
-            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8,application/signed-exchange;v=b3;q=0.7',
-            'Accept-Language': 'en-US,en;q=0.9',
-            'Accept-Encoding': 'gzip, deflate, br',
-            'Connection': 'keep-alive',
-            'Upgrade-Insecure-Requests': '1',
-            'Sec-Fetch-Dest': 'document',
-            'Sec-Fetch-Mode': 'navigate',
-            'Sec-Fetch-Site': 'none',
-            'Sec-Fetch-User': '?1',
-            'Cache-Control': 'max-age=0',
-            'DNT': '1'
-        }
-        
-        # Add random delay to appear more human-like
-        import time
-        import random
-        delay = random.uniform(1, 3)
-        self.root.after(0, lambda: self.append_result(f"  Waiting {delay:.1f}s to appear human-like...\n"))
-        time.sleep(delay)
-        
+    def build_job(self, url, scraping_type, tag=None, class_name=None, id_name=None, css_selector=None, xpath_selector=None):
+        """Build an engine job from the current UI settings"""
+        return ScrapeJob(
+            url=url,
+            mode=scraping_type,
+            selectors=SelectorSpec(tag, class_name, id_name, css_selector, xpath_selector),
+            proxy_url=self.proxy_url.get() if self.use_proxy.get() else None,
+            use_2captcha=self.use_2captcha.get(),
+            captcha_api_key=self.captcha_api_key.get(),
+            simulate_human=self.simulate_human.get(),
+            use_cache=self.use_cache.get(),
+            block_resources=self.block_resources.get(),
+            stream=self.stream_static.get(),
+            sink=self.export_sink,
+            limit=self.get_result_limit(),
+            offset=self.get_result_offset(),
+        )
+    
+    def get_max_workers(self):
+        """Number of parallel fetches for batch jobs"""
         try:
-            # Use session for better connection handling
-            session = requests.Session()
-            session.headers.update(headers)
-            
-            # Configure proxy if enabled
-            proxies = None
-            if self.use_proxy.get() and self.proxy_url.get().strip():
-                proxy_url = self.proxy_url.get().strip()
-                if not proxy_url.startswith(('http://', 'https://')):
-                    proxy_url = 'http://' + proxy_url
-                proxies = {
-                    'http': proxy_url,
-                    'https': proxy_url
-                }
-                self.root.after(0, lambda: self.append_result(f"  Using proxy: {proxy_url}\n"))
-            
-            # Add retry logic
-            max_retries = 3
-            for attempt in range(max_retries):
-                try:
-                    self.root.after(0, lambda: self.append_result(f"  Attempt {attempt + 1}/{max_retries}...\n"))
-                    res = session.get(url, timeout=30, allow_redirects=True, proxies=proxies)
-                    res.raise_for_status()
-                    break
-                except Exception as e:
-                    if attempt == max_retries - 1:
-                        raise e
-                    self.root.after(0, lambda: self.append_result(f"  Retrying in 2s... ({str(e)[:50]}...)\n"))
-                    time.sleep(2)
-            
-            html_content = res.text
-            
-            # Check if we got a captcha page
-            if "captcha" in html_content.lower() or "unusual traffic" in html_content.lower():
-                self.root.after(0, lambda: self.append_result("  ⚠️ Captcha detected! Consider using dynamic scraping instead.\n"))
-            
-            results = self.extract_content(html_content, tag, class_name, id_name, css_selector, xpath_selector)
-            return results, html_content
-            
-        except Exception as e:
-            self.root.after(0, lambda: self.append_result(f"  ❌ Static scraping failed: {str(e)}\n"))
-            raise e
+            return max(1, int(self.max_workers.get()))
+        except ValueError:
+            return 1
     
-    def scrape_dynamic(self, url, tag=None, class_name=None, id_name=None, css_selector=None, xpath_selector=None):
-        """Ultra-robust dynamic scraping method with stealth mode and anti-detection"""
-        self.root.after(0, lambda: self.append_result(f"[DYNAMIC FETCH] {url}\n"))
-        
-        playwright_instance = None
-        browser = None
-        page = None
-        
+    def get_host_rate(self):
+        """Requests per second allowed to one host"""
         try:
-            # Initialize Playwright with error handling
-            self.root.after(0, lambda: self.append_result("  Initializing Playwright...\n"))
-            try:
-                playwright_instance = sync_playwright().start()
-                self.root.after(0, lambda: self.append_result("  ✅ Playwright initialized successfully.\n"))
-            except Exception as e:
-                raise Exception(f"Failed to initialize Playwright: {str(e)}")
-            
-            # Configure proxy if enabled
-            proxy_config = None
-            if self.use_proxy.get() and self.proxy_url.get().strip():
-                proxy_url = self.proxy_url.get().strip()
-                if not proxy_url.startswith(('http://', 'https://')):
-                    proxy_url = 'http://' + proxy_url
-                proxy_config = {"server": proxy_url}
-                self.root.after(0, lambda: self.append_result(f"  Using proxy: {proxy_url}\n"))
-            
-            # Launch browser with stealth mode and anti-detection
-            self.root.after(0, lambda: self.append_result("  Launching Chromium browser with stealth mode...\n"))
-            try:
-                browser = playwright_instance.chromium.launch(
-                    headless=True,
-                    proxy=proxy_config,
-                    args=[
-                        '--no-sandbox',
-                        '--disable-dev-shm-usage',
-                        '--disable-gpu',
-                        '--disable-web-security',
-                        '--disable-features=VizDisplayCompositor',
-                        '--disable-blink-features=AutomationControlled',
-                        '--disable-extensions',
-                        '--no-first-run',
-                        '--disable-default-apps',
-                        '--disable-background-timer-throttling',
-                        '--disable-backgrounding-occluded-windows',
-                        '--disable-renderer-backgrounding',
-                        '--disable-ipc-flooding-protection',
-                        '--disable-hang-monitor',
-                        '--disable-prompt-on-repost',
-                        '--disable-sync',
-                        '--disable-translate',
-                        '--disable-logging',
-                        '--disable-permissions-api',
-                        '--disable-plugins-discovery',
-                        '--disable-preconnect',
-                        '--disable-print-preview',
-                        '--disable-speech-api',
-                        '--disable-web-resources',
-                        '--hide-scrollbars',
-                        '--mute-audio',
-                        '--no-default-browser-check',
-                        '--no-pings',
-                        '--no-zygote',
-                        '--disable-background-networking',
-                        '--disable-component-extensions-with-background-pages',
-                        '--disable-default-apps',
-                        '--disable-domain-reliability',
-                        '--disable-features=TranslateUI',
-                        '--disable-ipc-flooding-protection',
-                        '--disable-renderer-backgrounding',
-                        '--disable-backgrounding-occluded-windows',
-                        '--disable-client-side-phishing-detection',
-                        '--disable-sync-preferences',
-                        '--disable-background-timer-throttling',
-                        '--disable-renderer-backgrounding',
-                        '--disable-backgrounding-occluded-windows',
-                        '--disable-features=TranslateUI,BlinkGenPropertyTrees',
-                        '--disable-ipc-flooding-protection',
-                        '--disable-hang-monitor',
-                        '--disable-prompt-on-repost',
-                        '--disable-sync',
-                        '--disable-translate',
-                        '--disable-logging',
-                        '--disable-permissions-api',
-                        '--disable-plugins-discovery',
-                        '--disable-preconnect',
-                        '--disable-print-preview',
-                        '--disable-speech-api',
-                        '--disable-web-resources',
-                        '--hide-scrollbars',
-                        '--mute-audio',
-                        '--no-default-browser-check',
-                        '--no-pings',
-                        '--no-zygote',
-                        '--disable-background-networking',
-                        '--disable-component-extensions-with-background-pages',
-                        '--disable-default-apps',
-                        '--disable-domain-reliability',
-                        '--disable-features=TranslateUI',
-                        '--disable-ipc-flooding-protection',
-                        '--disable-renderer-backgrounding',
-                        '--disable-backgrounding-occluded-windows',
-                        '--disable-client-side-phishing-detection',
-                        '--disable-sync-preferences',
-                        '--disable-background-timer-throttling',
-                        '--disable-renderer-backgrounding',
-                        '--disable-backgrounding-occluded-windows',
-                        '--disable-features=TranslateUI,BlinkGenPropertyTrees',
-                        f'--user-agent={self.get_random_user_agent()}'
-                    ]
-                )
-                self.root.after(0, lambda: self.append_result("  ✅ Browser launched with stealth mode.\n"))
-            except Exception as e:
-                raise Exception(f"Failed to launch browser: {str(e)}")
-            
-            # Create new page with enhanced stealth settings
-            try:
-                page = browser.new_page()
-                
-                # Set realistic viewport and screen resolution
-                page.set_viewport_size({"width": 1920, "height": 1080})
-                
-                # Inject enhanced stealth JavaScript
-                stealth_script = self.get_enhanced_stealth_script()
-                page.add_init_script(stealth_script)
-                
-                # Special handling for e-commerce sites
-                if self.is_ecommerce_site(url):
-                    self.root.after(0, lambda: self.append_result("  🛒 E-commerce site detected - applying enhanced stealth...\n"))
-                    
-                    # Add additional e-commerce specific stealth
-                    ecommerce_script = """
-                    // E-commerce specific stealth
-                    window.localStorage.clear();
-                    window.sessionStorage.clear();
-                    
-                    // Mock realistic browsing history
-                    Object.defineProperty(history, 'length', {get: () => 5});
-                    
-                    // Mock realistic referrer
-                    Object.defineProperty(document, 'referrer', {get: () => 'https://www.google.com/'});
-                    
-                    // Mock realistic document ready state
-                    Object.defineProperty(document, 'readyState', {get: () => 'complete'});
-                    
-                    // Mock realistic performance timing
-                    if (window.performance && window.performance.timing) {
-                        const now = Date.now();
-                        window.performance.timing = {
-                            navigationStart: now - 1000,
-                            loadEventEnd: now - 100,
-                            domContentLoadedEventEnd: now - 200
-                        };
-                    }
-                    """
-                    page.add_init_script(ecommerce_script)
-                
-                # Set realistic headers
-                page.set_extra_http_headers({
-                    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8,application/signed-exchange;v=b3;q=0.7",
-                    "Accept-Language": "en-US,en;q=0.9",
-                    "Accept-Encoding": "gzip, deflate, br",
-                    "Connection": "keep-alive",
-                    "Upgrade-Insecure-Requests": "1",
-                    "Sec-Fetch-Dest": "document",
-                    "Sec-Fetch-Mode": "navigate",
-                    "Sec-Fetch-Site": "none",
-                    "Sec-Fetch-User": "?1",
-                    "Cache-Control": "max-age=0",
-                    "DNT": "1"
-                })
-                
-                self.root.after(0, lambda: self.append_result("  ✅ Page created with stealth settings.\n"))
-            except Exception as e:
-                raise Exception(f"Failed to create page: {str(e)}")
-            
-            # Add random delay before navigation
-            import time
-            import random
-            delay = random.uniform(2, 5)
-            self.root.after(0, lambda: self.append_result(f"  Waiting {delay:.1f}s before navigation...\n"))
-            time.sleep(delay)
-            
-            # Navigate to page with extended timeouts and retry logic
-            self.root.after(0, lambda: self.append_result("  Navigating to page...\n"))
-            max_retries = 5  # Increased retries
-            navigation_success = False
-            
-            for attempt in range(max_retries):
-                try:
-                    self.root.after(0, lambda: self.append_result(f"  Attempt {attempt + 1}/{max_retries}...\n"))
-                    
-                    # Try different wait strategies
-                    if attempt == 0:
-                        # First attempt: standard navigation
-                        page.goto(url, timeout=120000, wait_until="domcontentloaded")
-                    elif attempt == 1:
-                        # Second attempt: wait for load
-                        page.goto(url, timeout=120000, wait_until="load")
-                    elif attempt == 2:
-                        # Third attempt: wait for network idle
-                        page.goto(url, timeout=120000, wait_until="networkidle")
-                    else:
-                        # Final attempts: no wait condition
-                        page.goto(url, timeout=120000)
-                    
-                    self.root.after(0, lambda: self.append_result(f"  ✅ Page loaded successfully (attempt {attempt + 1})\n"))
-                    navigation_success = True
-                    break
-                    
-                except Exception as e:
-                    self.root.after(0, lambda: self.append_result(f"  ⚠️ Attempt {attempt + 1} failed: {str(e)[:100]}...\n"))
-                    if attempt < max_retries - 1:
-                        retry_delay = random.uniform(3, 7)
-                        self.root.after(0, lambda: self.append_result(f"  Waiting {retry_delay:.1f}s before retry...\n"))
-                        time.sleep(retry_delay)
-                    else:
-                        raise e
-            
-            if not navigation_success:
-                raise Exception("All navigation attempts failed")
-            
-            # Comprehensive waiting strategy for dynamic content
-            self.root.after(0, lambda: self.append_result("  Waiting for dynamic content to load...\n"))
-            
-            # Wait for DOM content loaded (increased timeout)
-            try:
-                page.wait_for_load_state("domcontentloaded", timeout=60000)
-                self.root.after(0, lambda: self.append_result("  ✅ DOM content loaded.\n"))
-            except Exception:
-                self.root.after(0, lambda: self.append_result("  ⚠️ DOM content timeout, continuing...\n"))
-            
-            # Wait for load event (increased timeout)
-            try:
-                page.wait_for_load_state("load", timeout=60000)
-                self.root.after(0, lambda: self.append_result("  ✅ Load event completed.\n"))
-            except Exception:
-                self.root.after(0, lambda: self.append_result("  ⚠️ Load event timeout, continuing...\n"))
-            
-            # Wait for network idle (increased timeout)
-            try:
-                page.wait_for_load_state("networkidle", timeout=90000)  # 90 seconds
-                self.root.after(0, lambda: self.append_result("  ✅ Network idle achieved.\n"))
-            except Exception:
-                self.root.after(0, lambda: self.append_result("  ⚠️ Network idle timeout, continuing...\n"))
-            
-            # Extended wait for JavaScript-heavy sites
-            wait_time = random.uniform(8, 15)
-            self.root.after(0, lambda: self.append_result(f"  Additional wait for dynamic content ({wait_time:.1f} seconds)...\n"))
-            time.sleep(wait_time)
-            
-            # Human-like scrolling behavior
-            try:
-                self.root.after(0, lambda: self.append_result("  Simulating human-like scrolling...\n"))
-                
-                # Get page height
-                page_height = page.evaluate("document.body.scrollHeight")
-                viewport_height = page.viewport_size["height"]
-                
-                # Scroll down in small increments like a human
-                scroll_position = 0
-                scroll_increment = random.randint(200, 400)
-                
-                while scroll_position < page_height:
-                    # Random pause between scrolls
-                    pause = random.uniform(0.5, 2.0)
-                    time.sleep(pause)
-                    
-                    # Scroll down
-                    scroll_position += scroll_increment
-                    page.evaluate(f"window.scrollTo(0, {min(scroll_position, page_height)})")
-                    
-                    # Sometimes scroll back up a bit (human behavior)
-                    if random.random() < 0.3:
-                        back_scroll = random.randint(50, 150)
-                        page.evaluate(f"window.scrollTo(0, {max(0, scroll_position - back_scroll)})")
-                        time.sleep(random.uniform(0.3, 1.0))
-                
-                # Scroll to top
-                page.evaluate("window.scrollTo(0, 0)")
-                time.sleep(random.uniform(1, 3))
-                
-                # Random mouse movements (simulate human behavior)
-                try:
-                    page.mouse.move(random.randint(100, 800), random.randint(100, 600))
-                    time.sleep(random.uniform(0.5, 1.5))
-                    page.mouse.move(random.randint(100, 800), random.randint(100, 600))
-                except:
-                    pass
-                
-                self.root.after(0, lambda: self.append_result("  ✅ Human-like behavior simulation completed.\n"))
-            except Exception as e:
-                self.root.after(0, lambda: self.append_result(f"  ⚠️ Scrolling simulation failed: {str(e)[:50]}...\n"))
-            
-            # Extract HTML content
-            self.root.after(0, lambda: self.append_result("  Extracting page content...\n"))
-            try:
-                html_content = page.content()
-                self.root.after(0, lambda: self.append_result(f"  ✅ Content extracted ({len(html_content)} characters).\n"))
-                
-                # Check for captcha or blocking
-                if self.detect_captcha_or_blocking(html_content):
-                    self.root.after(0, lambda: self.append_result("  ⚠️ Captcha or blocking detected in content!\n"))
-                    
-                    # Detect captcha type
-                    captcha_type = self.detect_captcha_type(html_content)
-                    self.root.after(0, lambda: self.append_result(f"  🔍 Detected captcha type: {captcha_type}\n"))
-                    
-                    captcha_solved = False
-                    
-                    # Handle Alibaba NoCaptcha slider
-                    if captcha_type == "alibaba_nocaptcha":
-                        self.root.after(0, lambda: self.append_result("  🎯 Attempting to solve Alibaba NoCaptcha slider...\n"))
-                        captcha_solved = self.solve_alibaba_nocaptcha(page, url)
-                        
-                        if captcha_solved:
-                            # Wait and check if page changed
-                            time.sleep(3)
-                            html_content = page.content()
-                            if not self.detect_captcha_or_blocking(html_content):
-                                self.root.after(0, lambda: self.append_result("  ✅ Alibaba NoCaptcha solved successfully!\n"))
-                            else:
-                                self.root.after(0, lambda: self.append_result("  ⚠️ Captcha still present, continuing anyway...\n"))
-                    
-                    # Try to solve other captcha types with 2Captcha
-                    elif self.use_2captcha.get() and self.captcha_api_key.get().strip():
-                        self.root.after(0, lambda: self.append_result("  🔐 Attempting to solve captcha with 2Captcha...\n"))
-                        
-                        # Check for reCAPTCHA v2
-                        if captcha_type == "recaptcha_v2":
-                            try:
-                                # Extract site key
-                                site_key = None
-                                if 'data-sitekey=' in html_content:
-                                    import re
-                                    match = re.search(r'data-sitekey="([^"]+)"', html_content)
-                                    if match:
-                                        site_key = match.group(1)
-                                
-                                if site_key:
-                                    self.root.after(0, lambda: self.append_result(f"  📝 Found reCAPTCHA v2, site key: {site_key}\n"))
-                                    solution = self.solve_2captcha("recaptcha_v2", url, site_key)
-                                    if solution:
-                                        # Inject solution into page
-                                        page.evaluate(f"""
-                                            document.querySelector('[name="g-recaptcha-response"]').value = '{solution}';
-                                            if (typeof grecaptcha !== 'undefined') {{
-                                                grecaptcha.getResponse = function() {{ return '{solution}'; }};
-                                            }}
-                                        """)
-                                        captcha_solved = True
-                                        self.root.after(0, lambda: self.append_result("  ✅ reCAPTCHA v2 solution injected!\n"))
-                            except Exception as e:
-                                self.root.after(0, lambda: self.append_result(f"  ❌ reCAPTCHA v2 solving failed: {str(e)}\n"))
-                        
-                        # Check for hCaptcha
-                        elif captcha_type == "hcaptcha":
-                            try:
-                                # Extract site key
-                                site_key = None
-                                if 'data-sitekey=' in html_content:
-                                    import re
-                                    match = re.search(r'data-sitekey="([^"]+)"', html_content)
-                                    if match:
-                                        site_key = match.group(1)
-                                
-                                if site_key:
-                                    self.root.after(0, lambda: self.append_result(f"  📝 Found hCaptcha, site key: {site_key}\n"))
-                                    solution = self.solve_2captcha("hcaptcha", url, site_key)
-                                    if solution:
-                                        # Inject solution into page
-                                        page.evaluate(f"""
-                                            document.querySelector('[name="h-captcha-response"]').value = '{solution}';
-                                        """)
-                                        captcha_solved = True
-                                        self.root.after(0, lambda: self.append_result("  ✅ hCaptcha solution injected!\n"))
-                            except Exception as e:
-                                self.root.after(0, lambda: self.append_result(f"  ❌ hCaptcha solving failed: {str(e)}\n"))
-                        
-                        # Check for image captcha
-                        elif captcha_type == "image_captcha":
-                            try:
-                                # Try to find captcha image
-                                captcha_img = page.query_selector('img[src*="captcha"], img[alt*="captcha"], img[id*="captcha"]')
-                                if captcha_img:
-                                    # Get image data
-                                    img_data = captcha_img.screenshot()
-                                    solution = self.solve_2captcha("image", url, None, img_data)
-                                    if solution:
-                                        # Find input field and enter solution
-                                        input_field = page.query_selector('input[name*="captcha"], input[id*="captcha"]')
-                                        if input_field:
-                                            input_field.fill(solution)
-                                            captcha_solved = True
-                                            self.root.after(0, lambda: self.append_result("  ✅ Image captcha solution entered!\n"))
-                            except Exception as e:
-                                self.root.after(0, lambda: self.append_result(f"  ❌ Image captcha solving failed: {str(e)}\n"))
-                        
-                        if captcha_solved:
-                            # Wait a bit and refresh page
-                            time.sleep(2)
-                            page.reload()
-                            time.sleep(3)
-                            html_content = page.content()
-                            self.root.after(0, lambda: self.append_result("  🔄 Page reloaded after captcha solution\n"))
-                        else:
-                            self.root.after(0, lambda: self.append_result("  ⚠️ Could not solve captcha automatically\n"))
-                    
-                    if not captcha_solved:
-                        self.root.after(0, lambda: self.append_result("  💡 Recommendations:\n"))
-                        if captcha_type == "alibaba_nocaptcha":
-                            self.root.after(0, lambda: self.append_result("     • Alibaba NoCaptcha detected - try again with Dynamic mode\n"))
-                            self.root.after(0, lambda: self.append_result("     • Enable proxy settings for better success rate\n"))
-                            self.root.after(0, lambda: self.append_result("     • Wait 5-10 minutes before retrying\n"))
-                        else:
-                            self.root.after(0, lambda: self.append_result("     • Enable 2Captcha auto-solving\n"))
-                            self.root.after(0, lambda: self.append_result("     • Try using Dynamic scraping mode\n"))
-                            self.root.after(0, lambda: self.append_result("     • Enable proxy settings\n"))
-                            self.root.after(0, lambda: self.append_result("     • Wait 5-10 minutes before retrying\n"))
-                        self.root.after(0, lambda: self.append_result("     • Try a different URL or website\n"))
-                        self.root.after(0, lambda: self.append_result("     • Consider using residential proxies\n"))
-                
-            except Exception as e:
-                raise Exception(f"Failed to extract content: {str(e)}")
-            
-            # Close browser and stop Playwright
-            try:
-                browser.close()
-                playwright_instance.stop()
-                self.root.after(0, lambda: self.append_result("  ✅ Browser closed successfully.\n"))
-            except Exception as e:
-                self.root.after(0, lambda: self.append_result(f"  ⚠️ Cleanup warning: {str(e)}\n"))
-            
-            # Extract content using all selector types
-            self.root.after(0, lambda: self.append_result("  Processing extracted content...\n"))
-            results = self.extract_content_dynamic(html_content, url, tag, class_name, id_name, css_selector, xpath_selector)
-            self.root.after(0, lambda: self.append_result("  ✅ Content processing completed.\n"))
-            
-            return results, html_content
-                
-        except Exception as e:
-            # Comprehensive cleanup
-            if page:
-                try:
-                    page.close()
-                except:
-                    pass
-            if browser:
-                try:
-                    browser.close()
-                except:
-                    pass
-            if playwright_instance:
-                try:
-                    playwright_instance.stop()
-                except:
-                    pass
-            
-            error_msg = f"Dynamic scraping failed: {str(e)}"
-            self.root.after(0, lambda: self.append_result(f"  ❌ {error_msg}\n"))
-            raise Exception(error_msg)
+            return max(0.1, float(self.host_rate.get()))
+        except ValueError:
+            return DEFAULT_HOST_RATE
     
-    def extract_content_dynamic(self, html_content, base_url, tag=None, class_name=None, id_name=None, css_selector=None, xpath_selector=None):
-        """Enhanced content extraction for dynamic scraping with image support"""
-        results = {}
-        soup = BeautifulSoup(html_content, "html.parser")
-        
-        # HTML Tag extraction
-        if tag:
-            self.root.after(0, lambda: self.append_result(f"\nResults for HTML tag <{tag}>:\n"))
-            elements = soup.find_all(tag)
-            results['tag'] = []
-            
-            for i, element in enumerate(elements[:10]):
-                if element.name == 'img':
-                    # Handle image elements
-                    img_url = self.get_image_url(element, base_url)
-                    if img_url:
-                        results['tag'].append(f"[IMAGE] {img_url}")
-                        self.root.after(0, lambda url=img_url: self.append_result(f"  [IMAGE] {url}\n"))
-                        self.root.after(0, lambda url=img_url: self.display_image_in_log(url))
-                    else:
-                        results['tag'].append("[IMAGE] No source found")
-                        self.root.after(0, lambda: self.append_result("  [IMAGE] No source found\n"))
-                else:
-                    # Handle text elements
-                    text = element.get_text(strip=True)
-                    if text:
-                        results['tag'].append(text)
-                        self.root.after(0, lambda t=text: self.append_result(f"  {t}\n"))
-                    
-                    # Find images within this element
-                    self.extract_images_from_element(element, base_url, results, 'tag')
-        
-        # CSS Class extraction
-        if class_name:
-            self.root.after(0, lambda: self.append_result(f"\nResults for CSS class '{class_name}':\n"))
-            elements = soup.find_all(class_=class_name)
-            results['class'] = []
-            
-            for element in elements[:10]:
-                if element.name == 'img':
-                    # Handle direct image elements
-                    img_url = self.get_image_url(element, base_url)
-                    if img_url:
-                        results['class'].append(f"[IMAGE] {img_url}")
-                        self.root.after(0, lambda url=img_url: self.append_result(f"  [IMAGE] {url}\n"))
-                        self.root.after(0, lambda url=img_url: self.display_image_in_log(url))
-                else:
-                    # Handle container elements
-                    text = element.get_text(strip=True)
-                    if text:
-                        results['class'].append(text)
-                        self.root.after(0, lambda t=text: self.append_result(f"  {t}\n"))
-                    
-                    # Find images within this element
-                    self.extract_images_from_element(element, base_url, results, 'class')
-        
-        # Element ID extraction
-        if id_name:
-            self.root.after(0, lambda: self.append_result(f"\nResults for element ID '{id_name}':\n"))
-            element = soup.find(id=id_name)
-            results['id'] = []
-            
-            if element:
-                if element.name == 'img':
-                    # Handle direct image element
-                    img_url = self.get_image_url(element, base_url)
-                    if img_url:
-                        results['id'].append(f"[IMAGE] {img_url}")
-                        self.root.after(0, lambda url=img_url: self.append_result(f"  [IMAGE] {url}\n"))
-                        self.root.after(0, lambda url=img_url: self.display_image_in_log(url))
-                else:
-                    # Handle container element
-                    text = element.get_text(strip=True)
-                    if text:
-                        results['id'].append(text)
-                        self.root.after(0, lambda t=text: self.append_result(f"  {t}\n"))
-                    
-                    # Find images within this element
-                    self.extract_images_from_element(element, base_url, results, 'id')
+    def get_host_concurrency(self):
+        """Requests in flight allowed to one host"""
+        try:
+            return max(1, int(self.host_concurrency.get()))
+        except ValueError:
+            return DEFAULT_HOST_CONCURRENCY
+    
+    def get_result_limit(self):
+        """Matches used per selector; None (entered as 0) means all"""
+        try:
+            return max(0, int(self.result_limit.get())) or None
+        except ValueError:
+            return 10
+    
+    def get_result_offset(self):
+        """Matches skipped per selector"""
+        try:
+            return max(0, int(self.result_offset.get()))
+        except ValueError:
+            return 0
+    
+    def open_checkpoint(self, selectors):
+        """Find or start the checkpoint of this job; False if the user cancelled"""
+        seeds = self.batch_urls or [self.url_var.get().strip()]
+        crawl = self.get_crawl_config() if self.crawl_enabled.get() else None
+        key = job_key(
+            self.scraping_type.get(), selectors, self.get_result_limit(), self.get_result_offset(), tuple(seeds),
+            (crawl.link_selectors, crawl.max_depth) if crawl else None,
+        )
+        checkpoint = JobCheckpoint(key)
+        if checkpoint.exists():
+            counts = checkpoint.counts()
+            answer = messagebox.askyesnocancel(
+                "中断したジョブ",
+                f"同じジョブの前回の進捗が見つかりました。\n\n"
+                f"完了: {counts[STATE_DONE]} 件 / 未完了: {counts[STATE_PENDING]} 件 / 失敗: {counts[STATE_FAILED]} 件\n\n"
+                f"続きから再開しますか？\n（「いいえ」で最初からやり直します）"
+            )
+            if answer is None:
+                checkpoint.close()
+                return False
+            export_path = self.export_path.get().strip()
+            if answer and export_path and not can_resume(export_path):
+                # The finished pages' records would be overwritten and never fetched again
+                messagebox.showerror(
+                    "再開できません",
+                    "Parquet / Arrow の保存ファイルは実行ごとに書き直されるため、再開できません。\n"
+                    "最初からやり直すか、.jsonl / .csv に保存してください。"
+                )
+                checkpoint.close()
+                return False
+            if answer:
+                checkpoint.requeue_failed()
             else:
-                self.root.after(0, lambda: self.append_result("  No element found\n"))
-        
-        # CSS Selector extraction
-        if css_selector:
-            self.root.after(0, lambda: self.append_result(f"\nResults for CSS selector '{css_selector}':\n"))
-            try:
-                elements = soup.select(css_selector)
-                results['css'] = []
-                
-                for element in elements[:10]:
-                    if element.name == 'img':
-                        # Handle direct image elements
-                        img_url = self.get_image_url(element, base_url)
-                        if img_url:
-                            results['css'].append(f"[IMAGE] {img_url}")
-                            self.root.after(0, lambda url=img_url: self.append_result(f"  [IMAGE] {url}\n"))
-                            self.root.after(0, lambda url=img_url: self.display_image_in_log(url))
-                    else:
-                        # Handle container elements
-                        text = element.get_text(strip=True)
-                        if text:
-                            results['css'].append(text)
-                            self.root.after(0, lambda t=text: self.append_result(f"  {t}\n"))
-                        
-                        # Find images within this element
-                        self.extract_images_from_element(element, base_url, results, 'css')
-            except Exception as e:
-                self.root.after(0, lambda: self.append_result(f"  CSS selector error: {str(e)}\n"))
-        
-        # XPath extraction
-        if xpath_selector:
-            self.root.after(0, lambda: self.append_result(f"\nResults for XPath '{xpath_selector}':\n"))
+                checkpoint.clear()
+        self.checkpoint = checkpoint
+        return True
+    
+    def get_crawl_config(self):
+        """Crawl limits and link selector from the UI"""
+        try:
+            max_depth = max(0, int(self.crawl_depth.get()))
+        except ValueError:
+            max_depth = 1
+        try:
+            max_pages = max(1, int(self.crawl_max_pages.get()))
+        except ValueError:
+            max_pages = 50
+        return CrawlConfig(
+            link_selectors=SelectorSpec(css_selector=self.crawl_link_css.get().strip() or "a[href]"),
+            max_depth=max_depth,
+            max_pages=max_pages,
+            workers=self.get_max_workers(),
+        )
+    
+    def choose_export_file(self):
+        """Pick the file that extracted items are appended to"""
+        file_path = filedialog.asksaveasfilename(
+            defaultextension=".jsonl",
+            filetypes=[("JSON Lines ファイル", "*.jsonl"), ("CSV ファイル", "*.csv"), ("Parquet ファイル", "*.parquet")]
+        )
+        if file_path:
+            self.export_path.set(file_path)
+    
+    def load_url_file(self):
+        """Load a URL list file into the URL list box"""
+        file_path = filedialog.askopenfilename(
+            filetypes=[("テキスト ファイル", "*.txt"), ("すべてのファイル", "*.*")]
+        )
+        if file_path:
             try:
-                tree = html.fromstring(html_content)
-                xpath_results = tree.xpath(xpath_selector)
-                results['xpath'] = []
-                
-                for r in xpath_results[:10]:
-                    if hasattr(r, "text_content"):
-                        text = r.text_content().strip()
-                        if text:
-                            results['xpath'].append(text)
-                            self.root.after(0, lambda t=text: self.append_result(f"  {t}\n"))
-                        
-                        # Find images within XPath results
-                        try:
-                            element_html = html.tostring(r, encoding='unicode')
-                            element_soup = BeautifulSoup(element_html, 'html.parser')
-                            self.extract_images_from_element(element_soup, base_url, results, 'xpath')
-                        except:
-                            pass
-                    else:
-                        text = str(r).strip()
-                        if text:
-                            results['xpath'].append(text)
-                            self.root.after(0, lambda t=text: self.append_result(f"  {t}\n"))
+                urls = load_url_list(file_path)
             except Exception as e:
-                self.root.after(0, lambda: self.append_result(f"  XPath error: {str(e)}\n"))
-        
-        return results
+                messagebox.showerror("エラー", f"ファイルの読み込みに失敗しました:\n{str(e)}")
+                return
+            self.url_list_text.delete(1.0, tk.END)
+            self.url_list_text.insert(tk.END, "\n".join(urls))
+            self.append_result(f"{len(urls)} 件の URL を読み込みました: {file_path}\n")
     
-    def get_image_url(self, img_element, base_url):
-        """Get image URL from img element"""
-        img_url = img_element.get('src') or img_element.get('data-src') or img_element.get('data-lazy-src') or img_element.get('data-original')
-        if img_url:
-            # Convert relative URL to absolute
-            if not img_url.startswith(('http://', 'https://')):
-                img_url = urljoin(base_url, img_url)
-        return img_url
+    def on_engine_event(self, event):
+        """Forward engine events to the results area on the Tk main thread"""
+        if event.kind == EVENT_IMAGE:
+            self.display_image_in_log(event.url)
+        else:
+            self.append_result(event.message)
     
-    def extract_images_from_element(self, element, base_url, results, result_type):
-        """Extract images from within an element"""
-        images = element.find_all('img')
-        for img in images:
-            img_url = self.get_image_url(img, base_url)
-            if img_url:
-                results[result_type].append(f"[IMAGE] {img_url}")
-                self.root.after(0, lambda url=img_url: self.append_result(f"  [IMAGE] {url}\n"))
-                self.root.after(0, lambda url=img_url: self.display_image_in_log(url))
+    def scrape_static(self, url, tag=None, class_name=None, id_name=None, css_selector=None, xpath_selector=None):
+        """Static scraping through the engine"""
+        job = self.build_job(url, "static", tag, class_name, id_name, css_selector, xpath_selector)
+        result = self.engine.run(job)
+        return result.results, result.html_content
     
-    def extract_content(self, html_content, tag=None, class_name=None, id_name=None, css_selector=None, xpath_selector=None):
-        """Extract content using various selectors"""
-        results = {}
-        soup = BeautifulSoup(html_content, "html.parser")
-        
-        # Tag extraction
-        if tag:
-            elements = soup.find_all(tag)
-            results['tag'] = []
-            self.root.after(0, lambda: self.append_result(f"Results for tag <{tag}>:\n"))
-            for e in elements[:10]:
-                if e.name == 'img':
-                    # Handle image elements
-                    img_url = e.get('src') or e.get('data-src') or e.get('data-lazy-src')
-                    if img_url:
-                        results['tag'].append(f"[IMAGE] {img_url}")
-                        self.root.after(0, lambda url=img_url: self.append_result(f"  [IMAGE] {url}\n"))
-                        self.root.after(0, lambda url=img_url: self.display_image_in_log(url))
-                    else:
-                        results['tag'].append("[IMAGE] No source found")
-                        self.root.after(0, lambda: self.append_result("  [IMAGE] No source found\n"))
-                else:
-                    text = e.get_text(strip=True)
-                    results['tag'].append(text)
-                    self.root.after(0, lambda t=text: self.append_result(f"  {t}\n"))
-        
-        # Class extraction
-        if class_name:
-            elements = soup.find_all(class_=class_name)
-            results['class'] = []
-            self.root.after(0, lambda: self.append_result(f"\nResults for class='{class_name}':\n"))
-            for e in elements[:10]:
-                if e.name == 'img':
-                    # Handle direct image elements
-                    img_url = e.get('src') or e.get('data-src') or e.get('data-lazy-src')
-                    if img_url:
-                        results['class'].append(f"[IMAGE] {img_url}")
-                        self.root.after(0, lambda url=img_url: self.append_result(f"  [IMAGE] {url}\n"))
-                        self.root.after(0, lambda url=img_url: self.display_image_in_log(url))
-                    else:
-                        results['class'].append("[IMAGE] No source found")
-                        self.root.after(0, lambda: self.append_result("  [IMAGE] No source found\n"))
-                else:
-                    # Handle container elements - extract text and images
-                    text = e.get_text(strip=True)
-                    if text:
-                        results['class'].append(text)
-                        self.root.after(0, lambda t=text: self.append_result(f"  {t}\n"))
-                    
-                    # Find images within this element
-                    images = e.find_all('img')
-                    for img in images:
-                        img_url = img.get('src') or img.get('data-src') or img.get('data-lazy-src')
-                        if img_url:
-                            results['class'].append(f"[IMAGE] {img_url}")
-                            self.root.after(0, lambda url=img_url: self.append_result(f"  [IMAGE] {url}\n"))
-                            self.root.after(0, lambda url=img_url: self.display_image_in_log(url))
-        
-        # ID extraction
-        if id_name:
-            element = soup.find(id=id_name)
-            if element:
-                results['id'] = []
-                self.root.after(0, lambda: self.append_result(f"\nResults for id='{id_name}':\n"))
-                
-                if element.name == 'img':
-                    # Handle direct image element
-                    img_url = element.get('src') or element.get('data-src') or element.get('data-lazy-src')
-                    if img_url:
-                        results['id'].append(f"[IMAGE] {img_url}")
-                        self.root.after(0, lambda url=img_url: self.append_result(f"  [IMAGE] {url}\n"))
-                        self.root.after(0, lambda url=img_url: self.display_image_in_log(url))
-                    else:
-                        results['id'].append("[IMAGE] No source found")
-                        self.root.after(0, lambda: self.append_result("  [IMAGE] No source found\n"))
-                else:
-                    # Handle container element - extract text and images
-                    text = element.get_text(strip=True)
-                    if text:
-                        results['id'].append(text)
-                        self.root.after(0, lambda t=text: self.append_result(f"  {t}\n"))
-                    
-                    # Find images within this element
-                    images = element.find_all('img')
-                    for img in images:
-                        img_url = img.get('src') or img.get('data-src') or img.get('data-lazy-src')
-                        if img_url:
-                            results['id'].append(f"[IMAGE] {img_url}")
-                            self.root.after(0, lambda url=img_url: self.append_result(f"  [IMAGE] {url}\n"))
-                            self.root.after(0, lambda url=img_url: self.display_image_in_log(url))
+    def scrape_dynamic(self, url, tag=None, class_name=None, id_name=None, css_selector=None, xpath_selector=None):
+        """Dynamic scraping through the engine"""
+        job = self.build_job(url, "dynamic", tag, class_name, id_name, css_selector, xpath_selector)
+        result = self.engine.run(job)
+        return result.results, result.html_content
+    
+    def scrape_batch(self, urls, scraping_type, tag=None, class_name=None, id_name=None, css_selector=None, xpath_selector=None):
+        """Scrape a URL list through the engine's worker pool, keyed by URL"""
+        job = self.build_job(urls[0], scraping_type, tag, class_name, id_name, css_selector, xpath_selector)
+        workers = self.get_max_workers()
+        self.append_result(f"[BATCH] {len(urls)} URLs, {workers} workers\n")
+        
+        all_results = {}
+        checkpoint = self.checkpoint
+        if checkpoint is not None:
+            # Pages finished by an earlier run are not fetched again
+            checkpoint.add_pending(urls)
+            all_results.update(checkpoint.completed_results())
+            remaining = [url for url, _ in checkpoint.pending()]
+            if len(remaining) < len(urls):
+                self.append_result(f"[RESUME] {len(urls) - len(remaining)} 件は完了済み、残り {len(remaining)} 件を取得します\n")
+            urls = remaining
+        jobs = (job.with_url(url) for url in urls)
+        if scraping_type == "dynamic":
+            # Pages render concurrently in one Chromium on the async engine
+            batch = self.engine.run_dynamic_batch(jobs, concurrency=workers)
+        else:
+            batch = self.engine.run_batch(jobs, max_workers=workers)
+        for done, result in enumerate(batch, 1):
+            if checkpoint is not None:
+                checkpoint.record(result, self.export_sink)
+            if result.error:
+                line = f"[{done}/{len(urls)}] ❌ {result.url}: {result.error}\n"
             else:
-                results['id'] = []
-                self.root.after(0, lambda: self.append_result(f"\nResults for id='{id_name}':\n"))
-                self.root.after(0, lambda: self.append_result("  No element found\n"))
-        
-        # CSS selector extraction
-        if css_selector:
-            elements = soup.select(css_selector)
-            results['css'] = []
-            self.root.after(0, lambda: self.append_result(f"\nResults for CSS selector '{css_selector}':\n"))
-            for e in elements[:10]:
-                if e.name == 'img':
-                    # Handle direct image elements
-                    img_url = e.get('src') or e.get('data-src') or e.get('data-lazy-src')
-                    if img_url:
-                        results['css'].append(f"[IMAGE] {img_url}")
-                        self.root.after(0, lambda url=img_url: self.append_result(f"  [IMAGE] {url}\n"))
-                        self.root.after(0, lambda url=img_url: self.display_image_in_log(url))
-                    else:
-                        results['css'].append("[IMAGE] No source found")
-                        self.root.after(0, lambda: self.append_result("  [IMAGE] No source found\n"))
-                else:
-                    # Handle container elements - extract text and images
-                    text = e.get_text(strip=True)
-                    if text:
-                        results['css'].append(text)
-                        self.root.after(0, lambda t=text: self.append_result(f"  {t}\n"))
-                    
-                    # Find images within this element
-                    images = e.find_all('img')
-                    for img in images:
-                        img_url = img.get('src') or img.get('data-src') or img.get('data-lazy-src')
-                        if img_url:
-                            results['css'].append(f"[IMAGE] {img_url}")
-                            self.root.after(0, lambda url=img_url: self.append_result(f"  [IMAGE] {url}\n"))
-                            self.root.after(0, lambda url=img_url: self.display_image_in_log(url))
-        
-        # XPath extraction
-        if xpath_selector:
-            tree = html.fromstring(html_content)
-            xpath_results = tree.xpath(xpath_selector)
-            results['xpath'] = []
-            self.root.after(0, lambda: self.append_result(f"\nResults for XPath '{xpath_selector}':\n"))
-            for r in xpath_results[:10]:
-                if hasattr(r, "text_content"):
-                    text = r.text_content().strip()
-                    if text:
-                        results['xpath'].append(text)
-                        self.root.after(0, lambda t=text: self.append_result(f"  {t}\n"))
-                    
-                    # Find images within this element
-                    if hasattr(r, 'xpath'):
-                        try:
-                            # Convert lxml element back to BeautifulSoup for image search
-                            element_html = html.tostring(r, encoding='unicode')
-                            element_soup = BeautifulSoup(element_html, 'html.parser')
-                            images = element_soup.find_all('img')
-                            for img in images:
-                                img_url = img.get('src') or img.get('data-src') or img.get('data-lazy-src')
-                                if img_url:
-                                    results['xpath'].append(f"[IMAGE] {img_url}")
-                                    self.root.after(0, lambda url=img_url: self.append_result(f"  [IMAGE] {url}\n"))
-                                    self.root.after(0, lambda url=img_url: self.display_image_in_log(url))
-                        except:
-                            pass
-                else:
-                    text = str(r).strip()
-                    if text:
-                        results['xpath'].append(text)
-                        self.root.after(0, lambda t=text: self.append_result(f"  {t}\n"))
-        
-        return results
+                all_results[result.url] = result.results
+                line = f"[{done}/{len(urls)}] ✅ {result.url}\n"
+            self.append_result(line)
+        return all_results
+    
+    def scrape_crawl(self, seeds, scraping_type, tag=None, class_name=None, id_name=None, css_selector=None, xpath_selector=None):
+        """Crawl from the seed URLs, following matched links; results are keyed by URL"""
+        job = self.build_job(seeds[0], scraping_type, tag, class_name, id_name, css_selector, xpath_selector)
+        config = self.get_crawl_config()
+        self.append_result(f"[CRAWL] {len(seeds)} 件の起点, 深さ {config.max_depth}, 最大 {config.max_pages} ページ\n")
+        
+        all_results = {}
+        if self.checkpoint is not None:
+            all_results.update(self.checkpoint.completed_results())
+        for done, page in enumerate(Crawler(self.engine, config, checkpoint=self.checkpoint).crawl(job, seeds), 1):
+            result = page.result
+            if result.error:
+                line = f"[{done}] ❌ (深さ {page.depth}) {result.url}: {result.error}\n"
+            else:
+                all_results[result.url] = result.results
+                line = f"[{done}] ✅ (深さ {page.depth}) {result.url} (+{page.queued} リンク)\n"
+            self.append_result(line)
+        return all_results
     
     def display_image_in_log(self, img_url):
-        """Display image in the log/results area with download functionality"""
+        """Queue an image for background download and thumbnailing"""
+        # Convert relative URL to absolute if needed
+        if not img_url.startswith(('http://', 'https://', 'data:')):
+            base_url = self.url_var.get().strip()
+            img_url = urljoin(base_url, img_url)
+        self.thumbnails.submit(img_url)
+    
+    def on_thumbnail_ready(self, thumbnail):
+        """Hand a finished thumbnail to the Tk main thread (called from a worker)"""
+        self.log_pane.call(lambda t=thumbnail: self.show_thumbnail(t))
+    
+    def show_thumbnail(self, thumbnail):
+        """Display a decoded thumbnail in the log/results area with download functionality"""
+        if thumbnail.error:
+            self.append_result(f"    [Error loading image: {thumbnail.error}]\n")
+            return
         try:
-            img_data = None
-            content_type = ""
+            if thumbnail.url.startswith('data:'):
+                self.append_result(f"    [Base64 Image: {thumbnail.content_type}]\n")
             
-            # Handle data URLs (base64 encoded images)
-            if img_url.startswith('data:'):
-                try:
-                    # Parse data URL: data:image/png;base64,iVBORw0KGgo...
-                    header, data = img_url.split(',', 1)
-                    if ';base64' in header:
-                        content_type = header.split(':')[1].split(';')[0]
-                        img_data = base64.b64decode(data)
-                        self.append_result(f"    [Base64 Image: {content_type}]\n")
-                    else:
-                        self.append_result("    [Unsupported data URL format]\n")
-                        return
-                except Exception as e:
-                    self.append_result(f"    [Error parsing data URL: {str(e)}]\n")
-                    return
-            else:
-                # Handle regular URLs
-                # Convert relative URL to absolute if needed
-                if not img_url.startswith(('http://', 'https://')):
-                    base_url = self.url_var.get().strip()
-                    img_url = urljoin(base_url, img_url)
-                
-                # Download image
-                response = requests.get(img_url, headers={"User-Agent": "Mozilla/5.0"}, timeout=10)
-                response.raise_for_status()
-                
-                # Check if it's actually an image
-                content_type = response.headers.get('content-type', '')
-                if not content_type.startswith('image/'):
-                    self.append_result("    [Not a valid image]\n")
-                    return
-                
-                img_data = response.content
-            
-            # Load and resize image
-            img_pil = Image.open(io.BytesIO(img_data))
-            original_width, original_height = img_pil.size
-            
-            # Resize to fit in log (max 200x150)
-            max_width, max_height = 200, 150
-            
-            if original_width > max_width or original_height > max_height:
-                ratio = min(max_width/original_width, max_height/original_height)
-                new_width = int(original_width * ratio)
-                new_height = int(original_height * ratio)
-                img_pil = img_pil.resize((new_width, new_height), Image.Resampling.LANCZOS)
-            
-            # Convert to PhotoImage
-            img_tk = ImageTk.PhotoImage(img_pil)
+            # Only the PhotoImage is created here; download and decode ran in the pipeline
+            from PIL import ImageTk
+            img_tk = ImageTk.PhotoImage(thumbnail.image)
             
             # Insert image into text widget
             self.results_text.image_create(tk.END, image=img_tk)
             self.results_text.insert(tk.END, "\n")
             
-            # Keep a reference to prevent garbage collection
-            if not hasattr(self, 'image_references'):
-                self.image_references = []
-            self.image_references.append(img_tk)
-            
-            # Store image data for download
-            if not hasattr(self, 'image_data'):
-                self.image_data = []
-            self.image_data.append({
-                'url': img_url,
-                'content': img_data,
-                'original_size': (original_width, original_height),
-                'file_size': len(img_data),
-                'content_type': content_type
-            })
+            # Keep a reference to prevent garbage collection while the pane shows the image
+            image_index = self.image_count
+            self.image_count += 1
+            self.image_references[image_index] = img_tk
+            
+            # Image metadata for download; the bytes stay in the image store
+            self.image_data[image_index] = {
+                'url': thumbnail.url,
+                'digest': thumbnail.digest,
+                'original_size': thumbnail.original_size,
+                'file_size': thumbnail.file_size,
+                'content_type': thumbnail.content_type
+            }
             
             # Add image info with download button
-            self.append_result(f"    Size: {original_width}x{original_height} | File size: {len(img_data)} bytes\n")
+            original_width, original_height = thumbnail.original_size
+            self.append_result(f"    Size: {original_width}x{original_height} | File size: {thumbnail.file_size} bytes\n")
             self.append_result("    [Click 'Download Image' button below to save this image]\n")
             
             # Add download button
-            self.add_download_button(img_url, len(self.image_data) - 1)
+            self.add_download_button(thumbnail.url, image_index)
+            
+            # The image and its metadata go when the pane trims these lines
+            self.log_pane.attach(lambda: self.forget_image(image_index))
             
         except Exception as e:
             self.append_result(f"    [Error loading image: {str(e)}]\n")
     
+    def forget_image(self, image_index):
+        """Drop an image the results pane no longer shows"""
+        self.image_references.pop(image_index, None)
+        self.image_data.pop(image_index, None)
+    
     def add_download_button(self, img_url, image_index):
         """Add a download button for the image"""
         try:
@@ -1768,13 +821,12 @@ class WebScraperGUI:
     def download_image(self, image_index):
         """Download the image to user's chosen location"""
         try:
-            if not hasattr(self, 'image_data') or image_index >= len(self.image_data):
+            image_info = self.image_data.get(image_index)
+            if image_info is None:
                 messagebox.showerror("エラー", "画像データが見つかりません")
                 return
             
-            image_info = self.image_data[image_index]
             img_url = image_info['url']
-            content = image_info['content']
             
             # Get filename from URL or create one for data URLs
             if img_url.startswith('data:'):
@@ -1827,8 +879,7 @@ class WebScraperGUI:
             
             if file_path:
                 # Save the image
-                with open(file_path, 'wb') as f:
-                    f.write(content)
+                self.image_store.copy_to(image_info['digest'], file_path)
                 
                 # Show success message
                 messagebox.showinfo("成功", f"画像を保存しました:\n{file_path}")
@@ -1855,6 +906,8 @@ class WebScraperGUI:
             if result.returncode == 0:
                 self.append_result("✅ Playwright のブラウザを正常にインストールしました！\n")
                 self.append_result("Dynamic モードが使用可能になりました。\n")
+                # Refresh the cached browser check for the next start
+                self.playwright_probe.start(lambda result: None)
                 messagebox.showinfo("成功", "Playwright のブラウザをインストールしました。\nDynamic モードが使用可能です。")
             else:
                 error_msg = result.stderr or result.stdout
@@ -1869,9 +922,8 @@ class WebScraperGUI:
             messagebox.showerror("エラー", f"Playwright のインストールに失敗しました:\n{str(e)}")
     
     def append_result(self, text):
-        """Append text to results area"""
-        self.results_text.insert(tk.END, text)
-        self.results_text.see(tk.END)
+        """Append text to results area; safe to call from any thread"""
+        self.log_pane.write(text)
     
     def scraping_complete(self, results):
         """Called when scraping is complete"""
@@ -1895,20 +947,36 @@ class WebScraperGUI:
         self.append_result(f"\nエラー: {error_msg}\n")
         messagebox.showerror("スクレイピングエラー", f"エラーが発生しました:\n{error_msg}")
     
+    def on_close(self):
+        """Release pooled connections and close the window"""
+        self.stop_event.set()
+        self.log_pane.stop()
+        self.thumbnails.close()
+        self.image_store.prune()
+        self.engine.close()
+        if self.extraction_pool is not None:
+            self.extraction_pool.close()
+        self.response_cache.prune()
+        self.response_cache.close()
+        self.root.destroy()
+    
     def clear_results(self):
         """Clear the results area"""
-        self.results_text.delete(1.0, tk.END)
+        self.thumbnails.clear()
+        self.log_pane.clear()
         self.scraping_results = {}
-        # Clear image references and data
-        if hasattr(self, 'image_references'):
-            self.image_references = []
-        if hasattr(self, 'image_data'):
-            self.image_data = []
+        # Clearing the pane released its images; numbering starts over
+        self.image_references.clear()
+        self.image_data.clear()
+        self.image_count = 0
     
     def save_results(self):
         """Save results to file"""
         if not self.scraping_results:
-            messagebox.showwarning("警告", "保存する結果がありません")
+            if self.export_path.get().strip():
+                messagebox.showinfo("情報", f"結果は逐次保存先に書き込まれています:\n{self.export_path.get().strip()}")
+            else:
+                messagebox.showwarning("警告", "保存する結果がありません")
             return
         
         file_path = filedialog.asksaveasfilename(
@@ -1924,13 +992,21 @@ class WebScraperGUI:
                 elif file_path.endswith('.csv'):
                     with open(file_path, 'w', newline='', encoding='utf-8') as f:
                         writer = csv.writer(f)
-                        writer.writerow(['Selector Type', 'Content'])
-                        for selector_type, content_list in self.scraping_results.items():
-                            for content in content_list:
-                                writer.writerow([selector_type, content])
+                        if self.batch_urls or self.crawl_enabled.get():
+                            # Batch and crawl results are keyed by URL
+                            writer.writerow(['URL', 'Selector Type', 'Content'])
+                            for url, url_results in self.scraping_results.items():
+                                for selector_type, content_list in url_results.items():
+                                    for content in content_list:
+                                        writer.writerow([url, selector_type, content])
+                        else:
+                            writer.writerow(['Selector Type', 'Content'])
+                            for selector_type, content_list in self.scraping_results.items():
+                                for content in content_list:
+                                    writer.writerow([selector_type, content])
                 else:  # txt
                     with open(file_path, 'w', encoding='utf-8') as f:
-                        f.write(self.results_text.get(1.0, tk.END))
+                        f.write(self.log_pane.all_text())
                 
                 messagebox.showinfo("成功", f"結果を保存しました: {file_path}")
             except Exception as e:
@@ -1938,8 +1014,11 @@ class WebScraperGUI:
 
 
 def main():
+    # Extraction worker processes re-run this module in a frozen build
+    multiprocessing.freeze_support()
     root = tk.Tk()
     app = WebScraperGUI(root)
+    root.protocol("WM_DELETE_WINDOW", app.on_close)
     root.mainloop()
 
 
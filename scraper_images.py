@@ -0,0 +1,252 @@
+"""Background thumbnail pipeline for images shown in the results pane.
+
+Downloading and decoding run on a small worker pool so the Tk main thread
+never blocks on the network or on PIL. JPEGs are decoded at reduced size via
+``Image.draft`` before ``thumbnail``, so a large product photo costs a
+fraction of a full decode. Only a bounded number of images are in flight;
+the rest wait in a queue. Finished thumbnails are handed to ``on_ready``
+from a worker thread; turning them into a PhotoImage is left to the caller's
+main thread.
+
+Raw image bytes never stay in memory: each download is written once to a
+content-addressed ImageStore on disk (keyed by its SHA-256), and callers keep
+only the digest plus an LRU of recent thumbnails.
+"""
+
+import base64
+import hashlib
+import io
+import os
+import shutil
+import tempfile
+import threading
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Callable, Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+
+if TYPE_CHECKING:
+    from PIL import Image
+
+
+# Largest thumbnail drawn in the results pane
+THUMBNAIL_SIZE = (200, 150)
+
+# Download/decode threads and how many images may be fetched at once
+IMAGE_WORKERS = 4
+MAX_IN_FLIGHT = 8
+
+IMAGE_HEADERS = {"User-Agent": "Mozilla/5.0"}
+
+# Thumbnails kept alive in memory, and the disk budget of the image store
+THUMBNAIL_CACHE_SIZE = 200
+IMAGE_STORE_MAX_BYTES = 512 * 1024 * 1024
+
+IMAGE_STORE_DIR = os.path.join(tempfile.gettempdir(), "scraper_image_store")
+
+
+@dataclass
+class Thumbnail:
+    """A decoded thumbnail and what is known about its source image"""
+    url: str
+    image: Optional['Image.Image'] = None
+    digest: Optional[str] = None
+    file_size: int = 0
+    content_type: str = ""
+    original_size: Tuple[int, int] = (0, 0)
+    error: Optional[str] = None
+
+
+class ImageStore:
+    """Image bytes on disk, stored once per SHA-256 of the content"""
+
+    def __init__(self, root=IMAGE_STORE_DIR, max_bytes=IMAGE_STORE_MAX_BYTES):
+        self.root = root
+        self.max_bytes = max_bytes
+        os.makedirs(root, exist_ok=True)
+
+    def path(self, digest):
+        """File holding the bytes for ``digest``"""
+        return os.path.join(self.root, digest[:2], digest)
+
+    def put(self, content) -> str:
+        """Store bytes if they are new and return their digest"""
+        digest = hashlib.sha256(content).hexdigest()
+        path = self.path(digest)
+        if os.path.exists(path):
+            return digest
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(content)
+            # Atomic, so a concurrent put of the same image never sees a partial file
+            os.replace(tmp_path, path)
+        except BaseException:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            raise
+        return digest
+
+    def read(self, digest) -> bytes:
+        """Stored bytes for ``digest``"""
+        with open(self.path(digest), 'rb') as f:
+            return f.read()
+
+    def copy_to(self, digest, dest_path):
+        """Copy a stored image to ``dest_path`` without loading it into memory"""
+        shutil.copyfile(self.path(digest), dest_path)
+
+    def prune(self):
+        """Delete the least recently written files until the store fits max_bytes"""
+        files = []
+        total = 0
+        for dirpath, _, filenames in os.walk(self.root):
+            for name in filenames:
+                path = os.path.join(dirpath, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                files.append((stat.st_mtime, stat.st_size, path))
+                total += stat.st_size
+        for _, size, path in sorted(files):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+                total -= size
+            except OSError:
+                pass
+
+
+class LRUCache:
+    """Bounded mapping that forgets the least recently used entry"""
+
+    def __init__(self, max_size=THUMBNAIL_CACHE_SIZE):
+        self.max_size = max_size
+        self._items = OrderedDict()
+
+    def get(self, key, default=None):
+        if key not in self._items:
+            return default
+        self._items.move_to_end(key)
+        return self._items[key]
+
+    def put(self, key, value):
+        self._items[key] = value
+        self._items.move_to_end(key)
+        while len(self._items) > self.max_size:
+            self._items.popitem(last=False)
+
+    def clear(self):
+        self._items.clear()
+
+    def __contains__(self, key):
+        return key in self._items
+
+    def __len__(self):
+        return len(self._items)
+
+
+def load_image_bytes(url, session=None, timeout=10):
+    """Raw bytes and content type of an http(s) or base64 data URL"""
+    if url.startswith('data:'):
+        header, data = url.split(',', 1)
+        if ';base64' not in header:
+            raise Exception("Unsupported data URL format")
+        return base64.b64decode(data), header.split(':')[1].split(';')[0]
+
+    response = (session or requests).get(url, headers=IMAGE_HEADERS, timeout=timeout)
+    response.raise_for_status()
+    content_type = response.headers.get('content-type', '')
+    if not content_type.startswith('image/'):
+        raise Exception("Not a valid image")
+    return response.content, content_type
+
+
+def make_thumbnail(data, size=THUMBNAIL_SIZE):
+    """Decode just enough of an image to fit ``size``; return (thumbnail, original size)"""
+    # PIL is loaded by the first thumbnail, not at startup
+    from PIL import Image
+    img = Image.open(io.BytesIO(data))
+    original_size = img.size
+    # JPEG only: let the decoder scale down by 1/2, 1/4 or 1/8 while decoding
+    img.draft('RGB', size)
+    img.thumbnail(size, Image.Resampling.LANCZOS)
+    return img, original_size
+
+
+class ThumbnailPipeline:
+    def __init__(self, on_ready: Callable[[Thumbnail], None], store: Optional[ImageStore] = None,
+                 workers=IMAGE_WORKERS, max_in_flight=MAX_IN_FLIGHT, size=THUMBNAIL_SIZE):
+        self.on_ready = on_ready
+        self.store = store if store is not None else ImageStore()
+        self.max_in_flight = max_in_flight
+        self.size = size
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="thumbnail")
+        self._pending = deque()
+        self._in_flight = 0
+        self._lock = threading.Lock()
+        self._closed = False
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=workers, pool_maxsize=workers)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+    def submit(self, url):
+        """Queue an image; it starts as soon as fewer than max_in_flight are running"""
+        with self._lock:
+            if self._closed:
+                return
+            if self._in_flight >= self.max_in_flight:
+                self._pending.append(url)
+                return
+            self._in_flight += 1
+        self._executor.submit(self._work, url)
+
+    def clear(self):
+        """Drop images that have not started yet"""
+        with self._lock:
+            self._pending.clear()
+
+    def close(self):
+        """Drop queued images and stop the workers"""
+        with self._lock:
+            self._closed = True
+            self._pending.clear()
+        self._executor.shutdown(wait=False)
+        self.session.close()
+
+    def _work(self, url):
+        """Fetch and decode one image, then start the next queued one"""
+        thumbnail = Thumbnail(url=url)
+        try:
+            content, thumbnail.content_type = load_image_bytes(url, self.session)
+            thumbnail.file_size = len(content)
+            thumbnail.image, thumbnail.original_size = make_thumbnail(content, self.size)
+            thumbnail.digest = self.store.put(content)
+        except Exception as e:
+            thumbnail.error = str(e)
+
+        with self._lock:
+            next_url = self._pending.popleft() if self._pending and not self._closed else None
+            if next_url is None:
+                self._in_flight -= 1
+        if next_url is not None:
+            try:
+                self._executor.submit(self._work, next_url)
+            except RuntimeError:
+                # Closed while this image was decoding
+                pass
+
+        try:
+            self.on_ready(thumbnail)
+        except Exception:
+            pass
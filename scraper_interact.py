@@ -0,0 +1,192 @@
+"""Page interactions shared by the sync and async dynamic engines.
+
+Everything here is decided without touching the page: the stealth scripts
+and headers, the human-like scroll and slider movements, the captcha site
+key and the script that injects a solution. ScraperEngine and AsyncScraperEngine
+only perform the resulting steps, with and without ``await``.
+"""
+
+import math
+import random
+import re
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+
+from scraper_classify import CAPTCHA_ALIBABA, CAPTCHA_HCAPTCHA, CAPTCHA_RECAPTCHA
+
+
+# Browser navigation: timeout per attempt (ms) and a more patient wait strategy on each retry
+NAVIGATION_TIMEOUT_MS = 45000
+NAVIGATION_WAIT_STRATEGIES = ("domcontentloaded", "load", "networkidle")
+
+# Realistic headers for pages rendered in dynamic mode
+DYNAMIC_HEADERS = {
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8,application/signed-exchange;v=b3;q=0.7",
+    "Accept-Language": "en-US,en;q=0.9",
+    "Accept-Encoding": "gzip, deflate, br",
+    "Connection": "keep-alive",
+    "Upgrade-Insecure-Requests": "1",
+    "Sec-Fetch-Dest": "document",
+    "Sec-Fetch-Mode": "navigate",
+    "Sec-Fetch-Site": "none",
+    "Sec-Fetch-User": "?1",
+    "Cache-Control": "max-age=0",
+    "DNT": "1"
+}
+
+# Extra init script for e-commerce sites with strict anti-bot protection; document.readyState is left
+# alone, READY_CHECK_SCRIPT relies on it to wait for the page to be parsed
+ECOMMERCE_STEALTH_SCRIPT = """
+// E-commerce specific stealth
+window.localStorage.clear();
+window.sessionStorage.clear();
+
+// Mock realistic browsing history
+Object.defineProperty(history, 'length', {get: () => 5});
+
+// Mock realistic referrer
+Object.defineProperty(document, 'referrer', {get: () => 'https://www.google.com/'});
+
+// Mock realistic performance timing
+if (window.performance && window.performance.timing) {
+    const now = Date.now();
+    window.performance.timing = {
+        navigationStart: now - 1000,
+        loadEventEnd: now - 100,
+        domContentLoadedEventEnd: now - 200
+    };
+}
+"""
+
+# Sites that also get ECOMMERCE_STEALTH_SCRIPT
+ECOMMERCE_DOMAINS = (
+    "alibaba.com", "aliexpress.com", "amazon.com", "ebay.com", "walmart.com",
+    "target.com", "bestbuy.com", "homedepot.com", "lowes.com", "costco.com",
+    "wayfair.com", "overstock.com", "zappos.com", "nordstrom.com", "macys.com"
+)
+
+# Alibaba NoCaptcha slider handle, and what the page shows once it is solved
+SLIDER_SELECTOR = '#nc_1_n1z'
+SLIDER_TIMEOUT_MS = 10000
+SLIDER_SUCCESS_SELECTORS = (
+    'nc_1_n1t[style*="width: 100%"]',  # Slider filled
+    '.nc_ok',  # Success class
+    '[class*="success"]',  # Success indicator
+)
+
+# Captchas 2Captcha solves from the page's site key, with the field the token goes into
+TOKEN_CAPTCHAS = {
+    CAPTCHA_RECAPTCHA: ("reCAPTCHA v2", "g-recaptcha-response"),
+    CAPTCHA_HCAPTCHA: ("hCaptcha", "h-captcha-response"),
+}
+# Seconds to let the page take a captcha answer before reloading it, and to settle after the reload
+CAPTCHA_SUBMIT_WAIT = 2
+CAPTCHA_RELOAD_WAIT = 3
+CAPTCHA_IMAGE_SELECTOR = 'img[src*="captcha"], img[alt*="captcha"], img[id*="captcha"]'
+CAPTCHA_INPUT_SELECTOR = 'input[name*="captcha"], input[id*="captcha"]'
+
+SITE_KEY_PATTERN = re.compile(r'data-sitekey="([^"]+)"')
+
+
+@dataclass(frozen=True)
+class MouseStep:
+    """One mouse action of the slider drag, followed by a pause (seconds)"""
+    action: str  # "move", "down" or "up"
+    pause: float
+    x: float = 0.0
+    y: float = 0.0
+
+
+def navigation_wait(attempt) -> str:
+    """Load state to wait for on the given navigation attempt"""
+    return NAVIGATION_WAIT_STRATEGIES[min(attempt, len(NAVIGATION_WAIT_STRATEGIES) - 1)]
+
+
+def slider_steps(box) -> Tuple[List[MouseStep], List[MouseStep]]:
+    """Human-like (approach, drag) movements across a slider's bounding box
+
+    The approach moves onto the handle and presses it; the drag pulls it to
+    the end along a slightly wavy path and releases it.
+    """
+    # Movement distance: slider width less the handle (about 40px) and a margin
+    move_distance = box['width'] - 40 - 10
+    start_x = box['x'] + 20
+    start_y = box['y'] + box['height'] / 2
+
+    approach = [MouseStep("move", random.uniform(0.1, 0.3), start_x + i * 10, start_y) for i in range(5)]
+    approach.append(MouseStep("move", random.uniform(0.2, 0.5), start_x, start_y))
+    approach.append(MouseStep("down", random.uniform(0.1, 0.3)))
+
+    drag = []
+    steps = random.randint(15, 25)
+    for i in range(steps):
+        progress = i / steps
+        # Add slight curve to movement (human behavior)
+        curve_offset = math.sin(progress * math.pi) * random.uniform(-2, 2)
+        drag.append(MouseStep(
+            "move", random.uniform(0.05, 0.15),
+            start_x + move_distance * progress + curve_offset,
+            start_y + random.uniform(-1, 1),
+        ))
+    drag.append(MouseStep("move", random.uniform(0.2, 0.5), start_x + move_distance, start_y))
+    drag.append(MouseStep("up", random.uniform(0.5, 1.0)))
+    return approach, drag
+
+
+def scroll_steps(page_height) -> List[Tuple[int, float]]:
+    """(scroll position, pause) pairs scrolling down like a reader, then back to the top"""
+    steps = []
+    scroll_position = 0
+    scroll_increment = random.randint(200, 400)
+    while scroll_position < page_height:
+        scroll_position += scroll_increment
+        position = min(scroll_position, page_height)
+        steps.append((position, random.uniform(0.5, 2.0)))
+        # Sometimes scroll back up a bit (human behavior)
+        if random.random() < 0.3:
+            steps.append((max(0, position - random.randint(50, 150)), random.uniform(0.3, 1.0)))
+    steps.append((0, random.uniform(1, 3)))
+    return steps
+
+
+def mouse_wander_points(count=2) -> List[Tuple[int, int]]:
+    """Random points for idle mouse movements"""
+    return [(random.randint(100, 800), random.randint(100, 600)) for _ in range(count)]
+
+
+def find_site_key(html_content) -> Optional[str]:
+    """The captcha widget's data-sitekey, if the page has one"""
+    if 'data-sitekey=' not in html_content:
+        return None
+    match = SITE_KEY_PATTERN.search(html_content)
+    return match.group(1) if match else None
+
+
+def token_injection_script(captcha_type, solution) -> str:
+    """Script putting a 2Captcha token where the page's captcha widget reads it"""
+    _, field_name = TOKEN_CAPTCHAS[captcha_type]
+    script = f"document.querySelector('[name=\"{field_name}\"]').value = '{solution}';"
+    if captcha_type == CAPTCHA_RECAPTCHA:
+        script += f"""
+        if (typeof grecaptcha !== 'undefined') {{
+            grecaptcha.getResponse = function() {{ return '{solution}'; }};
+        }}"""
+    return script
+
+
+def captcha_advice(captcha_type) -> List[str]:
+    """Suggestions logged when a captcha could not be solved automatically"""
+    if captcha_type == CAPTCHA_ALIBABA:
+        advice = [
+            "Alibaba NoCaptcha detected - try again with Dynamic mode",
+            "Enable proxy settings for better success rate",
+            "Wait 5-10 minutes before retrying",
+        ]
+    else:
+        advice = [
+            "Enable 2Captcha auto-solving",
+            "Try using Dynamic scraping mode",
+            "Enable proxy settings",
+            "Wait 5-10 minutes before retrying",
+        ]
+    return advice + ["Try a different URL or website", "Consider using residential proxies"]
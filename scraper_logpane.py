@@ -0,0 +1,165 @@
+"""Batched, rate-limited output for the GUI results pane.
+
+Worker threads never touch Tk. They put text (and the occasional callable,
+such as an inline image) on a thread-safe queue, and the Tk main thread
+drains it at a fixed frame rate. Consecutive text is merged into a single
+insert and the pane scrolls once per frame. The pane keeps a bounded number
+of lines; older lines are moved to a spill file so nothing is lost. Objects
+shown inline (images and their buttons) are attached to the lines written so
+far and released when those lines are trimmed or cleared.
+"""
+
+import os
+import queue
+import tempfile
+import threading
+from collections import deque
+
+
+# Redraws of the results pane per second
+LOG_FPS = 20
+
+# Lines kept in the pane before older ones are spilled to a file
+LOG_MAX_LINES = 5000
+
+# Queued entries handled per frame, so a flood cannot stall the event loop
+LOG_MAX_ITEMS_PER_FRAME = 2000
+
+
+class LogPane:
+    def __init__(self, root, widget, max_lines=LOG_MAX_LINES, fps=LOG_FPS, spill_dir=None):
+        self.root = root
+        self.widget = widget
+        self.max_lines = max_lines
+        self.interval_ms = max(1, int(1000 / fps))
+        self.spill_dir = spill_dir
+        self.spill_path = None
+        self.spilled_lines = 0
+        self._queue = queue.SimpleQueue()
+        self._buffer = []
+        self._draining = False
+        self._owner = threading.get_ident()
+        self._after_id = None
+        # (lines written before it, release callback) for each attachment, oldest first
+        self._attachments = deque()
+
+    def start(self):
+        """Begin draining the queue on the Tk main thread"""
+        if self._after_id is None:
+            self._after_id = self.root.after(self.interval_ms, self._drain)
+
+    def stop(self):
+        """Stop draining; queued text is dropped"""
+        if self._after_id is not None:
+            try:
+                self.root.after_cancel(self._after_id)
+            except Exception:
+                pass
+            self._after_id = None
+
+    def write(self, text):
+        """Queue text for the pane; safe from any thread"""
+        if self._draining and threading.get_ident() == self._owner:
+            # Written by a callable running inside the drain: keep it in order
+            self._buffer.append(text)
+        else:
+            self._queue.put(text)
+
+    def call(self, fn):
+        """Run ``fn()`` on the Tk thread, in order with the queued text"""
+        self._queue.put(fn)
+
+    def attach(self, release):
+        """Run ``release()`` once every line written so far has left the pane; Tk thread only"""
+        self._flush()
+        lines = int(self.widget.index('end-1c').split('.')[0]) - 1
+        self._attachments.append((self.spilled_lines + lines, release))
+
+    def clear(self):
+        """Empty the pane, drop what is still queued and forget the spilled lines"""
+        while True:
+            try:
+                self._queue.get_nowait()
+            except queue.Empty:
+                break
+        self._buffer = []
+        self.widget.delete(1.0, 'end')
+        if self.spill_path is not None:
+            try:
+                os.remove(self.spill_path)
+            except OSError:
+                pass
+        self.spill_path = None
+        self.spilled_lines = 0
+        self._release(None)
+
+    def all_text(self):
+        """Spilled lines followed by what the pane still shows"""
+        text = self.widget.get(1.0, 'end')
+        if self.spill_path is None:
+            return text
+        with open(self.spill_path, 'r', encoding='utf-8') as f:
+            return f.read() + text
+
+    def _flush(self):
+        if self._buffer:
+            self.widget.insert('end', ''.join(self._buffer))
+            self._buffer = []
+
+    def _drain(self):
+        """Insert everything queued since the last frame in as few calls as possible"""
+        self._draining = True
+        wrote = False
+        try:
+            for _ in range(LOG_MAX_ITEMS_PER_FRAME):
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                wrote = True
+                if callable(item):
+                    self._flush()
+                    try:
+                        item()
+                    except Exception as e:
+                        self._buffer.append(f"    [表示エラー: {str(e)}]\n")
+                else:
+                    self._buffer.append(item)
+            self._flush()
+            if wrote:
+                self._trim()
+                self.widget.see('end')
+        finally:
+            self._draining = False
+            self._after_id = self.root.after(self.interval_ms, self._drain)
+
+    def _trim(self):
+        """Move the oldest lines to the spill file once the pane is over its limit"""
+        lines = int(self.widget.index('end-1c').split('.')[0])
+        if lines <= self.max_lines:
+            return
+        # Trim a tenth below the limit so this does not run every frame
+        cut = f"{lines - int(self.max_lines * 0.9) + 1}.0"
+        old_text = self.widget.get(1.0, cut)
+        first_spill = self.spill_path is None
+        try:
+            if first_spill:
+                fd, self.spill_path = tempfile.mkstemp(prefix="scraper_log_", suffix=".txt", dir=self.spill_dir)
+                os.close(fd)
+            with open(self.spill_path, 'a', encoding='utf-8') as f:
+                f.write(old_text)
+        except OSError:
+            # Without a spill file the oldest lines are simply dropped
+            self.spill_path = None
+            first_spill = False
+        self.spilled_lines += old_text.count('\n')
+        self.widget.delete(1.0, cut)
+        self._release(self.spilled_lines)
+        if first_spill:
+            self._queue.put(f"[LOG] 古いログは次のファイルに退避しています: {self.spill_path}\n")
+
+    def _release(self, spilled_lines):
+        """Release the attachments whose lines are all spilled (every attachment for None)"""
+        while self._attachments and (spilled_lines is None or self._attachments[0][0] <= spilled_lines):
+            _, release = self._attachments.popleft()
+            release()
@@ -0,0 +1,277 @@
+"""Per-phase timings and counters for scrape jobs.
+
+A job runs inside ``Metrics.job()``, which makes a JobTrace current for the
+thread or asyncio task doing the work (a context variable, so it follows
+``asyncio.to_thread`` and jobs handed to the browser pool). Code anywhere on
+the job's path times itself with ``span(phase)`` and counts with
+``increment(name)`` without holding a reference to the engine; outside a
+job both are no-ops. Both label the aggregates with the job's mode.
+
+Every observation goes to the job's trace and to process-wide aggregates.
+When a job ends its trace is appended as one JSON line to ``jobs_path``; the
+aggregates are written as Prometheus text (histograms per phase, counters)
+to ``prometheus_path``, atomically, for a node_exporter textfile collector
+or any scraper of static files.
+"""
+
+import contextvars
+import json
+import os
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Dict, Optional, Tuple
+
+import urllib3
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+
+METRICS_PROMETHEUS_PATH = os.path.join(tempfile.gettempdir(), "scraper_metrics.prom")
+METRICS_JOBS_PATH = os.path.join(tempfile.gettempdir(), "scraper_jobs.jsonl")
+
+# Prefix of every exported metric
+METRICS_NAMESPACE = "scraper"
+
+# Upper bounds (seconds) of the phase histograms
+SPAN_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+# Seconds between Prometheus file rewrites while jobs are finishing
+PROMETHEUS_INTERVAL = 10.0
+
+_current_trace = contextvars.ContextVar("scrape_trace", default=None)
+
+
+def _key(name, labels) -> Tuple[str, Tuple[Tuple[str, str], ...]]:
+    return name, tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def escape_label_value(value):
+    """Escape a label value for the Prometheus text format: backslash, double quote and newline"""
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _phase_name(phase, labels):
+    """How a phase shows up in a job summary: extract[css] for a labeled span (the mode is the job's own)"""
+    values = [str(v) for k, v in labels.items() if k != "mode"]
+    return f"{phase}[{','.join(values)}]" if values else phase
+
+
+@dataclass
+class JobTrace:
+    url: str
+    mode: str
+    metrics: "Metrics"
+    started_at: datetime = field(default_factory=lambda: datetime.now(timezone.utc))
+    started: float = field(default_factory=time.perf_counter)
+    seconds: Optional[float] = None
+    error: Optional[str] = None
+    # Seconds per phase, summed over repeats (retries, several selectors)
+    phases: Dict[str, float] = field(default_factory=dict)
+    counters: Dict[str, float] = field(default_factory=dict)
+
+    def add_span(self, name, seconds):
+        self.phases[name] = self.phases.get(name, 0.0) + seconds
+
+    def add_count(self, name, amount):
+        self.counters[name] = self.counters.get(name, 0) + amount
+
+    def summary(self) -> dict:
+        return {
+            "url": self.url,
+            "mode": self.mode,
+            "status": "error" if self.error else "ok",
+            "error": self.error,
+            "started_at": self.started_at.isoformat(),
+            "seconds": round(self.seconds if self.seconds is not None else time.perf_counter() - self.started, 4),
+            "phases": {name: round(seconds, 4) for name, seconds in self.phases.items()},
+            "counters": dict(self.counters),
+        }
+
+    def format(self):
+        """One-line breakdown for the log"""
+        phases = ", ".join(f"{name} {seconds * 1000:.0f}ms" for name, seconds in self.phases.items())
+        return f"{self.summary()['seconds']:.2f}s total" + (f" ({phases})" if phases else "")
+
+
+class Metrics:
+    def __init__(self, prometheus_path: Optional[str] = None, jobs_path: Optional[str] = None,
+                 namespace=METRICS_NAMESPACE, buckets=SPAN_BUCKETS):
+        self.prometheus_path = prometheus_path
+        self.jobs_path = jobs_path
+        self.namespace = namespace
+        self.buckets = buckets
+        self._lock = threading.Lock()
+        # (phase, labels) -> [bucket counts..., count, sum]
+        self._spans: Dict[tuple, list] = {}
+        self._counters: Dict[tuple, float] = {}
+        self._last_written = 0.0
+
+    @contextmanager
+    def job(self, url, mode):
+        """Make a fresh JobTrace current for the duration of one job"""
+        trace = JobTrace(url, mode, self)
+        token = _current_trace.set(trace)
+        try:
+            yield trace
+        except BaseException as e:
+            trace.error = str(e) or type(e).__name__
+            raise
+        finally:
+            _current_trace.reset(token)
+            self._finish(trace)
+
+    def observe(self, phase, seconds, trace: Optional[JobTrace] = None, **labels):
+        """Record one timed phase"""
+        key = _key(phase, labels)
+        with self._lock:
+            series = self._spans.get(key)
+            if series is None:
+                series = self._spans[key] = [0] * (len(self.buckets) + 2)
+            for i, bound in enumerate(self.buckets):
+                if seconds <= bound:
+                    series[i] += 1
+            series[-2] += 1
+            series[-1] += seconds
+        if trace is not None:
+            trace.add_span(_phase_name(phase, labels), seconds)
+
+    def count(self, name, amount=1, trace: Optional[JobTrace] = None, **labels):
+        """Add to a counter"""
+        key = _key(name, labels)
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + amount
+        if trace is not None:
+            trace.add_count(name, amount)
+
+    def _finish(self, trace: JobTrace):
+        trace.seconds = time.perf_counter() - trace.started
+        status = "error" if trace.error else "ok"
+        self.count("jobs", mode=trace.mode, status=status)
+        self.observe("job", trace.seconds, mode=trace.mode)
+        if trace.error:
+            self.count("errors", mode=trace.mode)
+        if self.jobs_path:
+            line = json.dumps(trace.summary(), ensure_ascii=False)
+            with self._lock:
+                with open(self.jobs_path, "a", encoding="utf-8") as f:
+                    f.write(line + "\n")
+        if self.prometheus_path and time.monotonic() - self._last_written >= PROMETHEUS_INTERVAL:
+            self.write_prometheus()
+
+    def counter_value(self, name, **labels) -> float:
+        with self._lock:
+            return self._counters.get(_key(name, labels), 0)
+
+    def span_totals(self, phase, **labels) -> Tuple[int, float]:
+        """(count, seconds) recorded for a phase"""
+        with self._lock:
+            series = self._spans.get(_key(phase, labels))
+            return (series[-2], series[-1]) if series else (0, 0.0)
+
+    def prometheus_text(self) -> str:
+        """All aggregates in the Prometheus text exposition format"""
+        with self._lock:
+            spans = {key: list(series) for key, series in self._spans.items()}
+            counters = dict(self._counters)
+
+        def labels_text(labels, extra=()):
+            pairs = list(labels) + list(extra)
+            if not pairs:
+                return ""
+            return "{" + ",".join(f'{k}="{escape_label_value(v)}"' for k, v in pairs) + "}"
+
+        lines = []
+        by_name = {}
+        for (name, labels), series in sorted(spans.items()):
+            by_name.setdefault(name, []).append((labels, series))
+        for name, entries in by_name.items():
+            metric = f"{self.namespace}_{name}_seconds"
+            lines.append(f"# HELP {metric} Time spent in the {name} phase.")
+            lines.append(f"# TYPE {metric} histogram")
+            for labels, series in entries:
+                for bound, bucket_count in zip(self.buckets, series):
+                    lines.append(f"{metric}_bucket{labels_text(labels, [('le', repr(float(bound)))])} {bucket_count}")
+                lines.append(f"{metric}_bucket{labels_text(labels, [('le', '+Inf')])} {series[-2]}")
+                lines.append(f"{metric}_sum{labels_text(labels)} {series[-1]:.6f}")
+                lines.append(f"{metric}_count{labels_text(labels)} {series[-2]}")
+
+        by_name = {}
+        for (name, labels), value in sorted(counters.items()):
+            by_name.setdefault(name, []).append((labels, value))
+        for name, entries in by_name.items():
+            metric = f"{self.namespace}_{name}_total"
+            lines.append(f"# HELP {metric} Total {name.replace('_', ' ')}.")
+            lines.append(f"# TYPE {metric} counter")
+            for labels, value in entries:
+                lines.append(f"{metric}{labels_text(labels)} {value:g}")
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path=None):
+        """Rewrite the Prometheus file in one step, so readers never see half of it"""
+        path = path or self.prometheus_path
+        if not path:
+            return
+        self._last_written = time.monotonic()
+        text = self.prometheus_text()
+        temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            f.write(text)
+        os.replace(temp_path, path)
+
+
+def current_trace() -> Optional[JobTrace]:
+    return _current_trace.get()
+
+
+def record_span(phase, seconds, **labels):
+    """Record a phase of the current job timed by the caller; a no-op outside a job"""
+    trace = _current_trace.get()
+    if trace is not None:
+        trace.metrics.observe(phase, seconds, trace, mode=trace.mode, **labels)
+
+
+@contextmanager
+def span(phase, **labels):
+    """Time a phase of the current job; a no-op outside a job"""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_span(phase, time.perf_counter() - started, **labels)
+
+
+def increment(name, amount=1, **labels):
+    """Add to a counter of the current job; a no-op outside a job"""
+    trace = _current_trace.get()
+    if trace is not None:
+        trace.metrics.count(name, amount, trace, mode=trace.mode, **labels)
+
+
+class _TimedHTTPConnection(urllib3.connection.HTTPConnection):
+    def connect(self):
+        with span("static_connect"):
+            super().connect()
+
+
+class _TimedHTTPSConnection(urllib3.connection.HTTPSConnection):
+    def connect(self):
+        # Includes the TLS handshake
+        with span("static_connect"):
+            super().connect()
+
+
+class TimedHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = _TimedHTTPConnection
+
+
+class TimedHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = _TimedHTTPSConnection
+
+
+def time_connections(adapter):
+    """Make a requests HTTPAdapter report new connections as static_connect spans"""
+    adapter.poolmanager.pool_classes_by_scheme = {'http': TimedHTTPConnectionPool, 'https': TimedHTTPSConnectionPool}
+    return adapter
@@ -0,0 +1,146 @@
+"""Process pool for parsing and extraction in large static batches.
+
+Parsing a page and walking its matches run on one core under the GIL, so
+past a few fetch threads a batch is bound by extraction rather than by the
+network. An ExtractionPool moves that work to worker processes: fetch
+threads hand over the raw HTML and the selectors, and get back only the
+matched strings per selector type, ready for logging, sinks and images.
+
+Pages are sent in chunks to amortize the inter-process round trip. A chunk
+leaves as soon as a worker is idle, taking whatever pages queued up in the
+meantime (at most ``chunk_size``), so chunks stay small while workers keep up
+and grow under load.
+"""
+
+import multiprocessing
+import os
+import queue
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Dict, List
+
+from scraper_extract import LINKS, RESULT_LIMIT, Item, compile_plan, extract_items, link_items, parse_document
+
+
+# Pages per chunk sent to a worker process
+EXTRACT_CHUNK_SIZE = 16
+
+# (kind, value, match) items per selector type, as produced by extract_items
+ExtractedItems = Dict[str, List[Item]]
+
+
+def extract_page(html_content, base_url, selectors, limit=RESULT_LIMIT, offset=0, link_selectors=None) -> ExtractedItems:
+    """Parse one page and collect the items of every requested selector, and its links under LINKS"""
+    doc = parse_document(html_content)
+    items = extract_items(doc, compile_plan(selectors), base_url, limit, offset)
+    if link_selectors is not None:
+        items[LINKS] = link_items(doc, compile_plan(link_selectors), base_url)
+    return items
+
+
+def extract_chunk(tasks):
+    """Worker entry point: (error, items) for each (html, url, selectors, limit, offset, link_selectors) task"""
+    results = []
+    for task in tasks:
+        try:
+            results.append((None, extract_page(*task)))
+        except Exception as e:
+            results.append((str(e), None))
+    return results
+
+
+class ExtractionPool:
+    def __init__(self, workers=None, chunk_size=EXTRACT_CHUNK_SIZE):
+        self.workers = workers or os.cpu_count() or 1
+        self.chunk_size = chunk_size
+        self._queue = queue.Queue()
+        # One permit per worker process: a chunk is only sent when a worker can take it
+        self._idle = threading.Semaphore(self.workers)
+        self._executor = None
+        self._dispatcher = None
+        self._lock = threading.Lock()
+        self._closed = False
+        self.pages = 0
+        self.chunks = 0
+
+    def extract(self, html_content, base_url, selectors, limit=RESULT_LIMIT, offset=0,
+                link_selectors=None) -> ExtractedItems:
+        """Extract one page in a worker process, blocking until its items are back"""
+        return self.submit(html_content, base_url, selectors, limit, offset, link_selectors).result()
+
+    def submit(self, html_content, base_url, selectors, limit=RESULT_LIMIT, offset=0,
+               link_selectors=None) -> Future:
+        """Queue one page for extraction; the future resolves to its ExtractedItems"""
+        future = Future()
+        with self._lock:
+            if self._closed:
+                raise Exception("Extraction pool is closed")
+            if self._executor is None:
+                # Spawned, not forked: the parent runs threads (Tk, fetchers) that a fork would copy mid-flight
+                self._executor = ProcessPoolExecutor(self.workers, mp_context=multiprocessing.get_context('spawn'))
+                self._dispatcher = threading.Thread(target=self._dispatch, name="extraction-dispatch", daemon=True)
+                self._dispatcher.start()
+            self._queue.put(((html_content, base_url, selectors, limit, offset, link_selectors), future))
+        return future
+
+    def _dispatch(self):
+        """Send queued pages in chunks whenever a worker is idle"""
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            self._idle.acquire()
+            chunk = [item]
+            while len(chunk) < self.chunk_size:
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is None:
+                    self._queue.put(None)
+                    break
+                chunk.append(item)
+            self.pages += len(chunk)
+            self.chunks += 1
+            try:
+                done = self._executor.submit(extract_chunk, [task for task, _ in chunk])
+            except Exception as e:
+                self._idle.release()
+                self._fail(chunk, e)
+                continue
+            done.add_done_callback(lambda done, chunk=chunk: self._deliver(done, chunk))
+
+    def _deliver(self, done, chunk):
+        self._idle.release()
+        try:
+            results = done.result()
+        except Exception as e:
+            # A crashed worker fails the chunk's pages; the others are unaffected
+            self._fail(chunk, e)
+            return
+        for (_, future), (error, items) in zip(chunk, results):
+            if error is not None:
+                future.set_exception(Exception(error))
+            else:
+                future.set_result(items)
+
+    def _fail(self, chunk, error):
+        for _, future in chunk:
+            future.set_exception(Exception(f"Extraction worker failed: {error}"))
+
+    def format_stats(self):
+        average = self.pages / self.chunks if self.chunks else 0
+        return f"{self.pages} pages in {self.chunks} chunks (avg {average:.1f}) on {self.workers} processes"
+
+    def close(self):
+        """Finish the queued pages and stop the worker processes"""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            executor, dispatcher = self._executor, self._dispatcher
+        if dispatcher is not None:
+            self._queue.put(None)
+            dispatcher.join()
+        if executor is not None:
+            executor.shutdown(wait=True)
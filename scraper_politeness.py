@@ -0,0 +1,304 @@
+"""Per-host politeness: request rate, concurrency and robots.txt.
+
+Every request goes through a HostScheduler. Each host gets a token bucket
+(its request rate, with a small burst) and a cap on requests in flight, so
+different hosts proceed in parallel while each one stays within its limit.
+A host's robots.txt is fetched once (through the job's proxy, when it has
+one), cached for a day, and can only slow it down: a ``Crawl-delay`` or
+``Request-rate`` stricter than the configured rate replaces it. Disallow rules are exposed through ``allowed`` for the crawler;
+URLs the user asks for explicitly are not filtered.
+
+Waiting for a token is a reservation: the bucket hands out the time a
+request may start and the caller sleeps outside the lock, so a slow host
+never holds up the others.
+
+``configure`` changes the limits of every host in place, so requests still
+in flight when a new job starts release the slots they hold as usual.
+"""
+
+import asyncio
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Callable, Dict, Optional
+from urllib.parse import urlsplit
+from urllib.robotparser import RobotFileParser
+
+import requests
+
+
+# Default per-host pace: requests per second, back-to-back requests allowed, requests in flight
+DEFAULT_HOST_RATE = 1.0
+DEFAULT_HOST_BURST = 2
+DEFAULT_HOST_CONCURRENCY = 2
+
+# robots.txt is refetched after a day (RFC 9309 caching guidance)
+ROBOTS_TTL = 24 * 3600
+ROBOTS_TIMEOUT = 10
+
+# Product token matched against robots.txt groups
+ROBOTS_USER_AGENT = "*"
+
+
+def host_key(url) -> str:
+    """Scheme, host and port of a URL: the unit that limits apply to"""
+    parts = urlsplit(url)
+    return f"{parts.scheme.lower()}://{(parts.netloc or '').lower()}"
+
+
+class TokenBucket:
+    """Token bucket handing out start times instead of blocking"""
+
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+        """Take a token; seconds to wait before the request may start"""
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= 1
+            # A negative balance is a queue of reservations ahead of this one
+            return 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+
+    def configure(self, rate, burst):
+        """Change the rate and burst; reservations already handed out stand"""
+        with self._lock:
+            self.rate = rate
+            self.burst = burst
+            self.tokens = min(self.tokens, float(burst))
+
+
+class HostSlots:
+    """Requests in flight for one host, shared by threads and event loops, under a limit that can change"""
+
+    def __init__(self, limit):
+        self.limit = limit
+        self.in_use = 0
+        self._cond = threading.Condition()
+        # (loop, future) of coroutines waiting for a slot
+        self._async_waiters = deque()
+
+    def acquire(self):
+        with self._cond:
+            while self.in_use >= self.limit:
+                self._cond.wait()
+            self.in_use += 1
+
+    async def acquire_async(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            with self._cond:
+                if self.in_use < self.limit:
+                    self.in_use += 1
+                    return
+                future = loop.create_future()
+                self._async_waiters.append((loop, future))
+            await future
+
+    def release(self):
+        with self._cond:
+            self.in_use = max(0, self.in_use - 1)
+            self._wake()
+
+    def resize(self, limit):
+        with self._cond:
+            self.limit = limit
+            self._wake()
+
+    def _wake(self):
+        # Every waiter checks again; a host has a handful of them at most
+        self._cond.notify_all()
+        waiters, self._async_waiters = self._async_waiters, deque()
+        for loop, future in waiters:
+            # A waiter whose loop has shut down was cancelled with it
+            if not loop.is_closed():
+                loop.call_soon_threadsafe(_resolve, future)
+
+
+def _resolve(future):
+    if not future.done():
+        future.set_result(None)
+
+
+def fetch_robots(robots_url, proxy=None):
+    """Fetch a robots.txt directly or through a proxy"""
+    proxies = {'http': proxy, 'https': proxy} if proxy else None
+    return requests.get(robots_url, timeout=ROBOTS_TIMEOUT, proxies=proxies)
+
+
+class RobotsCache:
+    """robots.txt parsers per host, fetched on first use and kept for ``ttl`` seconds"""
+
+    def __init__(self, fetch: Optional[Callable] = None, ttl=ROBOTS_TTL, user_agent=ROBOTS_USER_AGENT):
+        # Called as fetch(robots_url, proxy); proxy is None for a direct connection
+        self.fetch = fetch or fetch_robots
+        self.ttl = ttl
+        self.user_agent = user_agent
+        self._parsers: Dict[str, tuple] = {}
+        self._locks: Dict[str, threading.Lock] = {}
+        self._lock = threading.Lock()
+
+    def get(self, url, proxy=None) -> RobotFileParser:
+        """Parser for the URL's host; concurrent first requests fetch it once"""
+        host = host_key(url)
+        with self._lock:
+            host_lock = self._locks.setdefault(host, threading.Lock())
+        with host_lock:
+            cached = self._parsers.get(host)
+            if cached is not None and time.monotonic() - cached[1] < self.ttl:
+                return cached[0]
+            parser = self._load(host + "/robots.txt", proxy)
+            self._parsers[host] = (parser, time.monotonic())
+            return parser
+
+    def _load(self, robots_url, proxy=None) -> RobotFileParser:
+        # Same outcomes as RobotFileParser.read(): 401/403 forbid everything,
+        # other errors and unreachable hosts allow everything
+        parser = RobotFileParser(robots_url)
+        try:
+            res = self.fetch(robots_url, proxy)
+        except Exception:
+            parser.allow_all = True
+            return parser
+        if res.status_code in (401, 403):
+            parser.disallow_all = True
+        elif res.status_code >= 400:
+            parser.allow_all = True
+        else:
+            parser.parse(res.text.splitlines())
+        parser.modified()
+        return parser
+
+    def allowed(self, url, proxy=None) -> bool:
+        return self.get(url, proxy).can_fetch(self.user_agent, url)
+
+    def min_interval(self, url, proxy=None) -> Optional[float]:
+        """Seconds between requests asked for by Crawl-delay or Request-rate, if any"""
+        parser = self.get(url, proxy)
+        intervals = []
+        delay = parser.crawl_delay(self.user_agent)
+        if delay:
+            intervals.append(float(delay))
+        rate = parser.request_rate(self.user_agent)
+        if rate and rate.requests:
+            intervals.append(rate.seconds / rate.requests)
+        return max(intervals) if intervals else None
+
+
+@dataclass
+class HostState:
+    """Limits of one host"""
+    bucket: TokenBucket
+    slots: HostSlots
+    min_interval: Optional[float] = None
+    requests: int = 0
+    waited: float = 0.0
+
+
+class HostScheduler:
+    def __init__(self, rate=DEFAULT_HOST_RATE, burst=DEFAULT_HOST_BURST, concurrency=DEFAULT_HOST_CONCURRENCY,
+                 robots: Optional[RobotsCache] = None, use_robots=True):
+        self.rate = rate
+        self.burst = burst
+        self.concurrency = concurrency
+        self.robots = robots if robots is not None else (RobotsCache() if use_robots else None)
+        self._hosts: Dict[str, HostState] = {}
+        self._lock = threading.Lock()
+
+    def configure(self, rate=None, concurrency=None, burst=None):
+        """Change the per-host limits of known and future hosts
+
+        Known hosts are updated in place: requests in flight keep and later
+        release the slots they hold, and robots.txt is not fetched again.
+        """
+        with self._lock:
+            self.rate = rate if rate is not None else self.rate
+            self.concurrency = concurrency if concurrency is not None else self.concurrency
+            self.burst = burst if burst is not None else self.burst
+            states = list(self._hosts.values())
+        for state in states:
+            state.bucket.configure(*self._pace_limits(state.min_interval))
+            state.slots.resize(self.concurrency)
+
+    def _pace_limits(self, min_interval):
+        """(rate, burst) of a host; robots.txt can only slow it down"""
+        if min_interval:
+            return min(self.rate, 1.0 / min_interval), 1
+        return self.rate, self.burst
+
+    def host(self, url, proxy=None) -> HostState:
+        """State of the URL's host, created (and its robots.txt read through ``proxy``) on first use"""
+        key = host_key(url)
+        with self._lock:
+            state = self._hosts.get(key)
+        if state is not None:
+            return state
+        # robots.txt is read outside the scheduler lock so other hosts are not held up
+        min_interval = self.robots.min_interval(url, proxy) if self.robots is not None else None
+        with self._lock:
+            return self._hosts.setdefault(key, HostState(
+                bucket=TokenBucket(*self._pace_limits(min_interval)),
+                slots=HostSlots(self.concurrency),
+                min_interval=min_interval,
+            ))
+
+    def allowed(self, url, proxy=None) -> bool:
+        """Whether robots.txt lets the crawler fetch the URL"""
+        return self.robots is None or self.robots.allowed(url, proxy)
+
+    def pace(self, url, stop_event: Optional[threading.Event] = None) -> float:
+        """Wait for the host's next token; returns the seconds waited"""
+        state = self.host(url)
+        delay = state.bucket.reserve()
+        state.requests += 1
+        state.waited += delay
+        if delay > 0:
+            if stop_event is not None:
+                stop_event.wait(delay)
+            else:
+                time.sleep(delay)
+        return delay
+
+    def acquire(self, url, stop_event: Optional[threading.Event] = None, proxy=None) -> float:
+        """Take one of the host's request slots and its next token; pair with release"""
+        self.host(url, proxy).slots.acquire()
+        return self.pace(url, stop_event)
+
+    def release(self, url):
+        self.host(url).slots.release()
+
+    async def acquire_async(self, url, proxy=None) -> float:
+        """Async twin of acquire, waiting on the event loop instead of a thread"""
+        state = self._hosts.get(host_key(url)) or await asyncio.to_thread(self.host, url, proxy)
+        await state.slots.acquire_async()
+        return await self.pace_async(url)
+
+    async def pace_async(self, url) -> float:
+        """Async twin of pace"""
+        state = self._hosts.get(host_key(url)) or await asyncio.to_thread(self.host, url)
+        delay = state.bucket.reserve()
+        state.requests += 1
+        state.waited += delay
+        if delay > 0:
+            await asyncio.sleep(delay)
+        return delay
+
+    def release_async(self, url):
+        self.host(url).slots.release()
+
+    def format_stats(self):
+        """One-line summary per host"""
+        with self._lock:
+            hosts = list(self._hosts.items())
+        return ", ".join(
+            f"{key} {state.requests} req / {state.waited:.1f}s waited"
+            + (f" (robots {state.min_interval:g}s)" if state.min_interval else "")
+            for key, state in hosts
+        ) or "no requests"
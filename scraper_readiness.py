@@ -0,0 +1,125 @@
+"""Event-driven content readiness for dynamic mode.
+
+Instead of fixed load-state waits and sleeps, a page is considered ready as
+soon as every requested selector matches and the DOM has not changed for a
+quiet window. A MutationObserver inside the page tracks the last structural
+change; Playwright polls the check and gives up at a deadline, in which case
+the page is scraped as it is.
+"""
+
+import time
+
+
+# Viewport-height steps for the lazy-load scroll, and how long to let it settle
+LAZY_SCROLL_STEPS = 50
+LAZY_SETTLE_TIMEOUT = 5.0
+
+# Polled by page.wait_for_function; installs its MutationObserver on first call
+READY_CHECK_SCRIPT = """
+(spec) => {
+    let state = window.__scraperReadiness;
+    if (!state) {
+        state = window.__scraperReadiness = {last: performance.now()};
+        const root = document.documentElement;
+        if (root) {
+            new MutationObserver(() => { state.last = performance.now(); })
+                .observe(root, {childList: true, subtree: true, characterData: true});
+        }
+    }
+    if (document.readyState === 'loading' || !document.body) {
+        return false;
+    }
+    const present = ([kind, value]) => {
+        try {
+            switch (kind) {
+                case 'tag': return document.getElementsByTagName(value).length > 0;
+                case 'class': return document.getElementsByClassName(value).length > 0;
+                case 'id': return document.getElementById(value) !== null;
+                case 'css': return document.querySelector(value) !== null;
+                case 'xpath': {
+                    const result = document.evaluate(value, document, null, XPathResult.ANY_TYPE, null);
+                    switch (result.resultType) {
+                        case XPathResult.UNORDERED_NODE_ITERATOR_TYPE:
+                        case XPathResult.ORDERED_NODE_ITERATOR_TYPE:
+                            return result.iterateNext() !== null;
+                        case XPathResult.STRING_TYPE: return result.stringValue !== '';
+                        case XPathResult.BOOLEAN_TYPE: return result.booleanValue;
+                        default: return true;
+                    }
+                }
+            }
+        } catch (e) {
+            // An expression the browser cannot evaluate must not block the page
+            return true;
+        }
+        return true;
+    };
+    if (!spec.selectors.every(present)) {
+        return false;
+    }
+    return performance.now() - state.last >= spec.quietMs;
+}
+"""
+
+# Scrolls to the bottom over a few animation frames to trigger lazy loading, then back to the top
+LAZY_SCROLL_SCRIPT = """
+async (maxSteps) => {
+    const frame = () => new Promise(resolve => requestAnimationFrame(() => resolve()));
+    for (let step = 0; step < maxSteps; step++) {
+        const bottom = document.body.scrollHeight;
+        if (window.scrollY + window.innerHeight >= bottom) {
+            break;
+        }
+        window.scrollBy(0, window.innerHeight);
+        await frame();
+    }
+    window.scrollTo(0, 0);
+}
+"""
+
+
+def readiness_spec(selectors, quiet_ms):
+    """Argument for READY_CHECK_SCRIPT built from a SelectorSpec"""
+    wanted = [
+        ('tag', selectors.tag),
+        ('class', selectors.class_name),
+        ('id', selectors.id_name),
+        ('css', selectors.css_selector),
+        ('xpath', selectors.xpath_selector),
+    ]
+    return {
+        'selectors': [[kind, value] for kind, value in wanted if value],
+        'quietMs': quiet_ms,
+    }
+
+
+def wait_until_ready(page, selectors, quiet_ms=500, timeout=30.0):
+    """Block until the selectors match and the DOM is quiet; return (ready, seconds waited)"""
+    started = time.perf_counter()
+    try:
+        page.wait_for_function(
+            READY_CHECK_SCRIPT,
+            arg=readiness_spec(selectors, quiet_ms),
+            polling=100,
+            timeout=timeout * 1000,
+        )
+        ready = True
+    except Exception:
+        ready = False
+    return ready, time.perf_counter() - started
+
+
+async def wait_until_ready_async(page, selectors, quiet_ms=500, timeout=30.0):
+    """Async twin of wait_until_ready"""
+    started = time.perf_counter()
+    try:
+        await page.wait_for_function(
+            READY_CHECK_SCRIPT,
+            arg=readiness_spec(selectors, quiet_ms),
+            polling=100,
+            timeout=timeout * 1000,
+        )
+        ready = True
+    except Exception:
+        ready = False
+    return ready, time.perf_counter() - started
@@ -0,0 +1,197 @@
+"""Retry policy shared by the static and dynamic fetch paths.
+
+Every failed attempt is classified: transient errors (timeouts, dropped
+connections, 408/429/5xx) are retried with exponential backoff and jitter,
+or after the server's ``Retry-After``; everything else (404, bad URLs,
+unresolvable hosts, certificate errors) fails the job at once.
+
+Each host also has a circuit breaker. After a run of consecutive host
+failures the circuit opens and requests to that host fail immediately
+for a cooldown; then a single trial request decides whether it closes again.
+A dead host therefore costs a few attempts, not minutes per URL.
+"""
+
+import random
+import threading
+import time
+from dataclasses import dataclass
+from email.utils import parsedate_to_datetime
+from typing import Dict, Optional
+
+import requests
+
+from scraper_politeness import host_key
+
+
+# Attempts per fetch and the backoff between them (seconds)
+RETRY_ATTEMPTS = 3
+BACKOFF_BASE = 1.0
+BACKOFF_MAX = 30.0
+
+# Longest Retry-After honored; asking for more ends the retries
+RETRY_AFTER_MAX = 120.0
+
+# Statuses worth another try
+RETRYABLE_STATUS = frozenset({408, 425, 429, 500, 502, 503, 504})
+
+# Consecutive host failures that open its circuit, and how long it stays open (seconds)
+BREAKER_THRESHOLD = 5
+BREAKER_COOLDOWN = 60.0
+
+# Browser network errors that no retry will fix
+FATAL_NET_ERRORS = (
+    'net::ERR_NAME_NOT_RESOLVED',
+    'net::ERR_CERT_',
+    'net::ERR_SSL_',
+    'net::ERR_INVALID_URL',
+    'net::ERR_UNKNOWN_URL_SCHEME',
+    'net::ERR_BLOCKED_BY_CLIENT',
+    'net::ERR_ABORTED',
+)
+
+
+class CircuitOpenError(Exception):
+    """The host's circuit is open; the request was not made"""
+
+
+class RetryableStatusError(Exception):
+    """A rendered page answered with a status worth retrying"""
+
+    def __init__(self, status, retry_after=None):
+        super().__init__(f"HTTP {status}")
+        self.status = status
+        self.retry_after = retry_after
+
+
+def parse_retry_after(value) -> Optional[float]:
+    """Seconds to wait from a Retry-After header (delta-seconds or an HTTP date)"""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def check_response(response):
+    """Raise RetryableStatusError for a browser navigation response worth retrying"""
+    if response is not None and response.status in RETRYABLE_STATUS:
+        raise RetryableStatusError(response.status, parse_retry_after(response.headers.get('retry-after')))
+
+
+@dataclass(frozen=True)
+class RetryDecision:
+    retryable: bool
+    # Seconds the server asked for, if any
+    retry_after: Optional[float] = None
+    # Whether the failure says something about the host (counts toward its breaker)
+    host_failure: bool = False
+
+
+def classify_error(error) -> RetryDecision:
+    """Decide whether a failed attempt is worth repeating"""
+    if isinstance(error, CircuitOpenError):
+        return RetryDecision(False)
+    if isinstance(error, RetryableStatusError):
+        return RetryDecision(True, error.retry_after, True)
+    if isinstance(error, requests.HTTPError) and error.response is not None:
+        status = error.response.status_code
+        if status in RETRYABLE_STATUS:
+            return RetryDecision(True, parse_retry_after(error.response.headers.get('Retry-After')), True)
+        # The host answered; the URL is what is wrong
+        return RetryDecision(False)
+    if isinstance(error, requests.exceptions.SSLError):
+        return RetryDecision(False, host_failure=True)
+    if isinstance(error, (requests.ConnectionError, requests.Timeout, requests.exceptions.ChunkedEncodingError)):
+        return RetryDecision(True, host_failure=True)
+    if isinstance(error, requests.RequestException):
+        # Invalid or unsupported URLs
+        return RetryDecision(False)
+
+    # Playwright errors are matched by name and message so this module needs no browser
+    message = str(error)
+    if any(code in message for code in FATAL_NET_ERRORS):
+        return RetryDecision(False, host_failure='ERR_NAME_NOT_RESOLVED' in message or 'ERR_CERT_' in message)
+    if 'net::ERR_' in message or type(error).__name__ == 'TimeoutError' or isinstance(error, (TimeoutError, ConnectionError)):
+        return RetryDecision(True, host_failure=True)
+    return RetryDecision(False)
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    attempts: int = RETRY_ATTEMPTS
+    base_delay: float = BACKOFF_BASE
+    max_delay: float = BACKOFF_MAX
+    retry_after_max: float = RETRY_AFTER_MAX
+
+    def backoff(self, attempt, retry_after=None) -> Optional[float]:
+        """Delay before the next attempt; None if the server asked for too long a wait"""
+        if retry_after is not None:
+            return retry_after if retry_after <= self.retry_after_max else None
+        # Exponential with "equal jitter": at least half the step, so retries never bunch up
+        step = min(self.max_delay, self.base_delay * 2 ** attempt)
+        return step / 2 + random.uniform(0, step / 2)
+
+
+DEFAULT_RETRY_POLICY = RetryPolicy()
+
+
+@dataclass
+class _Circuit:
+    failures: int = 0
+    opened_at: Optional[float] = None
+    trial_started: Optional[float] = None
+
+
+class CircuitBreakers:
+    """One circuit per host: closed, open for ``cooldown`` seconds, then half-open for one trial"""
+
+    def __init__(self, threshold=BREAKER_THRESHOLD, cooldown=BREAKER_COOLDOWN):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self._circuits: Dict[str, _Circuit] = {}
+        self._lock = threading.Lock()
+
+    def check(self, url):
+        """Raise CircuitOpenError unless a request to the URL's host may go ahead"""
+        key = host_key(url)
+        with self._lock:
+            circuit = self._circuits.get(key)
+            if circuit is None or circuit.opened_at is None:
+                return
+            now = time.monotonic()
+            remaining = circuit.opened_at + self.cooldown - now
+            if remaining <= 0 and (circuit.trial_started is None or now - circuit.trial_started > self.cooldown):
+                # Half-open: this request is the trial, the others keep failing fast
+                circuit.trial_started = now
+                return
+            raise CircuitOpenError(
+                f"Circuit open for {key} after {circuit.failures} consecutive failures"
+                + (f", retry in {remaining:.0f}s" if remaining > 0 else ", trial request in progress")
+            )
+
+    def record(self, url, ok) -> bool:
+        """Record an attempt's outcome; True if it just opened the circuit"""
+        key = host_key(url)
+        with self._lock:
+            circuit = self._circuits.setdefault(key, _Circuit())
+            if ok:
+                circuit.failures = 0
+                circuit.opened_at = None
+                circuit.trial_started = None
+                return False
+            circuit.failures += 1
+            trial_failed = circuit.trial_started is not None
+            if trial_failed or (circuit.opened_at is None and circuit.failures >= self.threshold):
+                circuit.opened_at = time.monotonic()
+                circuit.trial_started = None
+                return True
+            return False
+
+    def is_open(self, url) -> bool:
+        with self._lock:
+            circuit = self._circuits.get(host_key(url))
+            return circuit is not None and circuit.opened_at is not None
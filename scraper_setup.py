@@ -0,0 +1,107 @@
+"""Startup check that Playwright's Chromium is installed.
+
+Starting Playwright and launching a browser takes seconds, so the check runs
+off the Tk thread and its outcome is cached on disk, keyed by the Playwright
+version and the browsers folder. Later starts only look for the cached
+Chromium executable; a new Playwright release, another browsers folder or a
+missing executable triggers a full check again. Failures are never cached,
+so an install is picked up on the next start.
+"""
+
+import json
+import os
+import tempfile
+import threading
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+
+PLAYWRIGHT_PROBE_PATH = os.path.join(tempfile.gettempdir(), "scraper_playwright_probe.json")
+
+
+@dataclass(frozen=True)
+class ProbeResult:
+    ok: bool
+    error: Optional[str] = None
+    # Whether the answer came from the cache instead of a browser launch
+    cached: bool = False
+
+
+def playwright_version() -> Optional[str]:
+    """Installed Playwright version, or None without Playwright"""
+    try:
+        # Also present in PyInstaller bundles, which usually lack package metadata
+        from playwright._repo_version import version
+        return version
+    except ImportError:
+        return None
+
+
+def probe_key(version) -> str:
+    return f"{version}|{os.environ.get('PLAYWRIGHT_BROWSERS_PATH', '')}"
+
+
+def launch_chromium() -> str:
+    """Launch and close a headless Chromium; return its executable path"""
+    from playwright.sync_api import sync_playwright
+    with sync_playwright() as p:
+        executable = p.chromium.executable_path
+        if not os.path.isfile(executable):
+            raise Exception(f"Chromium not found at {executable}")
+        p.chromium.launch(headless=True).close()
+        return executable
+
+
+class PlaywrightProbe:
+    def __init__(self, path=PLAYWRIGHT_PROBE_PATH, check: Optional[Callable[[], str]] = None,
+                 version: Optional[Callable[[], Optional[str]]] = None):
+        self.path = path
+        self.check = check or launch_chromium
+        self.version = version or playwright_version
+        self._lock = threading.Lock()
+
+    def run(self) -> ProbeResult:
+        """Answer from the cache when it still holds, otherwise launch a browser"""
+        with self._lock:
+            version = self.version()
+            if version is None:
+                return ProbeResult(False, "Playwright is not installed")
+            key = probe_key(version)
+            cached = self._load()
+            if cached.get('key') == key and os.path.isfile(cached.get('executable', '')):
+                return ProbeResult(True, cached=True)
+            try:
+                executable = self.check()
+            except Exception as e:
+                self._forget()
+                return ProbeResult(False, str(e))
+            self._save({'key': key, 'executable': executable})
+            return ProbeResult(True)
+
+    def start(self, on_done: Callable[[ProbeResult], None]) -> threading.Thread:
+        """Run the probe on a daemon thread and hand the result to ``on_done`` there"""
+        thread = threading.Thread(target=lambda: on_done(self.run()), name="playwright-probe", daemon=True)
+        thread.start()
+        return thread
+
+    def _load(self):
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _save(self, entry):
+        try:
+            temp_path = f"{self.path}.tmp"
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump(entry, f)
+            os.replace(temp_path, self.path)
+        except OSError:
+            pass
+
+    def _forget(self):
+        try:
+            os.remove(self.path)
+        except OSError:
+            pass
@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+
+import sys
+import os
+import json
+import tempfile
+import time
+
+# Add current directory and the benchmark scripts to path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "bench"))
+
+import requests
+
+from bench_scrape import PHASES, main as run_benchmark
+from server import CorpusServer
+
+
+def test_corpus_server_delays_and_pads_pages():
+    """Pages cycle through the corpus, are padded to size and answered after the latency"""
+    with CorpusServer(latency_ms=100, page_kb=64) as server:
+        first = requests.get(server.urls(1)[0], timeout=10)
+        started = time.monotonic()
+        again = requests.get(f"{server.base_url}/page/{len(server.corpus)}", timeout=10)
+        elapsed = time.monotonic() - started
+        missing = requests.get(f"{server.base_url}/robots.txt", timeout=10)
+
+    assert first.status_code == 200 and again.content == first.content
+    assert len(first.content) >= 64 * 1024 and first.text.rstrip().endswith("</html>")
+    assert elapsed >= 0.1
+    assert missing.status_code == 404
+    assert server.requests == 2
+
+
+def test_benchmark_reports_every_phase_as_json():
+    """A small run fetches every page and reports speed and peak memory per phase"""
+    output = os.path.join(tempfile.mkdtemp(), "bench.json")
+    run_benchmark(["--pages", "12", "--workers", "4", "--rounds", "1", "--output", output])
+    with open(output, "r", encoding="utf-8") as f:
+        report = json.load(f)
+
+    assert set(report["phases"]) == set(PHASES)
+    fetch = report["phases"]["fetch"]
+    assert fetch["errors"] == 0 and fetch["pages_per_sec"] > 0
+    assert report["server"]["requests"] == 12
+    assert report["phases"]["parse"]["parse_ms_per_page"]["mean"] > 0
+    assert set(report["phases"]["extract"]["extraction_ms_per_selector"]) == {"tag", "class", "id", "css", "xpath"}
+    assert report["phases"]["classify"]["blocked"] == 0
+    assert all(phase["peak_rss_mb"] for phase in report["phases"].values())
+
+
+if __name__ == "__main__":
+    test_corpus_server_delays_and_pads_pages()
+    test_benchmark_reports_every_phase_as_json()
+    print("✅ Benchmark tests passed")
@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+
+import sys
+import os
+
+# Add current directory to path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from scraper_blocking import DEFAULT_BLOCK_POLICY, BlockPolicy, BlockStats, policy_for_url
+from scraper_engine import ScrapeJob
+
+
+def test_default_policy_blocks_heavy_resources_and_trackers():
+    """Images, fonts and analytics are aborted; the page, scripts and captchas load"""
+    policy = DEFAULT_BLOCK_POLICY
+    assert policy.should_block('image', "https://cdn.example.com/p/1.jpg")
+    assert policy.should_block('font', "https://cdn.example.com/f.woff2")
+    assert policy.should_block('script', "https://www.googletagmanager.com/gtm.js")
+    assert not policy.should_block('script', "https://example.com/app.js")
+    assert not policy.should_block('document', "https://example.com/beacon")
+    assert not policy.should_block('image', "https://example.com/captcha/image.png")
+
+
+def test_domain_presets_and_job_policy():
+    """Alibaba sites keep stylesheets and a job can opt out of blocking"""
+    preset = policy_for_url("https://www.alibaba.com/trade/search?q=pump")
+    assert not preset.should_block('stylesheet', "https://g.alicdn.com/site.css")
+    assert preset.should_block('image', "https://s.alicdn.com/p.jpg")
+    assert policy_for_url("https://shop.example.com/") is DEFAULT_BLOCK_POLICY
+
+    custom = BlockPolicy(resource_types=frozenset({'media'}), url_patterns=())
+    assert ScrapeJob(url="https://example.com/", block_policy=custom).resource_policy() is custom
+    assert ScrapeJob(url="https://example.com/", block_resources=False).resource_policy() is None
+
+    stats = BlockStats(blocked={'image': 3, 'font': 1})
+    assert stats.blocked_total == 4
+    assert "blocked 4 requests (font 1, image 3)" in stats.format()
+
+
+if __name__ == "__main__":
+    test_default_policy_blocks_heavy_resources_and_trackers()
+    test_domain_presets_and_job_policy()
+    print("✅ Blocking tests passed")
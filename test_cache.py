@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+
+import sys
+import os
+import tempfile
+
+# Add current directory to path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from scraper_cache import ResponseCache, cache_key, freshness_lifetime, normalize_url
+from scraper_engine import ScraperEngine, ScrapeJob, SelectorSpec
+from testing_server import LocalServer, Reply
+
+PAGE = "<html><body><h1>Cached listing</h1></body></html>".encode('utf-8')
+
+
+def _respond(request):
+    """Answers with an ETag, revalidating it with a 304; /fresh pages may be cached for a minute"""
+    if request.path == "/robots.txt":
+        return Reply(status=404)
+    cache_control = "max-age=60" if request.path.startswith("/fresh") else "no-cache"
+    headers = {"ETag": '"v1"', "Cache-Control": cache_control}
+    if request.headers.get("If-None-Match") == '"v1"':
+        return Reply(status=304, headers=headers)
+    return Reply(PAGE, headers=headers)
+
+
+def test_keys_and_freshness():
+    """Equivalent URLs share a key and Cache-Control decides the lifetime"""
+    assert normalize_url("HTTP://Example.com:80/a?b=2&a=1#top") == "http://example.com/a?a=1&b=2"
+    assert cache_key("http://example.com/?a=1&b=2") == cache_key("http://EXAMPLE.com/?b=2&a=1")
+    assert cache_key("http://example.com/", {"Accept-Language": "ja"}) != cache_key("http://example.com/")
+    assert freshness_lifetime({"Cache-Control": "public, max-age=120"}) == 120
+    assert freshness_lifetime({"Cache-Control": "no-cache"}) == 0
+    assert freshness_lifetime({}, default_ttl=30) == 30
+
+
+def test_static_fetch_hits_and_revalidates():
+    """A fresh entry skips the request and a stale one is revalidated with a 304"""
+    server = LocalServer(_respond).start()
+    base = server.base_url
+    cache = ResponseCache(os.path.join(tempfile.mkdtemp(), "cache.sqlite"))
+    engine = ScraperEngine(cache=cache)
+    job = ScrapeJob(url=f"{base}/fresh", selectors=SelectorSpec(tag="h1"))
+    try:
+        for url in (f"{base}/fresh", f"{base}/fresh", f"{base}/stale", f"{base}/stale"):
+            result = engine.run(job.with_url(url))
+            assert result.results['tag'] == ["Cached listing"]
+    finally:
+        engine.close()
+        cache.close()
+        server.stop()
+
+    # The second /fresh comes from the cache; the second /stale is answered with a 304, counted as revalidated
+    assert [path for path in server.paths if path != "/robots.txt"] == ["/fresh", "/stale", "/stale"]
+    stats = cache.stats()
+    assert (stats['hits'], stats['revalidated'], stats['misses']) == (1, 1, 2)
+    assert stats['bytes_saved'] == 2 * len(PAGE)
+
+
+if __name__ == "__main__":
+    test_keys_and_freshness()
+    test_static_fetch_hits_and_revalidates()
+    print("✅ Cache tests passed")
@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+
+import sys
+import os
+import csv
+import json
+import tempfile
+import threading
+import time
+
+# Add current directory to path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from scraper_checkpoint import STATE_DONE, STATE_FAILED, STATE_PENDING, JobCheckpoint, job_key
+from scraper_crawl import CrawlConfig, Crawler
+from scraper_engine import ScraperEngine, ScrapeJob, SelectorSpec
+from scraper_export import can_resume, drop_unfinished, open_sink
+from scraper_politeness import HostScheduler
+from testing_server import LocalServer, Reply
+
+SITE = {
+    "/": '<h1>Home</h1><a href="/a">A</a><a href="/b">B</a>',
+    "/a": '<h1>A</h1><a href="/c">C</a>',
+    "/b": '<h1>B</h1><a href="/c">C</a>',
+    "/c": '<h1>C</h1>',
+}
+
+
+def _respond(request):
+    if request.path not in SITE and not request.path.startswith("/page/"):
+        return Reply(status=404)
+    return Reply(SITE.get(request.path, f"<h1>{request.path}</h1>").encode('utf-8'))
+
+
+def _serve():
+    server = LocalServer(_respond).start()
+    return server, server.base_url
+
+
+def _engine(**kwargs):
+    return ScraperEngine(scheduler=HostScheduler(rate=100, burst=10, concurrency=4, use_robots=False), **kwargs)
+
+
+def test_batch_resumes_after_restart():
+    """A reopened checkpoint hands back only unfinished URLs, with earlier results and failures"""
+    server, base = _serve()
+    path = os.path.join(tempfile.mkdtemp(), "checkpoint.sqlite")
+    urls = [f"{base}/page/{i}" for i in range(5)] + [f"{base}/missing"]
+    job = ScrapeJob(url=urls[0], selectors=SelectorSpec(tag="h1"), use_cache=False)
+    key = job_key("static", job.selectors, tuple(urls))
+    engine = _engine()
+    try:
+        # First run: dies after two pages and the failing URL
+        checkpoint = JobCheckpoint(key, path)
+        checkpoint.add_pending(urls)
+        for result in engine.run_batch(job.with_url(u) for u in urls[:2] + urls[-1:]):
+            checkpoint.record(result)
+        checkpoint.close()
+
+        # Restart
+        checkpoint = JobCheckpoint(key, path)
+        assert checkpoint.exists()
+        assert checkpoint.counts() == {STATE_PENDING: 3, STATE_DONE: 2, STATE_FAILED: 1}
+        assert list(checkpoint.failures()) == [f"{base}/missing"]
+        assert checkpoint.completed_results()[urls[0]] == {'tag': ["/page/0"]}
+        assert checkpoint.requeue_failed() == 1
+        remaining = [url for url, _ in checkpoint.pending()]
+        assert remaining == urls[2:]
+        for result in engine.run_batch(job.with_url(u) for u in remaining):
+            checkpoint.record(result)
+        assert checkpoint.counts() == {STATE_PENDING: 0, STATE_DONE: 5, STATE_FAILED: 1}
+        checkpoint.clear()
+        assert not checkpoint.exists()
+        checkpoint.close()
+    finally:
+        engine.close()
+        server.stop()
+
+    # The failing URL is tried again after requeue_failed; no page is fetched twice
+    assert sorted(server.paths) == ["/missing", "/missing"] + [f"/page/{i}" for i in range(5)]
+
+
+def test_resumed_export_has_no_duplicates():
+    """Records of pages in flight at the interruption are dropped before they are fetched again; other runs' stay"""
+    server, base = _serve()
+    directory = tempfile.mkdtemp()
+    urls = [f"{base}/page/{i}" for i in range(6)]
+    earlier = [f"{base}/page/earlier-{i}" for i in range(2)]
+    engine = _engine()
+    try:
+        for extension in (".jsonl", ".csv"):
+            export_path = os.path.join(directory, f"export{extension}")
+            path = os.path.join(directory, f"checkpoint{extension}.sqlite")
+
+            # An unrelated earlier run into the same file
+            with open_sink(export_path) as sink:
+                job = ScrapeJob(url=earlier[0], selectors=SelectorSpec(tag="h1"), use_cache=False, sink=sink)
+                list(engine.run_batch(job.with_url(u) for u in earlier))
+
+            # First run: every page reached the export, but it stops before the last four are marked done,
+            # halfway through writing another record
+            checkpoint = JobCheckpoint("export", path)
+            checkpoint.add_pending(urls)
+            with open_sink(export_path) as sink:
+                job = ScrapeJob(url=urls[0], selectors=SelectorSpec(tag="h1"), use_cache=False, sink=sink)
+                results = list(engine.run_batch(job.with_url(u) for u in urls))
+                for result in results[:2]:
+                    checkpoint.record(result, sink)
+            with open(export_path, 'a', encoding='utf-8') as f:
+                f.write(f'{{"url": "{urls[3]}", "sel' if extension == ".jsonl" else f"{urls[3]},tag")
+            checkpoint.close()
+
+            # Restart
+            checkpoint = JobCheckpoint("export", path)
+            unfinished = {result.url for result in results[2:]}
+            assert checkpoint.unfinished_urls() == unfinished
+            assert drop_unfinished(export_path, checkpoint.unfinished_urls()) == 5
+            remaining = [url for url, _ in checkpoint.pending()]
+            with open_sink(export_path) as sink:
+                job = ScrapeJob(url=urls[0], selectors=SelectorSpec(tag="h1"), use_cache=False, sink=sink)
+                for result in engine.run_batch(job.with_url(u) for u in remaining):
+                    checkpoint.record(result, sink)
+            checkpoint.close()
+
+            with open(export_path, encoding='utf-8', newline='') as f:
+                if extension == ".jsonl":
+                    rows = [json.loads(line) for line in f]
+                else:
+                    rows = list(csv.DictReader(f))
+            assert sorted(row['url'] for row in rows) == sorted(earlier + urls)
+    finally:
+        engine.close()
+        server.stop()
+
+    # Columnar files are rewritten by every run, so a resume would lose the finished pages
+    assert can_resume(export_path) and not can_resume("export.parquet") and not can_resume("export.arrows")
+
+
+def test_crawl_resumes_from_its_frontier():
+    """An interrupted crawl continues with its queued links and fetches no page twice"""
+    server, base = _serve()
+    path = os.path.join(tempfile.mkdtemp(), "checkpoint.sqlite")
+    job = ScrapeJob(url=base, selectors=SelectorSpec(tag="h1"), use_cache=False)
+    engine = _engine()
+    try:
+        checkpoint = JobCheckpoint("crawl", path)
+        first = list(Crawler(engine, CrawlConfig(max_pages=2, workers=1), checkpoint=checkpoint).crawl(job, [f"{base}/"]))
+        checkpoint.close()
+
+        checkpoint = JobCheckpoint("crawl", path)
+        second = list(Crawler(engine, CrawlConfig(max_pages=None, workers=1), checkpoint=checkpoint).crawl(job, [f"{base}/"]))
+        assert checkpoint.counts()[STATE_DONE] == 4
+        checkpoint.close()
+    finally:
+        engine.close()
+        server.stop()
+
+    assert len(first) == 2 and len(second) == 2
+    assert sorted(server.paths) == ["/", "/a", "/b", "/c"]
+
+
+def test_engine_waits_while_paused():
+    """A cleared pause event holds the job before it fetches; setting it lets the job finish"""
+    server, base = _serve()
+    pause_event = threading.Event()
+    engine = _engine(pause_event=pause_event)
+    results = []
+    worker = threading.Thread(target=lambda: results.append(
+        engine.run(ScrapeJob(url=f"{base}/page/1", selectors=SelectorSpec(tag="h1"), use_cache=False))))
+    try:
+        worker.start()
+        time.sleep(0.5)
+        assert server.paths == [] and worker.is_alive()
+        pause_event.set()
+        worker.join(10)
+    finally:
+        engine.close()
+        server.stop()
+
+    assert results[0].results['tag'] == ["/page/1"]
+
+
+if __name__ == "__main__":
+    test_batch_resumes_after_restart()
+    test_resumed_export_has_no_duplicates()
+    test_crawl_resumes_from_its_frontier()
+    test_engine_waits_while_paused()
+    print("✅ Checkpoint tests passed")
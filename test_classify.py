@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+
+import sys
+import os
+import json
+
+# Add current directory to path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from scraper_classify import CAPTCHA_UNKNOWN, INDICATORS, classify_page
+from scraper_engine import ScraperEngine
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "bench", "fixtures", "classifier")
+
+
+def _fixtures():
+    with open(os.path.join(FIXTURES_DIR, "labels.json"), "r", encoding="utf-8") as f:
+        labels = json.load(f)
+    for name, label in sorted(labels.items()):
+        with open(os.path.join(FIXTURES_DIR, name), "rb") as f:
+            yield name, f.read(), label
+
+
+def test_fixtures_are_classified_as_labeled():
+    """Every labeled page gets its verdict, from raw bytes and from text alike"""
+    for name, body, label in _fixtures():
+        verdict = classify_page(body)
+        assert (verdict.blocked, verdict.captcha_type) == (label["blocked"], label["captcha_type"]), \
+            f"{name}: {verdict.describe()}"
+        assert classify_page(body.decode("utf-8")) == verdict
+
+
+def test_weights_words_and_wrappers():
+    """Generic words alone never block, keywords must stand alone, and the engine helpers share the verdict"""
+    assert not classify_page("Robot vacuum blocked by a challenge? Verification and security by Alibaba.com").blocked
+    assert classify_page("<p>robots.txt</p>").signals == ()
+    assert classify_page("<TITLE>Access Denied</TITLE>").blocked
+    assert classify_page(b"").captcha_type == CAPTCHA_UNKNOWN
+
+    engine = ScraperEngine()
+    page = '<div id="nc_1_nocaptcha"><span class="nc-lang-cnt">Please slide to verify</span></div>'
+    assert engine.detect_captcha_or_blocking(page)
+    assert engine.detect_captcha_type(page) == "alibaba_nocaptcha"
+    assert engine.detect_captcha_type('<div class="g-recaptcha" data-sitekey="k"></div>') == "recaptcha_v2"
+
+
+def test_every_matched_indicator_is_reported():
+    """Score and signals cover every indicator on the page, keywords nested in or overlapping others included"""
+    page = ('<TITLE>Just a moment...</TITLE><div id="nc_1_nocaptcha" class="g-recaptcha captcha-loading">'
+            '<script src="https://www.google.com/recaptcha/api.js"></script>Are you a robot? Too many requests'
+            '<img src="/captcha.png"></div>')
+    verdict = classify_page(page)
+    expected = {"block page title", "alibaba slider", "nocaptcha", "recaptcha widget", "recaptcha",
+                "alibaba captcha widgets", "captcha", "human check", "rate limited", "captcha image", "block words"}
+    assert set(verdict.signals) == expected
+    assert verdict.score == sum(indicator.weight for indicator in INDICATORS if indicator.name in expected)
+    assert verdict.captcha_type == "alibaba_nocaptcha"
+
+
+if __name__ == "__main__":
+    test_fixtures_are_classified_as_labeled()
+    test_weights_words_and_wrappers()
+    test_every_matched_indicator_is_reported()
+    print("✅ Classifier tests passed")
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+
+import sys
+import os
+
+# Add current directory to path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from scraper_crawl import BloomFilter, CrawlConfig, Crawler, Frontier
+from scraper_engine import ScraperEngine, ScrapeJob, SelectorSpec
+from testing_server import LocalServer, Reply
+
+SITE = {
+    "/": '<h1>Home</h1><nav><a href="/a">A</a> <a href="/b#top">B</a> <a href="http://elsewhere.invalid/">X</a>'
+         ' <a href="mailto:shop@example.com">Mail</a></nav><a href="/ignored">outside nav</a>',
+    "/a": '<h1>A</h1><nav><a href="/c?y=2&x=1">C</a> <a href="/">Home</a></nav>',
+    "/b": '<h1>B</h1><nav><a href="/c?x=1&y=2">C again</a></nav>',
+    "/c": '<h1>C</h1><nav><a href="/d">D</a></nav>',
+    "/d": '<h1>D</h1>',
+}
+
+
+def _respond(request):
+    if request.path == "/robots.txt":
+        return Reply(status=404)
+    return Reply(SITE.get(request.path.split("?")[0], "<h1>Missing</h1>").encode('utf-8'))
+
+
+def test_bloom_filter_and_frontier_order():
+    """The seen-set has no false negatives and the frontier pops shallow URLs first"""
+    seen = BloomFilter(capacity=10_000, error_rate=0.01)
+    # An add reports False only when its bits were all set already: a false positive
+    assert sum(seen.add(f"https://example.com/item/{i}") for i in range(10_000)) > 9_900
+    assert all(f"https://example.com/item/{i}" in seen for i in range(10_000))
+    false_positives = sum(f"https://example.com/other/{i}" in seen for i in range(10_000))
+    assert false_positives < 300
+    assert seen.size_bytes < 16 * 1024
+
+    frontier = Frontier(capacity=100)
+    assert frontier.push("https://example.com/deep", 2)
+    assert frontier.push("https://example.com/top", 0)
+    assert not frontier.push("HTTPS://EXAMPLE.com/top#again", 1)
+    assert frontier.pop() == ("https://example.com/top", 0)
+    assert frontier.pop() == ("https://example.com/deep", 2)
+
+    # A URL dropped while the frontier is full can be queued once it drains
+    frontier = Frontier(capacity=100, max_pending=1)
+    assert frontier.push("https://example.com/first", 1)
+    assert not frontier.push("https://example.com/second", 1)
+    assert frontier.dropped == 1
+    frontier.pop()
+    assert frontier.push("https://example.com/second", 1)
+
+
+def test_crawl_follows_links_within_limits():
+    """Matched links are followed once each, within the depth limit and the seed's domain"""
+    server = LocalServer(_respond).start()
+    base = server.base_url
+    engine = ScraperEngine()
+    config = CrawlConfig(link_selectors=SelectorSpec(css_selector="nav"), max_depth=2, workers=2)
+    job = ScrapeJob(url=base, selectors=SelectorSpec(tag="h1"), use_cache=False)
+    try:
+        pages = list(Crawler(engine, config).crawl(job, [f"{base}/"]))
+    finally:
+        engine.close()
+        server.stop()
+
+    assert [(page.result.results['tag'], page.depth) for page in sorted(pages, key=lambda p: p.result.url)] == [
+        (["Home"], 0), (["A"], 1), (["B"], 1), (["C"], 2),
+    ]
+    # Links come back with each result from the engine's own parse; pages at the depth limit collect none
+    links = {page.result.url.split("?")[0]: page.result.links for page in pages}
+    assert sorted(links[f"{base}/"]) == [f"{base}/a", f"{base}/b#top", "http://elsewhere.invalid/"]
+    assert links[f"{base}/c"] is None
+    # /c is reached twice with reordered queries but fetched once; /d is beyond the depth limit
+    assert sorted(path.split("?")[0] for path in server.paths if path != "/robots.txt") == ["/", "/a", "/b", "/c"]
+
+
+if __name__ == "__main__":
+    test_bloom_filter_and_frontier_order()
+    test_crawl_follows_links_within_limits()
+    print("✅ Crawl tests passed")
@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+
+import sys
+import os
+from dataclasses import replace
+
+# Add current directory to path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from scraper_async import AsyncScraperEngine
+from scraper_engine import ScraperEngine, ScrapeJob, SelectorSpec, EVENT_IMAGE, EVENT_LOG, parse_url_list
+from scraper_export import MemorySink
+from scraper_extract import SelectorError
+from testing_server import LocalServer, Reply
+
+PAGE = b"""<html><head><title>Listing</title></head><body>
+<h1 id="main">Product list</h1>
+<div class="item"><span class="price">US$ 1.50</span><img src="/img/a.jpg"></div>
+<div class="item"><span class="price">US$ 2.75</span></div>
+<p>First paragraph</p>
+<p>Second paragraph</p>
+</body></html>"""
+
+
+def _serve():
+    return LocalServer(lambda request: Reply(PAGE)).start()
+
+
+def test_static_job_without_tk():
+    """The engine scrapes a page headless and reports through events"""
+    server = _serve()
+    events = []
+    try:
+        engine = ScraperEngine(on_event=events.append)
+        url = f"{server.base_url}/list"
+        result = engine.run(ScrapeJob(
+            url=url,
+            selectors=SelectorSpec(tag="h1", class_name="item", id_name="main",
+                                   css_selector="p", xpath_selector="//span[@class='price']/text()"),
+        ))
+    finally:
+        server.stop()
+
+    assert result.url == url
+    assert result.results['tag'] == ["Product list"]
+    assert result.results['id'] == ["Product list"]
+    assert result.results['css'] == ["First paragraph", "Second paragraph"]
+    assert result.results['xpath'] == ["US$ 1.50", "US$ 2.75"]
+    assert result.results['class'] == ["US$ 1.50", f"[IMAGE] {url.rsplit('/', 1)[0]}/img/a.jpg", "US$ 2.75"]
+    assert any(e.kind == EVENT_LOG and "[STATIC FETCH]" in e.message for e in events)
+    assert [e.url for e in events if e.kind == EVENT_IMAGE] == [f"{url.rsplit('/', 1)[0]}/img/a.jpg"]
+
+
+def test_batch_shares_pooled_connections():
+    """A batch runs on a bounded pool and reuses keep-alive connections"""
+    server = _serve()
+    engine = ScraperEngine()
+    base = server.base_url
+    urls = parse_url_list("\n".join(f"{base}/page/{i}" for i in range(6)) + f"\n# comment\n\n{base}/page/0\n")
+    try:
+        job = ScrapeJob(url=urls[0], selectors=SelectorSpec(tag="h1"))
+        results = list(engine.run_batch((job.with_url(u) for u in urls), max_workers=3))
+    finally:
+        engine.close()
+        server.stop()
+
+    assert len(urls) == 6
+    assert sorted(r.url for r in results) == sorted(urls)
+    assert all(r.error is None and r.results['tag'] == ["Product list"] for r in results)
+    assert len(server.client_ports) <= 3
+
+
+def test_batch_reports_errors_per_url():
+    """A failing URL becomes an error result instead of aborting the batch"""
+    engine = ScraperEngine()
+    job = ScrapeJob(url="http://127.0.0.1:9/unreachable", selectors=SelectorSpec(tag="h1"))
+    results = list(engine.run_batch([job], max_workers=1))
+    engine.close()
+
+    assert len(results) == 1
+    assert results[0].error
+
+
+def test_dynamic_batch_gets_a_browser_per_worker():
+    """A dynamic batch grows the browser pool to its worker count; the async engine never starts the pool"""
+    engine = ScraperEngine()
+    job = ScrapeJob(url="http://127.0.0.1:9/unreachable", selectors=SelectorSpec(tag="h1"), mode="dynamic")
+    try:
+        results = list(engine.run_batch([job.with_url(f"{job.url}/{i}") for i in range(3)], max_workers=3))
+        assert engine.get_browser_pool().size == 3
+    finally:
+        engine.close()
+    assert len(results) == 3
+
+    async_engine = AsyncScraperEngine()
+    try:
+        async_engine.run(job)
+    except Exception:
+        pass
+    finally:
+        async_engine.close()
+    assert async_engine._browser_pool is None
+
+
+def test_batch_rejects_bad_selectors_before_fetching():
+    """An invalid selector stops the batch before any request is sent"""
+    server = _serve()
+    engine = ScraperEngine()
+    job = ScrapeJob(url=f"{server.base_url}/", selectors=SelectorSpec(css_selector="div["))
+    try:
+        list(engine.run_batch([job, job.with_url(job.url + "2")], max_workers=2))
+    except SelectorError:
+        pass
+    else:
+        raise AssertionError("bad selector was accepted")
+    finally:
+        engine.close()
+        server.stop()
+
+    assert not server.client_ports
+
+
+def test_streamed_job_matches_full_fetch():
+    """A streamed static job yields the same results as a full download"""
+    server = _serve()
+    engine = ScraperEngine()
+    job = ScrapeJob(url=f"{server.base_url}/list",
+                    selectors=SelectorSpec(class_name="item", css_selector="p"))
+    try:
+        streamed = engine.run(replace(job, stream=True))
+        full = engine.run(job)
+    finally:
+        engine.close()
+        server.stop()
+
+    assert streamed.results == full.results
+    assert "Product list" in streamed.html_content
+
+
+def test_unbounded_job_writes_to_sink():
+    """With a sink every match goes there, not into the result lists"""
+    engine = ScraperEngine()
+    sink = MemorySink()
+    url = "http://shop.example.com/list"
+    page = "<ul>" + "".join(f"<li>Product {i}</li>" for i in range(60)) + "</ul>"
+    job = ScrapeJob(url=url, selectors=SelectorSpec(tag="li"), limit=None, offset=5, sink=sink)
+
+    results, links = engine.extract_job(job, page)
+
+    assert results == {'tag': []} and links is None
+    assert [r.text for r in sink.records] == [f"Product {i}" for i in range(5, 60)]
+    assert [r.position for r in sink.records] == list(range(5, 60))
+    assert all(r.url == url and r.selector == "li" and r.image_url is None for r in sink.records)
+
+
+def test_paged_records_keep_positions_of_elements_with_images():
+    """Each record is numbered by its element's match index, so pages of elements with images never overlap"""
+    engine = ScraperEngine()
+    url = "http://shop.example.com/list"
+    page = "".join(f'<div class="item">Product {i}<img src="/img/{i}a.jpg"><img src="/img/{i}b.jpg"></div>'
+                   for i in range(4))
+    sinks = [MemorySink(), MemorySink()]
+    for offset, sink in zip((0, 2), sinks):
+        engine.extract_job(ScrapeJob(url=url, selectors=SelectorSpec(class_name="item"), limit=2,
+                                     offset=offset, sink=sink), page)
+
+    records = sinks[0].records + sinks[1].records
+    assert [(r.position, r.item) for r in records] == [(i, j) for i in range(4) for j in range(3)]
+    assert [r.text for r in records if r.item == 0] == [f"Product {i}" for i in range(4)]
+    assert [r.image_url for r in records if r.item == 2] == [f"http://shop.example.com/img/{i}b.jpg" for i in range(4)]
+
+
+if __name__ == "__main__":
+    test_static_job_without_tk()
+    test_batch_shares_pooled_connections()
+    test_batch_reports_errors_per_url()
+    test_dynamic_batch_gets_a_browser_per_worker()
+    test_batch_rejects_bad_selectors_before_fetching()
+    test_streamed_job_matches_full_fetch()
+    test_unbounded_job_writes_to_sink()
+    test_paged_records_keep_positions_of_elements_with_images()
+    print("✅ Engine test passed")
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+
+import sys
+import os
+import csv
+import json
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+# Add current directory to path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from scraper_engine import ScraperEngine, ScrapeJob, SelectorSpec
+from scraper_export import CsvSink, JsonlSink, ParquetSink, ScrapeRecord, open_sink
+
+
+def _record(i):
+    return ScrapeRecord(url=f"http://example.com/{i % 4}", selector_type='css', selector="div.item",
+                        position=i, item=0, text=f"Item {i}" if i % 5 else None,
+                        image_url=None if i % 5 else f"http://example.com/{i}.jpg",
+                        fetched_at=datetime(2024, 1, 1, tzinfo=timezone.utc))
+
+
+def test_jsonl_sink_appends_records_as_they_arrive():
+    """Records reach the file before close and concurrent writers do not interleave lines"""
+    path = os.path.join(tempfile.mkdtemp(), "items.jsonl")
+    sink = open_sink(path, flush_every=10)
+    assert isinstance(sink, JsonlSink)
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        for i in range(200):
+            pool.submit(sink.write, _record(i))
+
+    # Flushed every 10 records, so everything is already on disk
+    with open(path, encoding='utf-8') as f:
+        records = [json.loads(line) for line in f]
+    sink.close()
+
+    assert len(records) == 200
+    assert sorted(r['position'] for r in records) == list(range(200))
+    assert {r['fetched_at'] for r in records} == {"2024-01-01T00:00:00+00:00"}
+    assert sum(1 for r in records if r['image_url']) == 40
+
+
+def test_csv_sink_from_an_engine_job():
+    """An engine job streams every match into a CSV file with a single header"""
+    path = os.path.join(tempfile.mkdtemp(), "items.csv")
+    page = "<ul>" + "".join(f"<li>Product {i}, \"blue\"</li>" for i in range(50)) + "</ul>"
+    engine = ScraperEngine()
+
+    for _ in range(2):
+        # A second run appends to the same file without repeating the header
+        with open_sink(path) as sink:
+            assert isinstance(sink, CsvSink)
+            engine.extract_job(ScrapeJob(url="http://shop.example.com/", selectors=SelectorSpec(tag="li"),
+                                         limit=None, sink=sink), page)
+
+    with open(path, newline='', encoding='utf-8') as f:
+        rows = list(csv.DictReader(f))
+
+    assert len(rows) == 100
+    assert rows[0]['url'] == "http://shop.example.com/"
+    assert (rows[0]['selector_type'], rows[0]['selector'], rows[0]['position']) == ('tag', 'li', '0')
+    assert rows[1]['text'] == 'Product 1, "blue"' and rows[1]['image_url'] == ''
+
+
+def test_parquet_sink_writes_typed_row_groups():
+    """Parquet output keeps the record types, dictionary-encodes URLs and batches row groups"""
+    try:
+        import pyarrow.parquet as pq
+    except ImportError:
+        print("pyarrow is not installed; skipping the Parquet test")
+        return
+
+    path = os.path.join(tempfile.mkdtemp(), "items.parquet")
+    with open_sink(path, row_group_size=100) as sink:
+        assert isinstance(sink, ParquetSink)
+        for i in range(250):
+            sink.write(_record(i))
+
+    parquet = pq.ParquetFile(path)
+    table = parquet.read()
+    assert parquet.metadata.num_row_groups == 3
+    assert table.num_rows == 250
+    assert str(table.schema.field('url').type).startswith("dictionary")
+    assert table.column('position').to_pylist() == list(range(250))
+    assert table.column('text').null_count == 50
+
+
+if __name__ == "__main__":
+    test_jsonl_sink_appends_records_as_they_arrive()
+    test_csv_sink_from_an_engine_job()
+    test_parquet_sink_writes_typed_row_groups()
+    print("✅ Export tests passed")
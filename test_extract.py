@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+
+import sys
+import os
+
+# Add current directory to path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from scraper_engine import SelectorSpec
+from scraper_extract import (
+    ITEM_ERROR, ITEM_IMAGE, ITEM_TEXT, PlanMatches, SelectorError, compile_plan, extract_items, iter_items,
+    parse_document, parse_stream,
+)
+
+PAGE = """<html><body>
+<div id="grid">
+  <div class="card hot"><a href="/p/1"><img data-src="/img/1.jpg"></a><h2>Pump <b>A</b></h2><script>var x = 1;</script></div>
+  <div class="card"><h2>Pump B</h2></div>
+  <div class="card"><h2>Pump C</h2></div>
+</div>
+<img src="https://cdn.example.com/logo.png">
+</body></html>"""
+
+
+def test_all_selector_types_on_one_document():
+    """Every selector type is answered from a single parse"""
+    doc = parse_document(PAGE)
+    items = extract_items(doc, compile_plan(SelectorSpec(
+        tag="h2", class_name="card", id_name="grid",
+        css_selector="div.hot h2", xpath_selector="//div[@class='card']/h2/text()",
+    )), base_url="https://shop.example.com/list")
+
+    assert list(items) == ['tag', 'class', 'id', 'css', 'xpath']
+    assert items['tag'] == [(ITEM_TEXT, "PumpA", 0), (ITEM_TEXT, "Pump B", 1), (ITEM_TEXT, "Pump C", 2)]
+    assert items['class'][:2] == [(ITEM_TEXT, "PumpA", 0), (ITEM_IMAGE, "https://shop.example.com/img/1.jpg", 0)]
+    assert len(items['class']) == 4
+    assert items['id'][0] == (ITEM_TEXT, "PumpAPump BPump C", 0)
+    assert items['css'] == [(ITEM_TEXT, "PumpA", 0)]
+    assert items['xpath'] == [(ITEM_TEXT, "Pump B", 0), (ITEM_TEXT, "Pump C", 1)]
+
+
+def test_limit_and_evaluation_errors():
+    """Matches stop at the limit and selectors that fail on a page become error items"""
+    doc = parse_document("<ul>" + "<li>x</li>" * 30 + "</ul>")
+    items = extract_items(doc, compile_plan(SelectorSpec(tag="li", xpath_selector="//li[$missing]")), limit=5)
+
+    assert len(items['tag']) == 5
+    assert items['xpath'][0][0] == ITEM_ERROR
+
+
+def test_offset_and_unbounded_limit():
+    """Items can be paged with an offset, a limit of None yields every match, and nothing is built eagerly"""
+    doc = parse_document("<ul>" + "".join(f"<li>{i}</li>" for i in range(60)) + "</ul>")
+    plan = compile_plan(SelectorSpec(tag="li", css_selector="ul > li"))
+
+    page = extract_items(doc, plan, limit=5, offset=10)
+    assert page['tag'] == [(ITEM_TEXT, str(i), i) for i in range(10, 15)]
+    assert page['css'] == page['tag']
+
+    everything = extract_items(doc, plan, limit=None)
+    assert len(everything['tag']) == 60 and len(everything['css']) == 60
+
+    items = iter_items(doc, plan, limit=None)
+    assert next(items) == ('tag', ITEM_TEXT, "0")
+
+
+def test_simple_selectors_share_one_walk():
+    """Tag, class and id come from one walk of the tree, each with its own limit and offset"""
+    doc = parse_document('<ul id="list">' + "".join(
+        f'<li class="{"odd" if i % 2 else "even"}">{i}</li>' for i in range(40)) + "</ul>")
+    spec = SelectorSpec(tag="li", class_name="odd", id_name="list")
+    plan = compile_plan(spec)
+
+    matches = PlanMatches(doc, plan, 8)
+    assert matches.shared and matches('class') is matches('class')
+    assert [e.text for e in matches('tag')] == [str(i) for i in range(8)]
+    assert [e.text for e in matches('class')] == [str(i) for i in range(1, 17, 2)]
+
+    together = extract_items(doc, plan, limit=3, offset=5)
+    assert together['tag'] == [(ITEM_TEXT, str(i), i) for i in range(5, 8)]
+    assert together['class'] == [(ITEM_TEXT, str(i), i // 2) for i in range(11, 17, 2)]
+    assert together['id'] == []
+    for field in ('tag', 'class_name', 'id_name'):
+        alone = compile_plan(SelectorSpec(**{field: getattr(spec, field)}))
+        assert not PlanMatches(doc, alone).shared
+        (selector_type, items), = extract_items(doc, alone, limit=None).items()
+        assert extract_items(doc, plan, limit=None)[selector_type] == items
+
+
+def test_plan_is_compiled_once_and_validated():
+    """Equal specs share one compiled plan and syntax errors are raised up front"""
+    spec = SelectorSpec(css_selector="div.card > h2", xpath_selector="//h2")
+    assert compile_plan(spec) is compile_plan(SelectorSpec(css_selector="div.card > h2", xpath_selector="//h2"))
+
+    try:
+        compile_plan(SelectorSpec(css_selector="li[", xpath_selector="//li["))
+    except SelectorError as e:
+        assert "CSS selector error" in str(e) and "XPath error" in str(e)
+    else:
+        raise AssertionError("bad selectors were accepted")
+
+
+def test_stream_stops_once_selectors_are_satisfied():
+    """Streaming parse reads only what the limits need and matches a full parse"""
+    page = ("<html><body><div class='row'><div class='row'><p>outer</p></div></div>"
+            + "".join(f"<div class='row'><h2>Item {i}</h2></div>" for i in range(2000))
+            + "</body></html>").encode('utf-8')
+    chunks = [page[i:i + 1024] for i in range(0, len(page), 1024)]
+    plan = compile_plan(SelectorSpec(class_name="row", xpath_selector="//h2/text()"))
+
+    doc, received, complete = parse_stream(iter(chunks), plan, limit=5)
+
+    assert not complete
+    assert received < len(page) // 10
+    assert extract_items(doc, plan, limit=5) == extract_items(parse_document(page.decode()), plan, limit=5)
+
+    # Selectors that never reach the limit read the whole page
+    doc, received, complete = parse_stream(iter(chunks), compile_plan(SelectorSpec(id_name="missing")), limit=5)
+    assert complete and received == len(page)
+
+
+if __name__ == "__main__":
+    test_all_selector_types_on_one_document()
+    test_limit_and_evaluation_errors()
+    test_offset_and_unbounded_limit()
+    test_simple_selectors_share_one_walk()
+    test_plan_is_compiled_once_and_validated()
+    test_stream_stops_once_selectors_are_satisfied()
+    print("✅ Extraction tests passed")
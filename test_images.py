@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+
+import sys
+import os
+import io
+import base64
+import tempfile
+import threading
+import time
+
+# Add current directory to path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from PIL import Image
+
+from scraper_images import ImageStore, LRUCache, ThumbnailPipeline, make_thumbnail
+from testing_server import LocalServer, Reply
+
+
+def _jpeg(size):
+    buffer = io.BytesIO()
+    Image.new('RGB', size, (200, 40, 40)).save(buffer, 'JPEG')
+    return buffer.getvalue()
+
+
+PHOTO = _jpeg((1600, 1200))
+
+
+def _respond(request):
+    """Serves PHOTO slowly enough for downloads to overlap; /text is not an image"""
+    time.sleep(0.05)
+    if request.path.startswith("/text"):
+        return Reply(b"not an image", content_type="text/plain")
+    return Reply(PHOTO, content_type="image/jpeg")
+
+
+def test_jpeg_is_decoded_at_reduced_size():
+    """Large JPEGs become small thumbnails and keep their original size"""
+    thumbnail, original_size = make_thumbnail(PHOTO)
+
+    assert original_size == (1600, 1200)
+    assert thumbnail.size[0] <= 200 and thumbnail.size[1] <= 150
+
+
+def test_pipeline_caps_in_flight_downloads():
+    """Images are fetched on workers, never more than max_in_flight at once"""
+    server = LocalServer(_respond).start()
+    base = server.base_url
+    ready = []
+    done = threading.Event()
+
+    def on_ready(thumbnail):
+        ready.append(thumbnail)
+        if len(ready) == 10:
+            done.set()
+
+    store = ImageStore(tempfile.mkdtemp())
+    pipeline = ThumbnailPipeline(on_ready, store=store, workers=4, max_in_flight=2)
+    try:
+        for i in range(8):
+            pipeline.submit(f"{base}/img/{i}.jpg")
+        pipeline.submit(f"{base}/text")
+        pipeline.submit("data:image/jpeg;base64," + base64.b64encode(_jpeg((40, 30))).decode())
+        assert done.wait(10)
+    finally:
+        pipeline.close()
+        server.stop()
+
+    errors = [t for t in ready if t.error]
+    assert [t.url for t in errors] == [f"{base}/text"]
+    assert all(t.image.size[0] <= 200 for t in ready if not t.error)
+    assert server.peak <= 2
+    # Eight downloads of the same photo are stored once
+    assert len({t.digest for t in ready if not t.error}) == 2
+    assert store.read(ready[0].digest) in (PHOTO, _jpeg((40, 30)))
+
+
+def test_store_is_content_addressed_and_lru_is_bounded():
+    """Equal bytes share one file, pruning honours the budget and the LRU forgets old entries"""
+    store = ImageStore(tempfile.mkdtemp(), max_bytes=len(PHOTO))
+    first = store.put(PHOTO)
+    assert store.put(PHOTO) == first
+    other = store.put(b"x" * 10)
+
+    copy_path = os.path.join(tempfile.mkdtemp(), "copy.jpg")
+    store.copy_to(first, copy_path)
+    with open(copy_path, 'rb') as f:
+        assert f.read() == PHOTO
+
+    os.utime(store.path(other), (0, 0))
+    store.prune()
+    assert os.path.exists(store.path(first)) and not os.path.exists(store.path(other))
+
+    cache = LRUCache(max_size=2)
+    cache.put(1, "a")
+    cache.put(2, "b")
+    cache.get(1)
+    cache.put(3, "c")
+    assert 1 in cache and 2 not in cache and len(cache) == 2
+
+
+if __name__ == "__main__":
+    test_jpeg_is_decoded_at_reduced_size()
+    test_pipeline_caps_in_flight_downloads()
+    test_store_is_content_addressed_and_lru_is_bounded()
+    print("✅ Image pipeline tests passed")
@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+
+import sys
+import os
+import asyncio
+
+# Add current directory to path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import scraper_async
+import scraper_engine
+from scraper_async import AsyncScraperEngine
+from scraper_engine import ScraperEngine, ScrapeJob, SelectorSpec
+from scraper_interact import find_site_key, scroll_steps, slider_steps, token_injection_script
+from scraper_readiness import READY_CHECK_SCRIPT
+
+RECAPTCHA_PAGE = '<div class="g-recaptcha" data-sitekey="KEY123"></div><textarea name="g-recaptcha-response"></textarea>'
+IMAGE_CAPTCHA_PAGE = '<img src="/captcha.png"><input name="captcha">'
+SOLVED_PAGE = '<h1>Welcome</h1>'
+
+
+class _Element:
+    def __init__(self, page):
+        self.page = page
+
+    def screenshot(self):
+        return b"png"
+
+    def fill(self, value):
+        self.page.calls.append(("fill", value))
+
+
+class _Page:
+    """Records what the engine does to it; shows SOLVED_PAGE once reloaded"""
+
+    def __init__(self, html_content):
+        self.html_content = html_content
+        self.calls = []
+
+    def evaluate(self, script, arg=None):
+        self.calls.append(("evaluate", script))
+
+    def query_selector(self, selector):
+        return _Element(self) if "captcha" in selector and "captcha" in self.html_content else None
+
+    def reload(self):
+        self.calls.append(("reload",))
+        self.html_content = SOLVED_PAGE
+
+    def content(self):
+        return self.html_content
+
+
+class _AsyncElement(_Element):
+    async def screenshot(self):
+        return _Element.screenshot(self)
+
+    async def fill(self, value):
+        _Element.fill(self, value)
+
+
+class _AsyncPage(_Page):
+    async def evaluate(self, script, arg=None):
+        _Page.evaluate(self, script, arg)
+
+    async def query_selector(self, selector):
+        element = _Page.query_selector(self, selector)
+        return element and _AsyncElement(self)
+
+    async def reload(self):
+        _Page.reload(self)
+
+    async def content(self):
+        return _Page.content(self)
+
+
+def _engine(engine_type, solved):
+    """Engine whose 2Captcha client answers at once and records what it was asked"""
+    engine = engine_type()
+    engine.solve_2captcha = lambda api_key, captcha_type, url, site_key=None, image=None: solved.append(
+        (captcha_type, site_key, image)) or "TOKEN"
+    return engine
+
+
+def test_slider_and_scroll_plans():
+    """The slider is pressed, dragged to its far end and released; scrolling stays on the page and ends on top"""
+    box = {'x': 100, 'y': 50, 'width': 300, 'height': 40}
+    approach, drag = slider_steps(box)
+    assert approach[-1].action == "down" and approach[-2].x == 120 and approach[-2].y == 70
+    assert drag[-1].action == "up" and drag[-2].x == 120 + 300 - 50
+    assert all(step.pause > 0 for step in approach + drag)
+
+    steps = scroll_steps(1000)
+    assert steps[-1][0] == 0
+    assert all(0 <= position <= 1000 for position, _ in steps)
+
+
+def test_captcha_helpers():
+    """Site keys are read from the widget and each token goes into its own field"""
+    assert find_site_key(RECAPTCHA_PAGE) == "KEY123"
+    assert find_site_key(SOLVED_PAGE) is None
+    script = token_injection_script("recaptcha_v2", "TOKEN")
+    assert "g-recaptcha-response" in script and "grecaptcha.getResponse" in script
+    assert "grecaptcha" not in token_injection_script("hcaptcha", "TOKEN")
+
+
+def test_stealth_scripts_keep_the_real_ready_state():
+    """No init script fakes document.readyState, which the readiness check waits on"""
+    engine = ScraperEngine()
+    try:
+        scripts = engine._init_scripts("https://www.alibaba.com/trade/search")
+    finally:
+        engine.close()
+    assert len(scripts) == 2
+    assert "readyState === 'loading'" in READY_CHECK_SCRIPT
+    assert not any("readyState" in script for script in scripts)
+
+def test_sync_and_async_engines_solve_captchas_alike():
+    """Both engines inject a token or fill an image answer, reload and extract the page they land on"""
+    job = ScrapeJob(url="https://example.com/", selectors=SelectorSpec(tag="h1"), use_2captcha=True, captcha_api_key="key")
+    for module in (scraper_engine, scraper_async):
+        module.CAPTCHA_SUBMIT_WAIT = module.CAPTCHA_RELOAD_WAIT = 0
+    engine_solved, async_solved = [], []
+    engine, async_engine = _engine(ScraperEngine, engine_solved), _engine(AsyncScraperEngine, async_solved)
+    try:
+        for html_content in (RECAPTCHA_PAGE, IMAGE_CAPTCHA_PAGE, SOLVED_PAGE):
+            page, async_page = _Page(html_content), _AsyncPage(html_content)
+            assert engine._handle_captcha(job, page, html_content) == SOLVED_PAGE
+            assert asyncio.run(async_engine._handle_captcha_async(job, async_page, html_content)) == SOLVED_PAGE
+            assert page.calls == async_page.calls
+    finally:
+        engine.close()
+        async_engine.close()
+
+    assert engine_solved == async_solved == [("recaptcha_v2", "KEY123", None), ("image", None, b"png")]
+    assert page.calls == []
+
+
+if __name__ == "__main__":
+    test_slider_and_scroll_plans()
+    test_captcha_helpers()
+    test_stealth_scripts_keep_the_real_ready_state()
+    test_sync_and_async_engines_solve_captchas_alike()
+    print("✅ Page interaction tests passed")
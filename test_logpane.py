@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+
+import sys
+import os
+import tempfile
+
+# Add current directory to path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from scraper_logpane import LogPane
+
+
+class _FakeRoot:
+    """Collects after() callbacks so a test runs the frames itself"""
+
+    def __init__(self):
+        self.scheduled = {}
+        self.next_id = 0
+
+    def after(self, ms, fn):
+        self.next_id += 1
+        self.scheduled[self.next_id] = fn
+        return self.next_id
+
+    def after_cancel(self, after_id):
+        self.scheduled.pop(after_id, None)
+
+    def frame(self):
+        """Run every pending callback once, as one tick of the Tk loop"""
+        pending, self.scheduled = self.scheduled, {}
+        for fn in pending.values():
+            fn()
+
+
+class _FakeText:
+    """Just enough of tk.Text: line.column indices, 'end' and 'end-1c'"""
+
+    def __init__(self):
+        self.content = ""
+        self.inserts = 0
+        self.scrolls = 0
+
+    def _offset(self, index):
+        index = str(index)
+        if index in ("end", "end-1c"):
+            return len(self.content)
+        line = int(index.split(".")[0])
+        offset = 0
+        for _ in range(line - 1):
+            offset = self.content.index("\n", offset) + 1
+        return offset
+
+    def insert(self, index, text):
+        self.inserts += 1
+        self.content += text
+
+    def delete(self, start, end):
+        self.content = self.content[:self._offset(start)] + self.content[self._offset(end):]
+
+    def get(self, start, end):
+        text = self.content[self._offset(start):self._offset(end)]
+        # Tk always reports a trailing newline at 'end'
+        return text + "\n" if end == "end" else text
+
+    def index(self, index):
+        return f"{self.content.count(chr(10)) + 1}.0"
+
+    def see(self, index):
+        self.scrolls += 1
+
+
+def _pane(**kwargs):
+    root = _FakeRoot()
+    widget = _FakeText()
+    pane = LogPane(root, widget, **kwargs)
+    pane.start()
+    return root, widget, pane
+
+
+def test_frame_batches_text_and_callables_in_order():
+    """Queued text lands in one insert and one scroll per frame, around callables in order"""
+    root, widget, pane = _pane()
+    for i in range(100):
+        pane.write(f"line {i}\n")
+    root.frame()
+    assert widget.content == "".join(f"line {i}\n" for i in range(100))
+    assert (widget.inserts, widget.scrolls) == (1, 1)
+
+    pane.write("before\n")
+    pane.call(lambda: pane.write("inside\n"))
+    pane.write("after\n")
+    root.frame()
+    assert widget.content.endswith("before\ninside\nafter\n")
+
+    # A quiet frame neither inserts nor scrolls, and the pane keeps draining
+    root.frame()
+    assert widget.scrolls == 2 and root.scheduled
+
+
+def test_clear_drops_queued_text_and_trim_spills():
+    """Cleared text never comes back, and lines over the limit move to the spill file"""
+    root, widget, pane = _pane(max_lines=100, spill_dir=tempfile.mkdtemp())
+    pane.write("shown\n")
+    root.frame()
+    pane.write("stale\n")
+    pane.clear()
+    root.frame()
+    assert widget.content == ""
+
+    for i in range(150):
+        pane.write(f"line {i}\n")
+    root.frame()
+    kept = widget.content.count("\n")
+    assert kept <= 100 and pane.spilled_lines == 150 - kept
+    assert pane.all_text().startswith("line 0\nline 1\n")
+    assert "line 149\n" in pane.all_text()
+    spill_path = pane.spill_path
+    assert os.path.exists(spill_path)
+
+    # The spill notice is queued for the next frame
+    root.frame()
+    assert spill_path in widget.content
+
+    pane.clear()
+    assert pane.spill_path is None and pane.spilled_lines == 0 and not os.path.exists(spill_path)
+
+
+def test_attachments_leave_with_their_lines():
+    """Inline objects are released when their lines are trimmed, and all of them on clear"""
+    root, widget, pane = _pane(max_lines=100, spill_dir=tempfile.mkdtemp())
+    released = []
+    for i in range(3):
+        pane.write(f"image {i}\n")
+        pane.call(lambda i=i: pane.attach(lambda: released.append(i)))
+        pane.write("size\n" * 40)
+    root.frame()
+    # 123 lines trimmed to 90: the first image's lines are spilled, the second's are still shown
+    assert released == [0]
+    assert "image 1\n" in widget.content
+
+    pane.clear()
+    assert released == [0, 1, 2]
+
+
+if __name__ == "__main__":
+    test_frame_batches_text_and_callables_in_order()
+    test_clear_drops_queued_text_and_trim_spills()
+    test_attachments_leave_with_their_lines()
+    print("✅ Log pane tests passed")
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+
+import sys
+import os
+import asyncio
+import json
+import tempfile
+import time
+
+# Add current directory to path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from scraper_engine import ScraperEngine, ScrapeJob, SelectorSpec
+from scraper_metrics import Metrics, current_trace, escape_label_value, increment, span
+from scraper_politeness import HostScheduler
+from scraper_retry import RetryPolicy
+from testing_server import LocalServer, Reply
+
+PAGE = b"<html><body><h1>Timed</h1><p class='price'>$5</p></body></html>"
+
+
+def _respond(request, paths):
+    """/missing is a 404, the first /flaky a 503 and /slow takes 0.1s"""
+    if request.path == "/slow":
+        time.sleep(0.1)
+    if request.path == "/missing":
+        return Reply(b"gone", status=404)
+    if request.path == "/flaky" and paths.count("/flaky") == 1:
+        return Reply(b"busy", status=503)
+    return Reply(PAGE)
+
+
+def test_static_jobs_export_phases_and_counters():
+    """Every static phase is timed per job, and retries, bytes and errors are counted and exported"""
+    directory = tempfile.mkdtemp()
+    metrics = Metrics(prometheus_path=os.path.join(directory, "scraper.prom"),
+                      jobs_path=os.path.join(directory, "jobs.jsonl"))
+    engine = ScraperEngine(scheduler=HostScheduler(rate=100, burst=10, use_robots=False), metrics=metrics)
+    engine.retry_policy = RetryPolicy(attempts=3, base_delay=0.05)
+    server = LocalServer(lambda request: _respond(request, server.paths)).start()
+    base = server.base_url
+    job = ScrapeJob(url=base, selectors=SelectorSpec(tag="h1", class_name="price"), use_cache=False)
+    try:
+        engine.run(job.with_url(f"{base}/slow"))
+        engine.run(job.with_url(f"{base}/flaky"))
+        try:
+            engine.run(job.with_url(f"{base}/missing"))
+            assert False, "a 404 must fail the job"
+        except Exception:
+            pass
+        metrics.write_prometheus()
+    finally:
+        server.stop()
+        engine.close()
+
+    with open(metrics.jobs_path, "r", encoding="utf-8") as f:
+        slow, flaky, missing = [json.loads(line) for line in f]
+    assert slow["status"] == "ok" and slow["url"].endswith("/slow")
+    assert {"static_connect", "static_ttfb", "static_download", "parse", "extract[tag]", "extract[class]"} <= set(slow["phases"])
+    assert slow["phases"]["static_ttfb"] >= 0.1 and slow["seconds"] >= slow["phases"]["static_ttfb"]
+    assert slow["counters"] == {"response_bytes": len(PAGE)}
+    assert flaky["counters"]["retries"] == 1
+    assert missing["status"] == "error" and "404" in missing["error"]
+
+    with open(metrics.prometheus_path, "r", encoding="utf-8") as f:
+        text = f.read()
+    assert '# TYPE scraper_static_ttfb_seconds histogram' in text
+    assert 'scraper_static_ttfb_seconds_count{mode="static"} 4' in text
+    assert 'scraper_extract_seconds_count{mode="static",selector="tag"} 2' in text
+    assert f'scraper_response_bytes_total{{mode="static"}} {2 * len(PAGE)}' in text
+    assert 'scraper_retries_total{mode="static"} 1' in text
+    assert 'scraper_jobs_total{mode="static",status="error"} 1' in text
+    assert 'scraper_errors_total{mode="static"} 1' in text
+
+
+def test_traces_follow_their_own_job():
+    """Concurrent jobs keep separate traces, helpers are no-ops outside a job and buckets are cumulative"""
+    metrics = Metrics()
+    with span("outside"):
+        increment("outside")
+    assert current_trace() is None and metrics.span_totals("outside") == (0, 0.0)
+
+    async def job(url, delay):
+        with metrics.job(url, "dynamic") as trace:
+            with span("dynamic_goto"):
+                await asyncio.sleep(delay)
+            # Threads started with to_thread record into the task's trace
+            await asyncio.to_thread(increment, "response_bytes", 10)
+        return trace
+
+    async def both():
+        return await asyncio.gather(job("a", 0.05), job("b", 0.15))
+
+    fast, slow = asyncio.run(both())
+    assert fast.counters == slow.counters == {"response_bytes": 10}
+    assert 0.05 <= fast.phases["dynamic_goto"] < 0.15 <= slow.phases["dynamic_goto"]
+    assert metrics.span_totals("dynamic_goto", mode="dynamic")[0] == 2
+    assert metrics.counter_value("jobs", mode="dynamic", status="ok") == 2
+
+    text = metrics.prometheus_text()
+    assert 'scraper_dynamic_goto_seconds_bucket{mode="dynamic",le="0.1"} 1' in text
+    assert 'scraper_dynamic_goto_seconds_bucket{mode="dynamic",le="0.25"} 2' in text
+    assert 'scraper_dynamic_goto_seconds_bucket{mode="dynamic",le="+Inf"} 2' in text
+
+    # Only the value is escaped, including the quote the format delimits it with
+    assert escape_label_value('C:\\tmp "a"\nb') == 'C:\\\\tmp \\"a\\"\\nb'
+    metrics.count("errors", kind='say "hi"')
+    assert 'scraper_errors_total{kind="say \\"hi\\""} 1' in metrics.prometheus_text()
+
+
+if __name__ == "__main__":
+    test_static_jobs_export_phases_and_counters()
+    test_traces_follow_their_own_job()
+    print("✅ Metrics tests passed")
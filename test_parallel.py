@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+
+import sys
+import os
+
+# Add current directory to path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from scraper_engine import ScraperEngine, ScrapeJob, SelectorSpec
+from scraper_parallel import ExtractionPool, extract_page
+from scraper_politeness import HostScheduler
+from testing_server import LocalServer, Reply
+
+SELECTORS = SelectorSpec(tag="h1", css_selector="li.item", xpath_selector="//a/@href")
+
+
+def _page(i):
+    items = "".join(f'<li class="item">Item {i}.{j}</li>' for j in range(5))
+    return f'<html><body><h1>Page {i}</h1><ul>{items}</ul><a href="/next/{i}">next</a></body></html>'
+
+
+def _respond(request):
+    if request.path == "/robots.txt":
+        return Reply(status=404)
+    return Reply(_page(request.path.rsplit("/", 1)[-1]).encode('utf-8'))
+
+
+def test_pool_matches_in_process_extraction_in_chunks():
+    """Worker processes return the same items as extracting in-process, several pages per chunk"""
+    pool = ExtractionPool(workers=2, chunk_size=8)
+    try:
+        futures = [pool.submit(_page(i), f"http://shop.example.com/{i}", SELECTORS, None, 1) for i in range(40)]
+        results = [future.result(timeout=60) for future in futures]
+    finally:
+        pool.close()
+
+    for i, items in enumerate(results):
+        assert items == extract_page(_page(i), f"http://shop.example.com/{i}", SELECTORS, None, 1)
+    assert results[3]['css'] == [("text", f"Item 3.{j}", j) for j in range(1, 5)]
+    assert results[3]['xpath'] == []
+    assert pool.pages == 40 and pool.chunks < 40
+
+
+def test_batch_extracts_in_worker_processes():
+    """A static batch with an extraction pool gives the same results as one without"""
+    server = LocalServer(_respond).start()
+    base = server.base_url
+    job = ScrapeJob(url=base, selectors=SELECTORS, use_cache=False, limit=None)
+    urls = [f"{base}/{i}" for i in range(12)]
+    pool = ExtractionPool(workers=2)
+    results = {}
+    try:
+        for extraction_pool in (None, pool):
+            engine = ScraperEngine(scheduler=HostScheduler(rate=1000, burst=100, concurrency=8, use_robots=False),
+                                   extraction_pool=extraction_pool)
+            try:
+                batch = engine.run_batch((job.with_url(u) for u in urls), max_workers=8)
+                results[extraction_pool is not None] = {r.url: r.results for r in batch}
+            finally:
+                engine.close()
+    finally:
+        pool.close()
+        server.stop()
+
+    assert results[True] == results[False]
+    assert results[True][f"{base}/4"]['tag'] == ["Page 4"]
+    assert results[True][f"{base}/4"]['xpath'] == ["/next/4"]
+    assert pool.pages == 12
+
+
+if __name__ == "__main__":
+    test_pool_matches_in_process_extraction_in_chunks()
+    test_batch_extracts_in_worker_processes()
+    print("✅ Parallel extraction tests passed")
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+
+import sys
+import os
+import asyncio
+import threading
+import time
+
+# Add current directory to path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from scraper_engine import ScraperEngine, ScrapeJob, SelectorSpec
+from scraper_politeness import HostScheduler, TokenBucket
+from testing_server import LocalServer, Reply
+
+PAGE = b"<html><body><h1>Polite</h1></body></html>"
+ROBOTS = b"User-agent: *\nCrawl-delay: 1\nDisallow: /private\n"
+
+
+def _serve(robots=None):
+    """Server taking 50ms per page, with ``robots`` as its robots.txt (404 without)"""
+    def respond(request):
+        # Through a proxy the path is the absolute URL
+        if request.path.endswith("/robots.txt"):
+            return Reply(robots, content_type="text/plain") if robots else Reply(status=404)
+        time.sleep(0.05)
+        return Reply(PAGE)
+
+    server = LocalServer(respond).start()
+    return server, server.base_url
+
+
+def _robots_fetches(server):
+    return sum(path.endswith("/robots.txt") for path in server.paths)
+
+
+def test_token_bucket_reserves_start_times():
+    """A burst starts at once and later requests are spaced by the rate"""
+    bucket = TokenBucket(rate=10, burst=2)
+    delays = [bucket.reserve() for _ in range(4)]
+    assert delays[:2] == [0.0, 0.0]
+    assert 0.09 < delays[2] <= 0.1 and 0.19 < delays[3] <= 0.2
+
+
+def test_robots_crawl_delay_and_disallow():
+    """robots.txt is read once per host; its Crawl-delay overrides a faster rate"""
+    server, base = _serve(ROBOTS)
+    engine = ScraperEngine(scheduler=HostScheduler(rate=100))
+    job = ScrapeJob(url=base, selectors=SelectorSpec(tag="h1"), use_cache=False)
+    try:
+        started = time.monotonic()
+        for i in range(3):
+            assert engine.run(job.with_url(f"{base}/page/{i}")).results['tag'] == ["Polite"]
+        elapsed = time.monotonic() - started
+        assert not engine.scheduler.allowed(f"{base}/private/item")
+        assert engine.scheduler.allowed(f"{base}/page/4")
+    finally:
+        engine.close()
+        server.stop()
+
+    assert _robots_fetches(server) == 1
+    assert elapsed >= 1.95
+    assert engine.scheduler.host(base).min_interval == 1
+
+
+def test_hosts_proceed_in_parallel_within_their_limits():
+    """Two hosts are fetched side by side, each one page at a time at its own rate"""
+    servers = [_serve(), _serve()]
+    engine = ScraperEngine(scheduler=HostScheduler(rate=4, burst=1, concurrency=1, use_robots=False))
+    job = ScrapeJob(url=servers[0][1], selectors=SelectorSpec(tag="h1"), use_cache=False)
+    urls = [f"{base}/page/{i}" for i in range(4) for _, base in servers]
+    try:
+        started = time.monotonic()
+        results = list(engine.run_batch((job.with_url(u) for u in urls), max_workers=4))
+        elapsed = time.monotonic() - started
+    finally:
+        engine.close()
+        for server, _ in servers:
+            server.stop()
+
+    assert all(r.error is None for r in results) and len(results) == 8
+    assert [server.peak for server, _ in servers] == [1, 1]
+    # Four requests per host at 4/s take ~0.75s; done one host after the other they would take twice that
+    assert 0.7 <= elapsed < 1.4
+
+
+def test_limits_are_configurable_and_robots_go_through_the_proxy():
+    """robots.txt is fetched through the job's proxy, and new limits apply to hosts already set up"""
+    server, proxy = _serve(ROBOTS)
+    engine = ScraperEngine()
+    engine.scheduler.configure(rate=50, concurrency=3)
+    job = ScrapeJob(url="http://shop.test/page/1", selectors=SelectorSpec(tag="h1"), use_cache=False, proxy_url=proxy)
+    try:
+        assert engine.run(job).results['tag'] == ["Polite"]
+        assert server.paths == ["http://shop.test/robots.txt", "http://shop.test/page/1"]
+        state = engine.scheduler.host(job.url)
+        assert (state.bucket.rate, state.bucket.burst, state.min_interval) == (1, 1, 1)
+        assert state.slots.limit == 3
+
+        engine.scheduler.configure(rate=0.5, concurrency=5)
+        assert engine.scheduler.host(job.url, job.proxy_server()) is state
+        assert (state.bucket.rate, state.bucket.burst, state.slots.limit) == (0.5, 1, 5)
+    finally:
+        engine.close()
+        server.stop()
+
+    # The robots.txt cache outlives the reconfiguration
+    assert _robots_fetches(server) == 1
+
+
+def test_reconfiguring_keeps_slots_held_by_requests_in_flight():
+    """Slots taken before configure are released without error, and a lower limit holds new requests back"""
+    scheduler = HostScheduler(rate=100, burst=10, concurrency=2, use_robots=False)
+    url = "http://shop.test/page/1"
+
+    async def hold_async():
+        await scheduler.acquire_async(url)
+        return scheduler.host(url).slots.in_use
+
+    scheduler.acquire(url)
+    assert asyncio.run(hold_async()) == 2
+    scheduler.configure(concurrency=1)
+    scheduler.release(url)
+    waiter = threading.Thread(target=scheduler.acquire, args=(url,))
+    waiter.start()
+    waiter.join(0.2)
+    assert waiter.is_alive()
+    scheduler.release_async(url)
+    waiter.join(5)
+    assert not waiter.is_alive()
+    scheduler.release(url)
+    assert scheduler.host(url).slots.in_use == 0
+
+
+if __name__ == "__main__":
+    test_token_bucket_reserves_start_times()
+    test_robots_crawl_delay_and_disallow()
+    test_limits_are_configurable_and_robots_go_through_the_proxy()
+    test_hosts_proceed_in_parallel_within_their_limits()
+    test_reconfiguring_keeps_slots_held_by_requests_in_flight()
+    print("✅ Politeness tests passed")
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+
+import sys
+import os
+import socket
+import time
+
+# Add current directory to path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import requests
+
+from scraper_engine import ScraperEngine, ScrapeJob, SelectorSpec
+from scraper_politeness import HostScheduler
+from scraper_retry import CircuitBreakers, RetryPolicy, classify_error, parse_retry_after
+from testing_server import LocalServer, Reply
+
+PAGE = b"<html><body><h1>Back again</h1></body></html>"
+
+
+def _respond(request, paths):
+    """/missing is a 404 and the first /busy a 503 asking to come back in a second"""
+    if request.path == "/missing":
+        return Reply(b"gone", status=404)
+    if request.path == "/busy" and paths.count("/busy") == 1:
+        return Reply(b"busy", status=503, headers={"Retry-After": "1"})
+    return Reply(PAGE)
+
+
+class _PlaywrightTimeout(Exception):
+    pass
+
+
+_PlaywrightTimeout.__name__ = "TimeoutError"
+
+
+def _engine():
+    engine = ScraperEngine(scheduler=HostScheduler(rate=100, burst=10, use_robots=False))
+    engine.retry_policy = RetryPolicy(attempts=3, base_delay=0.05)
+    return engine
+
+
+def _http_error(status, headers=None):
+    response = requests.Response()
+    response.status_code = status
+    response.headers.update(headers or {})
+    return requests.HTTPError(response=response)
+
+
+def test_errors_are_classified():
+    """Transient failures are retried, client errors and dead names are not"""
+    assert not classify_error(_http_error(404)).retryable
+    busy = classify_error(_http_error(429, {"Retry-After": "7"}))
+    assert busy.retryable and busy.retry_after == 7 and busy.host_failure
+    assert classify_error(requests.ConnectionError("refused")).retryable
+    assert classify_error(_PlaywrightTimeout("Timeout 45000ms exceeded")).retryable
+    assert not classify_error(Exception("net::ERR_NAME_NOT_RESOLVED at https://nowhere.invalid/")).retryable
+    assert not classify_error(ValueError("bad selector")).retryable
+
+    assert parse_retry_after("120") == 120
+    assert parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0
+    policy = RetryPolicy(base_delay=1, max_delay=4)
+    assert all(0.5 <= policy.backoff(0) <= 1 and 2 <= policy.backoff(2) <= 4 and policy.backoff(5) <= 4
+               for _ in range(100))
+    assert policy.backoff(0, retry_after=200) is None
+
+
+def test_static_fetch_honors_retry_after_and_fails_fast_on_404():
+    """A 503 is retried after its Retry-After; a 404 is tried once"""
+    server = LocalServer(lambda request: _respond(request, server.paths)).start()
+    base = server.base_url
+    engine = _engine()
+    job = ScrapeJob(url=base, selectors=SelectorSpec(tag="h1"), use_cache=False)
+    try:
+        started = time.monotonic()
+        assert engine.run(job.with_url(f"{base}/busy")).results['tag'] == ["Back again"]
+        assert time.monotonic() - started >= 1
+        results = list(engine.run_batch([job.with_url(f"{base}/missing")]))
+    finally:
+        engine.close()
+        server.stop()
+
+    assert "404" in results[0].error
+    assert server.paths == ["/busy", "/busy", "/missing"]
+
+
+def test_circuit_opens_for_a_dead_host():
+    """Repeated connection failures open the host's circuit and later jobs fail without a request"""
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        dead = f"http://127.0.0.1:{probe.getsockname()[1]}"
+    engine = _engine()
+    engine.breakers = CircuitBreakers(threshold=2, cooldown=60)
+    job = ScrapeJob(url=dead, selectors=SelectorSpec(tag="h1"), use_cache=False)
+    try:
+        results = list(engine.run_batch([job.with_url(f"{dead}/{i}") for i in range(4)], max_workers=1))
+    finally:
+        engine.close()
+
+    assert all(r.error for r in results)
+    assert sum("Circuit open" in r.error for r in results) >= 3
+    assert engine.breakers.is_open(dead)
+
+    breakers = CircuitBreakers(threshold=1, cooldown=0.05)
+    assert breakers.record(dead, ok=False)
+    time.sleep(0.06)
+    breakers.check(dead)
+    assert breakers.record(dead, ok=True) is False and not breakers.is_open(dead)
+
+
+if __name__ == "__main__":
+    test_errors_are_classified()
+    test_static_fetch_honors_retry_after_and_fails_fast_on_404()
+    test_circuit_opens_for_a_dead_host()
+    print("✅ Retry tests passed")
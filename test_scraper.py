@@ -6,20 +6,15 @@ import os
 # Add current directory to path
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
-from scraper_gui import WebScraperGUI
-import tkinter as tk
+from scraper_engine import ScraperEngine, ScrapeJob, SelectorSpec
 
 def test_scraper():
     """Test the enhanced scraper with a simple example"""
     print("🚀 Testing Enhanced Web Scraper (Python 3.13)")
     print("=" * 50)
     
-    # Create a simple test window
-    root = tk.Tk()
-    root.withdraw()  # Hide the main window
-    
-    # Create scraper instance
-    scraper = WebScraperGUI(root)
+    # Create a headless engine that prints progress lines
+    scraper = ScraperEngine(on_event=lambda event: print(event.message, end=""))
     
     # Test URL (using a simple, non-blocked site)
     test_url = "https://httpbin.org/user-agent"
@@ -29,10 +24,11 @@ def test_scraper():
     
     try:
         # Test static scraping
-        results, html_content = scraper.scrape_static(
+        result = scraper.run(ScrapeJob(
             url=test_url,
-            tag="pre"  # httpbin.org returns user agent in <pre> tag
-        )
+            selectors=SelectorSpec(tag="pre")  # httpbin.org returns user agent in <pre> tag
+        ))
+        results = result.results
         
         print("✅ Static scraping successful!")
         print(f"Results: {results}")
@@ -48,9 +44,6 @@ def test_scraper():
     
     print("\n" + "=" * 50)
     print("Test completed!")
-    
-    # Clean up
-    root.destroy()
 
 if __name__ == "__main__":
     test_scraper()
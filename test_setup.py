@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+
+import sys
+import os
+import tempfile
+import threading
+
+# Add current directory to path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from scraper_setup import PlaywrightProbe
+
+
+def _probe(path, executable, version="1.0.0"):
+    calls = []
+    versions = [version]
+
+    def check():
+        calls.append(versions[0])
+        if not os.path.isfile(executable):
+            raise Exception(f"Chromium not found at {executable}")
+        return executable
+
+    probe = PlaywrightProbe(path=path, check=check, version=lambda: versions[0])
+    return probe, calls, versions
+
+
+def test_probe_result_is_cached_per_version():
+    """A passing check is reused until the Playwright version changes or Chromium disappears"""
+    folder = tempfile.mkdtemp()
+    path = os.path.join(folder, "probe.json")
+    executable = os.path.join(folder, "chrome")
+    open(executable, 'w').close()
+    probe, calls, versions = _probe(path, executable)
+
+    first = probe.run()
+    assert first.ok and not first.cached
+    assert probe.run().cached
+    assert PlaywrightProbe(path=path, check=None, version=lambda: "1.0.0").run().cached
+    assert calls == ["1.0.0"]
+
+    versions[0] = "1.1.0"
+    assert not probe.run().cached
+    assert calls == ["1.0.0", "1.1.0"]
+
+    os.remove(executable)
+    missing = probe.run()
+    assert not missing.ok and "not found" in missing.error
+    assert not os.path.exists(path)
+
+
+def test_probe_without_playwright_and_in_background():
+    """No Playwright fails without a check; start() reports from its own thread"""
+    folder = tempfile.mkdtemp()
+    probe = PlaywrightProbe(path=os.path.join(folder, "probe.json"), check=lambda: 1 / 0, version=lambda: None)
+    assert probe.run().error == "Playwright is not installed"
+
+    executable = os.path.join(folder, "chrome")
+    open(executable, 'w').close()
+    probe, _, _ = _probe(os.path.join(folder, "probe.json"), executable)
+    results = []
+    done = threading.Event()
+    thread = probe.start(lambda result: (results.append((result, threading.current_thread())), done.set()))
+    assert done.wait(5)
+    assert results[0][0].ok and results[0][1] is thread
+
+
+if __name__ == "__main__":
+    test_probe_result_is_cached_per_version()
+    test_probe_without_playwright_and_in_background()
+    print("✅ Setup probe tests passed")
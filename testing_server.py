@@ -0,0 +1,83 @@
+"""Local HTTP server for the tests.
+
+Each test passes only how its site answers: a function taking the request
+handler (for ``path``, ``headers`` and ``client_address``) and returning a
+Reply. The server runs on a free port in a daemon thread, speaks HTTP/1.1
+with keep-alive, keeps quiet, and records the paths it was asked for, the
+client ports they came from and how many requests it answered at once.
+"""
+
+import threading
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, List, Set
+
+
+@dataclass
+class Reply:
+    body: bytes = b""
+    status: int = 200
+    content_type: str = "text/html; charset=utf-8"
+    headers: Dict[str, str] = field(default_factory=dict)
+
+
+class LocalServer:
+    """ThreadingHTTPServer answering GETs with ``respond``; use as a context manager or call start()/stop()"""
+
+    def __init__(self, respond: Callable[[BaseHTTPRequestHandler], Reply]):
+        self.respond = respond
+        self.paths: List[str] = []
+        self.client_ports: Set[int] = set()
+        self.active = 0
+        self.peak = 0
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self._server.daemon_threads = True
+
+    @property
+    def base_url(self):
+        return f"http://127.0.0.1:{self._server.server_address[1]}"
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                with server._lock:
+                    server.paths.append(self.path)
+                    server.client_ports.add(self.client_address[1])
+                    server.active += 1
+                    server.peak = max(server.peak, server.active)
+                try:
+                    reply = server.respond(self)
+                finally:
+                    with server._lock:
+                        server.active -= 1
+                self.send_response(reply.status)
+                self.send_header("Content-Type", reply.content_type)
+                for name, value in reply.headers.items():
+                    self.send_header(name, value)
+                self.send_header("Content-Length", str(len(reply.body)))
+                self.end_headers()
+                self.wfile.write(reply.body)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def start(self):
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()